@@ -0,0 +1,179 @@
+import asyncio
+import json
+import logging
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from crag.cache.answer_cache import SemanticAnswerCache
+from crag.models.state import initial_state
+from crag.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchStats:
+    answered: int = 0
+    failed: int = 0
+    skipped: int = 0
+    cached: int = 0
+    elapsed: float = 0.0
+    latencies: list[float] = field(default_factory=list)
+    node_seconds: dict[str, list[float]] = field(default_factory=dict)
+
+
+def read_questions(path: Path) -> Iterator[tuple[str, str]]:
+    """JSONL에서 (id, question)을 한 줄씩 읽는다.
+
+    각 줄은 {"id": ..., "question": ...} 형태이며 id가 없으면 줄 번호를 쓴다.
+    """
+    with path.open(encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning("[Batch] Skipping invalid JSON at line %d", line_no)
+                continue
+            if isinstance(row, str):
+                row = {"question": row}
+            if not isinstance(row, dict):
+                logger.warning("[Batch] Skipping line %d: not an object", line_no)
+                continue
+            question = str(row.get("question", "")).strip()
+            if not question:
+                logger.warning("[Batch] Skipping line %d without a question", line_no)
+                continue
+            yield str(row.get("id", line_no)), question
+
+
+def completed_ids(path: Path) -> set[str]:
+    """이미 답변이 기록된 id (재시작 시 건너뜀). 실패한 항목은 다시 시도한다."""
+    done: set[str] = set()
+    if not path.exists():
+        return done
+    with path.open(encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                # 중단되며 잘린 마지막 줄
+                continue
+            if not isinstance(row, dict) or "id" not in row:
+                logger.warning("[Batch] Ignoring output line %d without an id", line_no)
+                continue
+            if "error" not in row:
+                done.add(str(row["id"]))
+    return done
+
+
+async def _answer(graph, question: str) -> tuple[dict, list[dict]]:
+    """그래프를 실행하고 최종 상태와 노드별 소요 시간을 반환한다."""
+    result: dict = {}
+    timings: list[dict] = []
+    last = time.perf_counter()
+    with tracer.trace():
+        async for event in graph.astream(initial_state(question)):
+            now = time.perf_counter()
+            for node_name, node_output in event.items():
+                timings.append({"node": node_name, "seconds": round(now - last, 4)})
+                result = node_output
+            last = now
+    return result, timings
+
+
+async def run_batch(
+    graph,
+    input_path: Path,
+    output_path: Path,
+    concurrency: int = 4,
+    answer_cache: SemanticAnswerCache | None = None,
+    resume: bool = True,
+) -> BatchStats:
+    """JSONL 질문들을 하나의 그래프로 동시에 처리하고 결과를 JSONL로 기록한다.
+
+    입력은 스트리밍으로 읽으며 대기열 크기를 제한해 메모리 사용을 일정하게 유지한다.
+    결과는 완료되는 대로 한 줄씩 추가되므로 중단 후 resume으로 이어서 실행할 수 있다.
+    """
+    stats = BatchStats()
+    done = completed_ids(output_path) if resume else set()
+    queue: asyncio.Queue[tuple[str, str] | None] = asyncio.Queue(maxsize=concurrency * 2)
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    out = output_path.open("a" if resume else "w", encoding="utf-8")
+    start = time.perf_counter()
+
+    def write(row: dict) -> None:
+        out.write(json.dumps(row, ensure_ascii=False) + "\n")
+        out.flush()
+
+    async def worker() -> None:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            qid, question = item
+            t0 = time.perf_counter()
+            try:
+                cached = None
+                if answer_cache is not None:
+                    cached = await asyncio.to_thread(answer_cache.get, question)
+
+                if cached is not None:
+                    row = {"id": qid, "question": question, "generation": cached[0], "cached": True}
+                    timings: list[dict] = []
+                    stats.cached += 1
+                else:
+                    result, timings = await _answer(graph, question)
+                    row = {
+                        "id": qid,
+                        "question": question,
+                        "generation": result.get("generation", ""),
+                        "retry_count": result.get("retry_count", 0),
+                        "cached": False,
+                    }
+                    if answer_cache is not None and row["generation"]:
+                        await asyncio.to_thread(answer_cache.put, question, row["generation"])
+            except Exception as e:
+                logger.warning("[Batch] %s failed: %s", qid, e)
+                stats.failed += 1
+                write({"id": qid, "question": question, "error": str(e)})
+                continue
+
+            latency = time.perf_counter() - t0
+            row["latency"] = round(latency, 4)
+            row["timings"] = timings
+            write(row)
+
+            stats.answered += 1
+            stats.latencies.append(latency)
+            for timing in timings:
+                stats.node_seconds.setdefault(timing["node"], []).append(timing["seconds"])
+
+            if stats.answered % 10 == 0:
+                rate = stats.answered / (time.perf_counter() - start)
+                logger.info("[Batch] %d answered (%.2f q/s)", stats.answered, rate)
+
+    workers = [asyncio.create_task(worker()) for _ in range(max(1, concurrency))]
+    try:
+        for qid, question in read_questions(input_path):
+            if qid in done:
+                stats.skipped += 1
+                continue
+            await queue.put((qid, question))
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+    finally:
+        for task in workers:
+            task.cancel()
+        out.close()
+        from crag.graph.nodes.html_fetcher import aclose_async_client
+
+        await aclose_async_client()
+        stats.elapsed = time.perf_counter() - start
+
+    return stats
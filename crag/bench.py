@@ -0,0 +1,402 @@
+import asyncio
+import json
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import AsyncIterator, Callable, Iterator
+from dataclasses import dataclass, field
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, quote, urlsplit
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.documents import Document
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from crag.utils import percentile
+
+_WORDS = (
+    "cache index vector latency throughput graph node query document embedding "
+    "retrieval search chunk token batch stream server client model prompt answer "
+    "cluster shard replica queue worker thread process memory disk network"
+).split()
+
+_TOPICS = (
+    "chromadb persistence", "hnsw index tuning", "sentence embeddings", "langgraph routing",
+    "ollama models", "prompt caching", "async httpx clients", "sqlite write ahead log",
+    "python thread pools", "typer command line", "pydantic settings", "markdown rendering",
+)
+
+# 로컬 코퍼스에 없는 주제 (웹 검색 경로를 타게 된다)
+_WEB_TOPICS = (
+    "kubernetes autoscaling", "rust borrow checker", "postgres vacuum", "kafka partitions",
+    "wasm runtimes", "gpu memory pools", "raft consensus", "bloom filters",
+)
+
+
+# 질문 템플릿에 공통으로 들어가는 단어는 관련성 판정에서 뺀다
+_STOPWORDS = {"does", "work", "what", "with", "overview", "best", "practices"}
+
+
+def _keywords(text: str) -> set[str]:
+    return set(re.findall(r"[a-z]{4,}", text.lower())) - _STOPWORDS
+
+
+def _field(text: str, name: str) -> str:
+    match = re.search(rf"^{name}:\s*(.+)$", text, re.MULTILINE)
+    return match.group(1).strip() if match else ""
+
+
+class FakeChatModel(BaseChatModel):
+    """각 노드의 프롬프트에 결정적으로 답하는 벤치마크용 채팅 모델.
+
+    호출마다 latency만큼, 생성 토큰마다 token_latency만큼 기다려 실제 모델의
+    첫 토큰 지연과 생성 속도를 흉내 낸다.
+    """
+
+    latency: float = 0.05
+    token_latency: float = 0.005
+
+    @property
+    def _llm_type(self) -> str:
+        return "crag-bench-fake"
+
+    def _respond(self, messages: list[BaseMessage]) -> str:
+        text = str(messages[-1].content) if messages else ""
+        question = _field(text, "Question")
+
+        if text.rstrip().endswith("English query:"):
+            return question
+        if "relevant to the question? (yes/no)" in text:
+            body = text.split("Document:", 1)[-1].split("Documents:", 1)[-1]
+            return "yes" if _keywords(question) & _keywords(body) else "no"
+        if "Respond with DECISION and REASON" in text:
+            return "DECISION: yes\nREASON: 로컬 문서에 관련 정보가 없음"
+        if text.rstrip().endswith("Search queries (one per line):"):
+            return f"{question}\n{question} overview\n{question} best practices"
+        if text.rstrip().endswith("Markdown:"):
+            return re.sub(r"<[^>]+>", " ", text.split("HTML:", 1)[-1]).strip()
+
+        words = " ".join(random.Random(question).choices(_WORDS, k=40))
+        return f"<think>{question}</think>Based on the context, {question} relates to {words}."
+
+    def _tokens(self, messages: list[BaseMessage]) -> list[str]:
+        return re.findall(r"\S+\s*", self._respond(messages))
+
+    @staticmethod
+    def _usage(messages: list[BaseMessage], output_tokens: int) -> dict:
+        input_tokens = sum(len(str(m.content).split()) for m in messages)
+        return {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        tokens = self._tokens(messages)
+        time.sleep(self.latency + self.token_latency * len(tokens))
+        message = AIMessage(
+            content="".join(tokens), usage_metadata=self._usage(messages, len(tokens))
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        tokens = self._tokens(messages)
+        await asyncio.sleep(self.latency + self.token_latency * len(tokens))
+        message = AIMessage(
+            content="".join(tokens), usage_metadata=self._usage(messages, len(tokens))
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.latency)
+        tokens = self._tokens(messages)
+        for token in tokens:
+            time.sleep(self.token_latency)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+        usage = self._usage(messages, len(tokens))
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=usage))
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.latency)
+        tokens = self._tokens(messages)
+        for token in tokens:
+            await asyncio.sleep(self.token_latency)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+        usage = self._usage(messages, len(tokens))
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=usage))
+
+
+def synthetic_page(query: str, index: int, paragraphs: int = 8) -> str:
+    """내비게이션, 광고, 푸터가 섞인 기사형 HTML 페이지."""
+    rng = random.Random(f"{query}\0{index}")
+    title = f"{query.title()} - part {index + 1}"
+    body = "\n".join(
+        f"<p>{escape(query)} {' '.join(rng.choices(_WORDS, k=60))}.</p>"
+        for _ in range(paragraphs)
+    )
+    links = "".join(f'<li><a href="/{w}">{w}</a></li>' for w in rng.sample(_WORDS, 12))
+    return f"""<!doctype html>
+<html><head><title>{escape(title)}</title><script>var tracking = {index};</script></head>
+<body>
+<nav class="navbar"><ul>{links}</ul></nav>
+<div class="ad-banner">Sponsored: {' '.join(rng.choices(_WORDS, k=10))}</div>
+<main><article>
+<h1>{escape(title)}</h1>
+{body}
+<h2>Example</h2>
+<pre><code>client.search("{escape(query)}", k={index + 3})</code></pre>
+<ul><li>{escape(query)} first point</li><li>{escape(query)} second point</li></ul>
+</article></main>
+<footer class="site-footer">Copyright {' '.join(rng.choices(_WORDS, k=20))}</footer>
+</body></html>"""
+
+
+class FakeWebServer:
+    """LocalSearchStrategy의 검색 API와 검색 결과 페이지를 함께 흉내 내는 로컬 서버.
+
+    - GET /search?q=...&format=json -> {"results": [{"title", "href", "content"}]}
+    - GET /page/<n>?q=... -> synthetic_page(q, n)
+
+    latency만큼 기다린 뒤 응답해 네트워크 지연을 흉내 낸다.
+    """
+
+    def __init__(self, latency: float = 0.02, results_per_query: int = 5) -> None:
+        self.latency = latency
+        self.results_per_query = results_per_query
+        self.requests = 0
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                server.requests += 1
+                time.sleep(server.latency)
+                parts = urlsplit(self.path)
+                query = parse_qs(parts.query).get("q", [""])[0]
+
+                if parts.path == "/search":
+                    results = [
+                        {
+                            "title": f"{query.title()} - part {i + 1}",
+                            "href": f"{server.url}/page/{i}?q={quote(query)}",
+                            "content": f"{query} snippet {i + 1}",
+                        }
+                        for i in range(server.results_per_query)
+                    ]
+                    self._send("application/json", json.dumps({"results": results}))
+                elif parts.path.startswith("/page/"):
+                    index = int(parts.path.rsplit("/", 1)[-1] or 0)
+                    self._send("text/html; charset=utf-8", synthetic_page(query, index))
+                else:
+                    self.send_error(404)
+
+            def _send(self, content_type: str, text: str) -> None:
+                data = text.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+    def __enter__(self) -> "FakeWebServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def synthetic_corpus(count: int, seed: int = 0) -> list[Document]:
+    """로컬 주제(_TOPICS)에 대한 결정적인 문서 묶음."""
+    rng = random.Random(seed)
+    documents = []
+    for i in range(count):
+        topic = _TOPICS[i % len(_TOPICS)]
+        sentences = [
+            f"{topic.capitalize()} {' '.join(rng.choices(_WORDS, k=rng.randint(12, 30)))}."
+            for _ in range(rng.randint(10, 40))
+        ]
+        documents.append(
+            Document(
+                page_content=" ".join(sentences),
+                metadata={"source": f"bench/{topic.replace(' ', '_')}_{i}.md"},
+            )
+        )
+    return documents
+
+
+def synthetic_questions(count: int, web_ratio: float = 0.5) -> list[str]:
+    """로컬 코퍼스로 답할 수 있는 질문과 웹 검색이 필요한 질문을 섞는다."""
+    questions = []
+    web_every = round(1 / web_ratio) if web_ratio > 0 else 0
+    for i in range(count):
+        if web_every and i % web_every == web_every - 1:
+            topic = _WEB_TOPICS[i % len(_WEB_TOPICS)]
+        else:
+            topic = _TOPICS[i % len(_TOPICS)]
+        questions.append(f"how does {topic} work #{i}")
+    return questions
+
+
+@dataclass
+class StageResult:
+    name: str
+    latencies: list[float] = field(default_factory=list)
+    elapsed: float = 0.0
+    items: int = 0
+    unit: str = "ops"
+
+    @property
+    def throughput(self) -> float:
+        return self.items / self.elapsed if self.elapsed > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "calls": len(self.latencies),
+            "items": self.items,
+            "unit": self.unit,
+            "elapsed": round(self.elapsed, 4),
+            "throughput": round(self.throughput, 3),
+            **{
+                f"p{p}_ms": round(percentile(self.latencies, p) * 1000, 3)
+                for p in (50, 95, 99)
+            },
+        }
+
+
+def measure(
+    name: str,
+    fn: Callable[[Any], Any],
+    inputs: list,
+    unit: str = "ops",
+    size: Callable[[Any], int] = lambda _: 1,
+) -> StageResult:
+    """inputs 각각에 fn을 순서대로 호출하며 호출당 지연 시간을 잰다."""
+    result = StageResult(name=name, unit=unit)
+    start = time.perf_counter()
+    for item in inputs:
+        t0 = time.perf_counter()
+        fn(item)
+        result.latencies.append(time.perf_counter() - t0)
+        result.items += size(item)
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def measure_import(module: str, repeat: int = 3) -> StageResult:
+    """새 인터프리터에서 module을 import하는 시간 (CLI 시작 비용)."""
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    result = StageResult(name=f"import {module}", unit="imports")
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        result.latencies.append(float(output.stdout.split()[-1]))
+        result.items += 1
+    result.elapsed = sum(result.latencies)
+    return result
+
+
+async def measure_graph(
+    graph, questions: list[str], concurrency: int = 4
+) -> tuple[StageResult, dict[str, list[float]]]:
+    """질문들을 concurrency개씩 동시에 실행하며 질문별 지연과 노드별 소요 시간을 잰다."""
+    from crag.batch import _answer
+
+    result = StageResult(name="graph", unit="questions")
+    node_seconds: dict[str, list[float]] = {}
+    slots = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(question: str) -> None:
+        async with slots:
+            t0 = time.perf_counter()
+            _, timings = await _answer(graph, question)
+            result.latencies.append(time.perf_counter() - t0)
+            result.items += 1
+            for timing in timings:
+                node_seconds.setdefault(timing["node"], []).append(timing["seconds"])
+
+    from crag.graph.nodes.html_fetcher import aclose_async_client
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(run(q) for q in questions))
+    finally:
+        await aclose_async_client()
+    result.elapsed = time.perf_counter() - start
+    return result, node_seconds
+
+
+def retrieval_agreement(reference: tuple, candidate: tuple, k: int = 4) -> dict:
+    """두 임베딩 백엔드의 (문서 임베딩, 질문 임베딩)을 비교한다. 임베딩은 정규화되어 있어야 한다.
+
+    cosine은 같은 문서에 대한 두 임베딩의 평균 코사인 유사도, overlap은 질문마다
+    상위 k개 문서가 기준 백엔드와 겹치는 비율의 평균이다. 문서가 k개보다 적으면
+    k를 문서 수로 줄이고, 실제로 쓴 k를 함께 반환한다.
+    """
+    import numpy as np
+
+    ref_docs, ref_queries = reference
+    docs, queries = candidate
+    k = min(k, len(docs))
+    cosine = float(np.mean(np.sum(ref_docs * docs, axis=1)))
+    ref_top = np.argsort(-(ref_queries @ ref_docs.T), axis=1)[:, :k]
+    top = np.argsort(-(queries @ docs.T), axis=1)[:, :k]
+    overlap = float(np.mean([len(set(a) & set(b)) / k for a, b in zip(ref_top, top)]))
+    return {"cosine": round(cosine, 5), "overlap": round(overlap, 4), "k": k}
@@ -0,0 +1,191 @@
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from crag.config.settings import settings
+from crag.tracing import tracer
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    question TEXT NOT NULL,
+    embedding BLOB NOT NULL,
+    generation TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS stats (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def invalidate_answers(path: Path | None = None) -> int:
+    """저장된 답변을 모두 지우고 지운 수를 반환한다 (문서가 바뀌어 답변이 낡았을 때).
+
+    임베딩 모델 없이 DB만 연다. 실행 중인 서버/워커의 캐시는 지워진 행을 찾지 못해
+    미스로 처리하므로 다시 열 필요가 없다.
+    """
+    path = path or settings.answer_cache_path
+    if not path.exists():
+        return 0
+    conn = sqlite3.connect(str(path))
+    try:
+        conn.executescript(_SCHEMA)
+        deleted = conn.execute("DELETE FROM answers").rowcount
+        conn.commit()
+    finally:
+        conn.close()
+    return deleted
+
+
+class SemanticAnswerCache:
+    """질문 임베딩 유사도로 이전 답변을 재사용하는 캐시.
+
+    유사도가 threshold 이상이고 TTL이 지나지 않은 항목이 있으면 히트.
+    max_entries를 넘으면 가장 오래 사용되지 않은 항목부터 지운다.
+    model이 없으면 처음 임베딩할 때 공용 임베딩 모델을 로드한다 (통계/비우기만 할 때).
+    """
+
+    def __init__(
+        self,
+        model: "SentenceTransformer | None" = None,
+        path: Path | None = None,
+        threshold: float | None = None,
+        ttl: float | None = None,
+        max_entries: int | None = None,
+    ) -> None:
+        self._model = model
+        self._path = path or settings.answer_cache_path
+        self._threshold = threshold if threshold is not None else settings.answer_cache_threshold
+        self._ttl = ttl if ttl is not None else settings.answer_cache_ttl
+        self._max_entries = max_entries or settings.answer_cache_max_entries
+        self._lock = threading.Lock()
+
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self._path), check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+
+        self.hits = 0
+        self.misses = 0
+
+        self._ids: list[int] = []
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._load()
+
+    def _load(self) -> None:
+        self._expire()
+        rows = self._conn.execute("SELECT id, embedding FROM answers ORDER BY id").fetchall()
+        self._ids = [row[0] for row in rows]
+        if rows:
+            self._matrix = np.stack([np.frombuffer(row[1], dtype=np.float32) for row in rows])
+        else:
+            self._matrix = np.zeros((0, 0), dtype=np.float32)
+
+    def _expire(self) -> None:
+        if self._ttl > 0:
+            self._conn.execute(
+                "DELETE FROM answers WHERE created_at < ?", (time.time() - self._ttl,)
+            )
+            self._conn.commit()
+
+    def _embed(self, question: str) -> np.ndarray:
+        if self._model is None:
+            from crag.vectorstore.embeddings import get_embedding_model
+
+            self._model = get_embedding_model()
+        return self._model.encode([question], normalize_embeddings=True)[0].astype(np.float32)
+
+    def _count(self, name: str) -> None:
+        tracer.increment(f"answer_cache_{name}")
+        self._conn.execute(
+            "INSERT INTO stats (name, value) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,),
+        )
+        self._conn.commit()
+
+    def get(self, question: str) -> tuple[str, float] | None:
+        """캐시된 답변과 유사도를 반환한다. 없으면 None."""
+        embedding = self._embed(question)
+        with self._lock:
+            if not self._ids:
+                self.misses += 1
+                self._count("misses")
+                return None
+
+            scores = self._matrix @ embedding
+            best = int(np.argmax(scores))
+            score = float(scores[best])
+            row = None
+            if score >= self._threshold:
+                row = self._conn.execute(
+                    "SELECT generation, created_at FROM answers WHERE id = ?",
+                    (self._ids[best],),
+                ).fetchone()
+
+            if row is None or (self._ttl > 0 and row[1] < time.time() - self._ttl):
+                if score >= self._threshold:
+                    # 만료됐거나 다른 프로세스가 지운 항목이 계속 가장 가깝게 나오지 않도록
+                    self._load()
+                self.misses += 1
+                self._count("misses")
+                return None
+
+            self._conn.execute(
+                "UPDATE answers SET last_used = ? WHERE id = ?",
+                (time.time(), self._ids[best]),
+            )
+            self.hits += 1
+            self._count("hits")
+            logger.info("[Answer Cache] Hit (similarity %.3f)", score)
+            return row[0], score
+
+    def put(self, question: str, generation: str) -> None:
+        embedding = self._embed(question)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO answers (question, embedding, generation, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (question, embedding.tobytes(), generation, now, now),
+            )
+            # LRU: 오래 사용되지 않은 항목부터 삭제
+            self._conn.execute(
+                "DELETE FROM answers WHERE id NOT IN "
+                "(SELECT id FROM answers ORDER BY last_used DESC LIMIT ?)",
+                (self._max_entries,),
+            )
+            self._conn.commit()
+            self._load()
+
+    def stats(self) -> dict[str, int]:
+        """현재 프로세스와 누적 히트/미스 수."""
+        with self._lock:
+            totals = dict(self._conn.execute("SELECT name, value FROM stats").fetchall())
+            entries = self._conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "total_hits": totals.get("hits", 0),
+            "total_misses": totals.get("misses", 0),
+            "entries": entries,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM answers")
+            self._conn.execute("DELETE FROM stats")
+            self._conn.commit()
+            self._load()
@@ -0,0 +1,200 @@
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from crag.config.settings import settings
+from crag.tracing import tracer
+from crag.utils import content_hash
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS vectors (
+    key TEXT PRIMARY KEY,
+    row INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class EmbeddingCache:
+    """텍스트 해시로 임베딩을 재사용하는 디스크 캐시.
+
+    모델(과 저장 dtype)마다 디렉터리를 따로 두고, 벡터는 (행, 차원) 배열로 파일에 이어 붙여
+    memmap으로 읽는다. 텍스트 해시 -> 행 번호는 SQLite 색인에 둔다.
+    질문 벡터는 프로세스 내 LRU에도 둔다.
+    """
+
+    def __init__(
+        self,
+        model_id: str,
+        path: Path | None = None,
+        dtype: str | None = None,
+        memory_size: int | None = None,
+    ) -> None:
+        self._dtype = np.dtype(dtype or settings.embedding_cache_dtype)
+        self._dir = (path or settings.embedding_cache_dir) / content_hash(
+            model_id, self._dtype.name
+        )[:16]
+        self._memory_size = memory_size or settings.embedding_cache_memory_size
+        self._memory: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self._view: np.ndarray | None = None
+
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._data_path = self._dir / "vectors.bin"
+        self._data_path.touch()
+        # 여러 프로세스가 같은 파일에 쓰므로 BEGIN IMMEDIATE로 직접 트랜잭션을 잡는다
+        self._conn = sqlite3.connect(
+            str(self._dir / "index.sqlite3"), check_same_thread=False, isolation_level=None
+        )
+        self._conn.executescript(_SCHEMA)
+        self._conn.execute(
+            "INSERT OR IGNORE INTO meta (name, value) VALUES ('model_id', ?)", (model_id,)
+        )
+        self._discard_partial_write()
+
+        self.hits = 0
+        self.misses = 0
+
+    def _dim(self) -> int | None:
+        row = self._conn.execute("SELECT value FROM meta WHERE name = 'dim'").fetchone()
+        return int(row[0]) if row else None
+
+    def _discard_partial_write(self) -> None:
+        """색인에 기록되기 전에 중단된 쓰기가 파일 끝에 남긴 벡터를 잘라낸다."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                dim = self._dim()
+                rows = self._conn.execute("SELECT COUNT(*) FROM vectors").fetchone()[0]
+                expected = rows * (dim or 0) * self._dtype.itemsize
+                if self._data_path.stat().st_size > expected:
+                    with self._data_path.open("r+b") as f:
+                        f.truncate(expected)
+            finally:
+                self._conn.execute("COMMIT")
+
+    def _lookup(self, keys: list[str]) -> dict[str, int]:
+        found: dict[str, int] = {}
+        for start in range(0, len(keys), 500):
+            batch = keys[start : start + 500]
+            marks = ",".join("?" * len(batch))
+            found.update(
+                self._conn.execute(
+                    f"SELECT key, row FROM vectors WHERE key IN ({marks})", batch
+                ).fetchall()
+            )
+        return found
+
+    def _read(self, rows: list[int]) -> np.ndarray:
+        needed = max(rows) + 1
+        if self._view is None or len(self._view) < needed:
+            dim = self._dim()
+            count = self._data_path.stat().st_size // (dim * self._dtype.itemsize)
+            self._view = np.memmap(
+                self._data_path, dtype=self._dtype, mode="r", shape=(count, dim)
+            )
+        return np.asarray(self._view[rows], dtype=np.float32)
+
+    def _append(self, keys: list[str], vectors: np.ndarray) -> None:
+        vectors = np.asarray(vectors, dtype=self._dtype)
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            # 다른 프로세스가 그 사이에 같은 텍스트를 넣었을 수 있다
+            existing = self._lookup(keys)
+            new = [i for i, key in enumerate(keys) if key not in existing]
+            if new:
+                dim = self._dim()
+                if dim is None:
+                    dim = vectors.shape[1]
+                    self._conn.execute(
+                        "INSERT INTO meta (name, value) VALUES ('dim', ?)", (str(dim),)
+                    )
+                rows = self._conn.execute("SELECT COUNT(*) FROM vectors").fetchone()[0]
+                with self._data_path.open("r+b") as f:
+                    f.seek(rows * dim * self._dtype.itemsize)
+                    f.write(vectors[new].tobytes())
+                self._conn.executemany(
+                    "INSERT INTO vectors (key, row) VALUES (?, ?)",
+                    [(keys[i], rows + offset) for offset, i in enumerate(new)],
+                )
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def encode(
+        self, model: "SentenceTransformer", texts: list[str], batch_size: int | None = None
+    ) -> np.ndarray:
+        """texts의 임베딩 (float32). 캐시에 없는 텍스트만 모아 배치로 모델에 넣는다."""
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        keys = [content_hash(text) for text in texts]
+        unique = list(dict.fromkeys(keys))
+        with self._lock:
+            found = self._lookup(unique)
+        missing = {key: text for key, text in zip(keys, texts) if key not in found}
+
+        if missing:
+            # 모델 추론은 잠금 밖에서 실행해 다른 스레드의 캐시 조회를 막지 않는다
+            vectors = model.encode(
+                list(missing.values()),
+                batch_size=batch_size or settings.embedding_batch_size,
+            )
+            with self._lock:
+                self._append(list(missing), vectors)
+                found = self._lookup(unique)
+
+        hits = len(keys) - len(missing)
+        self.hits += hits
+        self.misses += len(missing)
+        tracer.increment("embedding_cache_hits", hits)
+        tracer.increment("embedding_cache_misses", len(missing))
+        with self._lock:
+            return self._read([found[key] for key in keys])
+
+    def encode_query(self, model: "SentenceTransformer", query: str) -> np.ndarray:
+        """질문 하나의 임베딩. 프로세스 내 LRU를 먼저 본다."""
+        key = content_hash(query)
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                tracer.increment("embedding_cache_hits")
+                return vector
+
+        vector = self.encode(model, [query])[0]
+        with self._lock:
+            self._memory[key] = vector
+            while len(self._memory) > self._memory_size:
+                self._memory.popitem(last=False)
+        return vector
+
+    def entry_count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM vectors").fetchone()[0]
+
+    def size_bytes(self) -> int:
+        return self._data_path.stat().st_size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM vectors")
+                self._conn.execute("DELETE FROM meta WHERE name = 'dim'")
+                self._data_path.write_bytes(b"")
+            finally:
+                self._conn.execute("COMMIT")
+            self._memory.clear()
+            self._view = None
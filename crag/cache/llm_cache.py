@@ -0,0 +1,167 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.language_models import BaseChatModel
+from langchain_core.load import dumps, loads
+
+from crag.config.settings import settings
+from crag.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used);
+CREATE TABLE IF NOT EXISTS node_stats (
+    node TEXT PRIMARY KEY,
+    hits INTEGER NOT NULL DEFAULT 0,
+    misses INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+# 삽입할 때마다 크기를 확인하지 않고 이 횟수마다 한 번 정리
+_EVICT_EVERY = 50
+
+
+class SQLiteLLMCache(BaseCache):
+    """모델 설정(llm_string)과 프롬프트로 LLM 응답을 저장하는 SQLite 캐시.
+
+    max_entries를 넘으면 가장 오래 사용되지 않은 응답부터 지운다.
+    """
+
+    def __init__(self, path: Path | None = None, max_entries: int | None = None) -> None:
+        self._path = path or settings.llm_cache_path
+        self._max_entries = max_entries or settings.llm_cache_max_entries
+        self._lock = threading.Lock()
+        self._inserts = 0
+
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self._path), check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+
+        self.hits: dict[str, int] = defaultdict(int)
+        self.misses: dict[str, int] = defaultdict(int)
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\0{prompt}".encode()).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        key = self._key(prompt, llm_string)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+        try:
+            return loads(row[0])
+        except Exception as e:
+            logger.warning("[LLM Cache] Dropping unreadable entry: %s", e)
+            return None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        key = self._key(prompt, llm_string)
+        value = dumps(list(return_val))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, last_used) VALUES (?, ?, ?)",
+                (key, value, time.time()),
+            )
+            self._inserts += 1
+            if self._inserts % _EVICT_EVERY == 0:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        if count <= self._max_entries:
+            return
+        self._conn.execute(
+            "DELETE FROM responses WHERE key IN "
+            "(SELECT key FROM responses ORDER BY last_used ASC LIMIT ?)",
+            (count - self._max_entries,),
+        )
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.execute("DELETE FROM node_stats")
+            self._conn.commit()
+        self.hits.clear()
+        self.misses.clear()
+
+    def record(self, node: str, hit: bool) -> None:
+        (self.hits if hit else self.misses)[node] += 1
+        column = "hits" if hit else "misses"
+        tracer.increment(f"llm_cache_{column}", node=node)
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO node_stats (node, {column}) VALUES (?, 1) "
+                f"ON CONFLICT(node) DO UPDATE SET {column} = {column} + 1",
+                (node,),
+            )
+            self._conn.commit()
+
+    def for_node(self, node: str) -> "NodeLLMCache":
+        return NodeLLMCache(self, node)
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """노드별 누적 히트/미스 수."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT node, hits, misses FROM node_stats ORDER BY node"
+            ).fetchall()
+        return {node: {"hits": hits, "misses": misses} for node, hits, misses in rows}
+
+    def entry_count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+class NodeLLMCache(BaseCache):
+    """공유 캐시를 쓰면서 노드별 히트율을 기록하는 뷰."""
+
+    def __init__(self, cache: SQLiteLLMCache, node: str) -> None:
+        self._cache = cache
+        self._node = node
+
+    def lookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        value = self._cache.lookup(prompt, llm_string)
+        self._cache.record(self._node, value is not None)
+        return value
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        self._cache.update(prompt, llm_string, return_val)
+
+    def clear(self, **kwargs: Any) -> None:
+        self._cache.clear(**kwargs)
+
+
+def with_node_cache(
+    llm: BaseChatModel, cache: SQLiteLLMCache | None, node: str
+) -> BaseChatModel:
+    """노드 전용 캐시를 붙인 LLM 사본을 반환한다.
+
+    캐시가 없으면 원본을, 제외 목록에 있는 노드면 캐시를 끈 사본을 반환한다.
+    """
+    if cache is None:
+        return llm
+    if node in settings.llm_cache_exclude_nodes:
+        return llm.model_copy(update={"cache": False})
+    return llm.model_copy(update={"cache": cache.for_node(node)})
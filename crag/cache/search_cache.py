@@ -0,0 +1,162 @@
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from crag.config.settings import settings
+from crag.tracing import tracer
+from crag.web.search import SearchResult, WebSearchStrategy
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+def normalize_query(query: str) -> str:
+    """대소문자, 공백, 앞뒤 구두점 차이를 무시한 검색어."""
+    query = re.sub(r"\s+", " ", query.strip().lower())
+    return query.strip(" \"'.,;:!?")
+
+
+class CachedSearchStrategy(WebSearchStrategy):
+    """다른 검색 전략의 결과를 TTL 동안 캐시하는 데코레이터 전략.
+
+    실패나 빈 결과는 negative_ttl 동안만 캐시해 불안정한 백엔드를 반복 호출하지 않는다.
+    결과는 프로세스 내 LRU와 SQLite에 함께 저장되어 CLI 실행 간에도 유지된다.
+    """
+
+    def __init__(
+        self,
+        strategy: WebSearchStrategy,
+        path: Path | None = None,
+        ttl: float | None = None,
+        negative_ttl: float | None = None,
+        memory_size: int | None = None,
+    ) -> None:
+        self._strategy = strategy
+        self._path = path or settings.search_cache_path
+        self._ttl = ttl if ttl is not None else settings.search_cache_ttl
+        self._negative_ttl = (
+            negative_ttl if negative_ttl is not None else settings.search_cache_negative_ttl
+        )
+        self._memory_size = memory_size or settings.search_cache_memory_size
+        self._memory: OrderedDict[str, tuple[float, list[SearchResult]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self._path), check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache_namespace(self) -> str:
+        return self._strategy.cache_namespace
+
+    def _key(self, query: str, max_results: int) -> str:
+        return f"{self._strategy.cache_namespace}\0{max_results}\0{normalize_query(query)}"
+
+    def _remember(self, key: str, expires_at: float, results: list[SearchResult]) -> None:
+        self._memory[key] = (expires_at, results)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._memory_size:
+            self._memory.popitem(last=False)
+
+    def _lookup(self, key: str) -> list[SearchResult] | None:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    return entry[1]
+                del self._memory[key]
+
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+
+            results = [SearchResult(**item) for item in json.loads(row[0])]
+            self._remember(key, row[1], results)
+            return results
+
+    def _store(self, key: str, results: list[SearchResult]) -> None:
+        ttl = self._ttl if results else self._negative_ttl
+        if ttl <= 0:
+            return
+        expires_at = time.time() + ttl
+        value = json.dumps([r.to_dict() for r in results], ensure_ascii=False)
+        with self._lock:
+            self._remember(key, expires_at, results)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at),
+            )
+            self._conn.commit()
+
+    def search(self, query: str, max_results: int = 5) -> list[SearchResult]:
+        key = self._key(query, max_results)
+        cached = self._lookup(key)
+        if cached is not None:
+            self.hits += 1
+            tracer.increment("search_cache_hits")
+            logger.debug("[Search Cache] Hit: %s", query)
+            return list(cached)
+
+        self.misses += 1
+        tracer.increment("search_cache_misses")
+        try:
+            results = self._strategy.search(query, max_results)
+        except Exception as e:
+            logger.warning("[Search Cache] '%s' failed: %s", query, e)
+            results = []
+        self._store(key, results)
+        return results
+
+    async def asearch(self, query: str, max_results: int = 5) -> list[SearchResult]:
+        key = self._key(query, max_results)
+        cached = self._lookup(key)
+        if cached is not None:
+            self.hits += 1
+            tracer.increment("search_cache_hits")
+            logger.debug("[Search Cache] Hit: %s", query)
+            return list(cached)
+
+        self.misses += 1
+        tracer.increment("search_cache_misses")
+        try:
+            results = await self._strategy.asearch(query, max_results)
+        except Exception as e:
+            logger.warning("[Search Cache] '%s' failed: %s", query, e)
+            results = []
+        self._store(key, results)
+        return results
+
+    def entry_count(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM results WHERE expires_at > ?", (time.time(),)
+            ).fetchone()[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._conn.execute("DELETE FROM results")
+            self._conn.commit()
@@ -12,6 +12,75 @@ logging.basicConfig(
 app = typer.Typer(help="CRAG CLI - Corrective RAG 시스템")
 
 
+def _check_ollama() -> bool:
+    import httpx
+
+    from crag.config.settings import settings
+
+    try:
+        response = httpx.get(f"{settings.ollama_base_url}/api/tags", timeout=5.0)
+        return response.status_code == 200
+    except httpx.ConnectError:
+        return False
+
+
+def _ensure_llm_available() -> None:
+    from crag.config.settings import settings
+
+    if settings.llm_provider == "ollama" and not _check_ollama():
+        typer.echo(f"Error: Ollama is not running at {settings.ollama_base_url}")
+        raise typer.Exit(1)
+
+
+def _get_llm():
+    from crag.config.settings import settings
+
+    if settings.llm_provider == "openai":
+        from langchain_openai import ChatOpenAI
+
+        return ChatOpenAI(model=settings.openai_model)
+
+    from langchain_ollama import ChatOllama
+
+    return ChatOllama(
+        model=settings.ollama_model,
+        base_url=settings.ollama_base_url,
+    )
+
+
+def _get_search_strategy():
+    from crag.config.settings import settings
+    from crag.web.search import LocalSearchStrategy
+
+    strategy = LocalSearchStrategy()
+    if settings.search_cache_enabled:
+        from crag.cache.search_cache import CachedSearchStrategy
+
+        return CachedSearchStrategy(strategy)
+    return strategy
+
+
+def _build_graph():
+    """LLM, 벡터스토어, 검색 전략, LLM 캐시를 연결한 그래프를 만든다."""
+    from crag.config.settings import settings
+    from crag.graph.builder import build_graph
+    from crag.vectorstore.store import VectorStore
+
+    llm_cache = None
+    if settings.llm_cache_enabled:
+        from crag.cache.llm_cache import SQLiteLLMCache
+
+        llm_cache = SQLiteLLMCache()
+
+    if settings.trace_path is not None:
+        from crag.tracing import JsonlExporter, tracer
+
+        tracer.add_exporter(JsonlExporter(settings.trace_path))
+
+    graph = build_graph(_get_llm(), VectorStore(), _get_search_strategy(), llm_cache=llm_cache)
+    return graph, llm_cache
+
+
 @app.command()
 def ingest(
     docs_dir: Path = typer.Option(
@@ -20,131 +89,775 @@ def ingest(
         "-d",
         help="문서 디렉토리 경로",
     ),
+    full: bool = typer.Option(
+        False,
+        "--full",
+        help="컬렉션을 비우고 모든 문서를 다시 인제스트",
+    ),
+    workers: int = typer.Option(
+        None,
+        "--workers",
+        "-w",
+        help="파일 읽기/변환 프로세스 수 (기본: INGEST_WORKERS)",
+    ),
 ) -> None:
-    """문서를 벡터스토어에 인제스트"""
-    from langchain_core.documents import Document
+    """문서를 벡터스토어에 인제스트 (기본: 변경된 파일만 동기화)
 
+    하위 디렉토리까지 txt, md, html, jsonl 파일을 찾는다.
+    """
+    from crag.vectorstore.loaders import iter_files
     from crag.vectorstore.store import VectorStore
+    from crag.vectorstore.sync import sync_documents
 
     if not docs_dir.exists():
         typer.echo(f"Documents directory not found: {docs_dir}")
         raise typer.Exit(1)
 
-    documents = []
-    for file_path in docs_dir.glob("*.txt"):
-        content = file_path.read_text(encoding="utf-8")
-        documents.append(
-            Document(
-                page_content=content,
-                metadata={"source": str(file_path), "filename": file_path.name},
-            )
-        )
-
-    if not documents:
+    files = list(iter_files(docs_dir))
+    if not files:
         typer.echo("No documents found.")
         raise typer.Exit(1)
 
-    typer.echo(f"Found {len(documents)} documents.")
+    def show(progress) -> None:
+        typer.echo(
+            f"\r  files {progress.files_done}/{progress.files_total}, "
+            f"documents {progress.documents} ({progress.rate:.1f} docs/s)",
+            nl=False,
+        )
+
+    typer.echo(f"Found {len(files)} files.")
     store = VectorStore()
-    store.clear()
-    store.add_documents(documents)
-    typer.echo("Ingestion complete.")
+    result = sync_documents(store, docs_dir, files, full=full, workers=workers, progress=show)
+    typer.echo()
+    typer.echo(
+        f"Ingestion complete. added: {len(result.added)}, "
+        f"updated: {len(result.updated)}, removed: {len(result.removed)}, "
+        f"unchanged: {result.unchanged}"
+        + (f", failed: {len(result.failed)}" if result.failed else "")
+    )
+
+    if result.added or result.updated or result.removed:
+        from crag.cache.answer_cache import invalidate_answers
+
+        # 문서가 바뀌었으므로 이전 문서로 만든 답변은 더 이상 쓰지 않는다
+        invalidated = invalidate_answers()
+        if invalidated:
+            typer.echo(f"Invalidated {invalidated} cached answers.")
+
+
+def _print_profile(collector, elapsed: float) -> None:
+    """tracer.collect()로 모은 span을 노드별로 요약해 출력한다."""
+    columns = (
+        "calls", "seconds", "llm_calls", "llm_seconds",
+        "prompt_tokens", "completion_tokens", "cache_hits",
+    )
+    nodes: dict[str, dict[str, float]] = {}
+    for span in collector.spans:
+        if span.name not in ("node", "llm"):
+            continue
+        row = nodes.setdefault(span.labels["node"], dict.fromkeys(columns, 0))
+        if span.name == "node":
+            row["calls"] += 1
+            row["seconds"] += span.duration
+        else:
+            row["llm_calls"] += 1
+            row["llm_seconds"] += span.duration
+            row["prompt_tokens"] += span.counts.get("prompt_tokens", 0)
+            row["completion_tokens"] += span.counts.get("completion_tokens", 0)
+    for (name, labels), value in collector.counters.items():
+        node = dict(labels).get("node")
+        if name == "llm_cache_hits" and node in nodes:
+            nodes[node]["cache_hits"] += value
+
+    typer.echo(f"\n{'=' * 50}")
+    typer.echo(f"Profile (total {elapsed * 1000:.0f}ms)")
+    typer.echo(
+        f"{'node':<18} {'calls':>5} {'ms':>9} {'llm':>4} {'llm ms':>9} "
+        f"{'prompt':>7} {'compl':>7} {'cached':>6}"
+    )
+    for node, row in sorted(nodes.items(), key=lambda item: -item[1]["seconds"]):
+        typer.echo(
+            f"{node:<18} {row['calls']:>5.0f} {row['seconds'] * 1000:>9.1f} "
+            f"{row['llm_calls']:>4.0f} {row['llm_seconds'] * 1000:>9.1f} "
+            f"{row['prompt_tokens']:>7.0f} {row['completion_tokens']:>7.0f} "
+            f"{row['cache_hits']:>6.0f}"
+        )
+
+    others: dict[str, dict[str, float]] = {}
+    for span in collector.spans:
+        if span.name in ("node", "llm"):
+            continue
+        name = span.name if "op" not in span.labels else f"{span.name}.{span.labels['op']}"
+        row = others.setdefault(name, {"calls": 0, "seconds": 0.0, "errors": 0})
+        row["calls"] += 1
+        row["seconds"] += span.duration
+        row["errors"] += span.error is not None
+        for key, value in span.counts.items():
+            row[key] = row.get(key, 0) + value
+    for name, row in sorted(others.items()):
+        extra = ", ".join(
+            f"{key} {value:.0f}"
+            for key, value in row.items()
+            if key not in ("calls", "seconds") and value
+        )
+        typer.echo(
+            f"  - {name}: calls {row['calls']:.0f}, {row['seconds'] * 1000:.1f}ms"
+            + (f", {extra}" if extra else "")
+        )
+
+
+class _RunPrinter:
+    """crag run의 진행 상황과 스트리밍 답변을 출력한다 (로컬 실행과 워커 전달 공용)."""
+
+    def __init__(self) -> None:
+        from crag.utils import ThinkTagFilter
+
+        self._think_filter = ThinkTagFilter()
+        self._shown_decision = False
+        self._streamed = False
+        self.state: dict = {}
+
+    def token(self, content: str) -> None:
+        # generate 노드의 토큰은 도착하는 대로 출력
+        text = self._think_filter.feed(content)
+        if not text:
+            return
+        if not self._streamed:
+            typer.echo(f"\n{'=' * 50}")
+            typer.echo("Answer:")
+            self._streamed = True
+        typer.echo(text, nl=False)
+
+    def node(self, node_name: str, state: dict) -> None:
+        """state는 crag.worker.node_summary 형식."""
+        self.state = state
+
+        # translate_query는 TRANSLATE_PARALLEL_RETRIEVE일 때 첫 검색까지 수행한다
+        if node_name == "retrieve" or (node_name == "translate_query" and state["documents"]):
+            typer.echo(f"\n[Retrieve] {state['documents']}개 문서 검색됨")
+
+        elif node_name == "rerank":
+            typer.echo(f"[Rerank] 상위 {state['documents']}개 문서 선택")
+
+        elif node_name == "compress_documents":
+            typer.echo(f"[Compress] {state['documents']}개 문서에서 관련 문장만 남김")
+
+        elif node_name == "grade_documents":
+            status = "관련 있음" if state["documents_relevant"] else "관련 없음"
+            typer.echo(f"[Grade] 문서 관련성: {status}")
+
+        elif node_name == "decide_web_search" and not self._shown_decision:
+            needs_search = state["needs_web_search"]
+            decision = "필요함" if needs_search else "불필요"
+            typer.echo("\n[Web Search Decision]")
+            typer.echo(f"  - 판단: 웹 서치 {decision}")
+            typer.echo(f"  - 이유: {state['web_search_reason']}")
+            if needs_search:
+                typer.echo("\n  -> 웹 서치 진행...")
+            else:
+                typer.echo("\n  -> 로컬 문서로 답변 생성...")
+            self._shown_decision = True
+
+        elif node_name == "web_search":
+            typer.echo(f"[Web Search] {state['web_search_results']}개 결과 수집됨")
+
+    def finish(self) -> None:
+        if self._streamed:
+            typer.echo(self._think_filter.flush())
+        else:
+            typer.echo(f"\n{'=' * 50}")
+            typer.echo(f"Answer:\n{self.state.get('generation', '')}")
+
+        if self.state.get("retry_count", 0) > 0:
+            typer.echo(f"\n(Web search was triggered, retries: {self.state['retry_count']})")
+
+
+def _echo_cached(question: str, generation: str, similarity: float) -> None:
+    typer.echo(f"Question: {question}")
+    typer.echo(f"\n{'=' * 50}")
+    typer.echo(f"Answer:\n{generation}")
+    typer.echo(f"\n(Cached answer, similarity: {similarity:.3f})")
+
+
+def _run_on_worker(sock, question: str, use_cache: bool) -> None:
+    """실행 중인 crag worker에 질문을 넘기고 결과를 출력한다."""
+    from crag.worker import ask
+
+    printer = _RunPrinter()
+    started = False
+    for event in ask(sock, question, use_cache):
+        if event["type"] == "cached":
+            _echo_cached(question, event["generation"], event["similarity"])
+            return
+        if event["type"] == "error":
+            typer.echo(f"Worker error: {event['message']}")
+            raise typer.Exit(1)
+        if not started and event["type"] in ("node", "token"):
+            typer.echo(f"Question: {question}")
+            typer.echo("-" * 50)
+            started = True
+        if event["type"] == "node":
+            printer.node(event["node"], event["state"])
+        elif event["type"] == "token":
+            printer.token(event["text"])
+    printer.finish()
 
 
 @app.command()
 def run(
     question: str = typer.Argument(..., help="질문"),
+    use_cache: bool = typer.Option(True, "--cache/--no-cache", help="답변 캐시 사용"),
+    profile: bool = typer.Option(False, "--profile", help="노드별 소요 시간과 토큰 수 출력"),
+    use_worker: bool = typer.Option(
+        True, "--worker/--no-worker", help="실행 중인 crag worker가 있으면 그쪽에서 실행"
+    ),
 ) -> None:
     """CRAG로 질문에 답변"""
-    import httpx
+    import time
+
+    # 워커가 떠 있으면 모델과 그래프를 로드하지 않고 바로 넘긴다
+    # (--profile은 이 프로세스의 span이 필요하므로 로컬에서 실행)
+    if use_worker and not profile:
+        from crag.worker import connect
+
+        sock = connect()
+        if sock is not None:
+            _run_on_worker(sock, question, use_cache)
+            return
 
     from crag.config.settings import settings
-    from crag.graph.builder import build_graph
+    from crag.models.state import initial_state
+    from crag.tracing import tracer
+    from crag.worker import node_summary
+
+    answer_cache = None
+    if use_cache and settings.answer_cache_enabled:
+        from crag.cache.answer_cache import SemanticAnswerCache
+        from crag.vectorstore.embeddings import get_embedding_model
+
+        answer_cache = SemanticAnswerCache(get_embedding_model())
+        cached = answer_cache.get(question)
+        if cached is not None:
+            _echo_cached(question, *cached)
+            return
+
+    # VectorStore는 Chroma 클라이언트와 임베딩 모델을 백그라운드에서 열기 시작하므로,
+    # Ollama 확인과 translate_query가 도는 동안 로드가 함께 진행된다
+    graph, llm_cache = _build_graph()
+    _ensure_llm_available()
+
+    typer.echo(f"Question: {question}")
+    typer.echo("-" * 50)
+
+    printer = _RunPrinter()
+    start = time.perf_counter()
+    with tracer.trace(), tracer.collect() as collector:
+        for mode, data in graph.stream(
+            initial_state(question), stream_mode=["updates", "messages"]
+        ):
+            if mode == "messages":
+                chunk, metadata = data
+                if metadata.get("langgraph_node") == "generate":
+                    printer.token(chunk.content)
+                continue
+            for node_name, node_output in data.items():
+                printer.node(node_name, node_summary(node_output))
+    printer.finish()
+
+    generation = printer.state.get("generation", "")
+    if answer_cache is not None and generation:
+        answer_cache.put(question, generation)
+
+    if profile:
+        _print_profile(collector, time.perf_counter() - start)
+
+    if llm_cache is not None and (llm_cache.hits or llm_cache.misses):
+        nodes = sorted(set(llm_cache.hits) | set(llm_cache.misses))
+        summary = ", ".join(
+            f"{node} {llm_cache.hits[node]}/{llm_cache.hits[node] + llm_cache.misses[node]}"
+            for node in nodes
+        )
+        logging.getLogger(__name__).info("[LLM Cache] hits: %s", summary)
+
+
+@app.command("run-batch")
+def run_batch(
+    input_path: Path = typer.Argument(..., help='질문 JSONL ({"id": ..., "question": ...})'),
+    output_path: Path = typer.Option(
+        Path("data/answers.jsonl"), "--output", "-o", help="답변 JSONL 경로"
+    ),
+    concurrency: int = typer.Option(4, "--concurrency", "-c", help="동시 실행 수"),
+    resume: bool = typer.Option(True, "--resume/--restart", help="이미 답변한 질문 건너뛰기"),
+    use_cache: bool = typer.Option(True, "--cache/--no-cache", help="답변 캐시 사용"),
+) -> None:
+    """JSONL 질문들을 동시에 답변하고 처리량/지연 시간 출력"""
+    import asyncio
+
+    from crag.batch import run_batch as run_questions
+    from crag.config.settings import settings
+    from crag.utils import percentile
 
-    def check_ollama() -> bool:
-        try:
-            response = httpx.get(f"{settings.ollama_base_url}/api/tags", timeout=5.0)
-            return response.status_code == 200
-        except httpx.ConnectError:
-            return False
+    if not input_path.exists():
+        typer.echo(f"Input file not found: {input_path}")
+        raise typer.Exit(1)
 
-    def get_llm():
-        if settings.llm_provider == "openai":
-            from langchain_openai import ChatOpenAI
+    graph, _ = _build_graph()
+    _ensure_llm_available()
 
-            return ChatOpenAI(model=settings.openai_model)
+    answer_cache = None
+    if use_cache and settings.answer_cache_enabled:
+        from crag.cache.answer_cache import SemanticAnswerCache
+        from crag.vectorstore.embeddings import get_embedding_model
 
-        from langchain_ollama import ChatOllama
+        answer_cache = SemanticAnswerCache(get_embedding_model())
 
-        return ChatOllama(
-            model=settings.ollama_model,
-            base_url=settings.ollama_base_url,
+    stats = asyncio.run(
+        run_questions(
+            graph,
+            input_path,
+            output_path,
+            concurrency=concurrency,
+            answer_cache=answer_cache,
+            resume=resume,
         )
+    )
 
-    if settings.llm_provider == "ollama" and not check_ollama():
-        typer.echo(f"Error: Ollama is not running at {settings.ollama_base_url}")
+    typer.echo(f"\n{'=' * 50}")
+    typer.echo(
+        f"Answered: {stats.answered} (cached: {stats.cached}), "
+        f"failed: {stats.failed}, skipped: {stats.skipped}"
+    )
+    if stats.elapsed > 0:
+        typer.echo(
+            f"Elapsed: {stats.elapsed:.1f}s, "
+            f"throughput: {stats.answered / stats.elapsed:.2f} questions/s"
+        )
+    if stats.latencies:
+        typer.echo(
+            "Latency: "
+            + ", ".join(
+                f"p{p} {percentile(stats.latencies, p):.2f}s" for p in (50, 90, 95, 99)
+            )
+        )
+    for node, seconds in sorted(stats.node_seconds.items()):
+        typer.echo(
+            f"  - {node}: calls {len(seconds)}, "
+            f"p50 {percentile(seconds, 50):.2f}s, p95 {percentile(seconds, 95):.2f}s"
+        )
+    typer.echo(f"Answers written to {output_path}")
+
+
+@app.command()
+def serve(
+    host: str = typer.Option(None, "--host", help="바인드 주소"),
+    port: int = typer.Option(None, "--port", "-p", help="포트"),
+    use_cache: bool = typer.Option(True, "--cache/--no-cache", help="답변 캐시 사용"),
+) -> None:
+    """모델과 그래프를 한 번 로드해 두고 HTTP로 질문을 받아 답변"""
+    import asyncio
+
+    from crag.config.settings import settings
+    from crag.server import CRAGServer
+
+    graph, _ = _build_graph()
+    _ensure_llm_available()
+
+    answer_cache = None
+    if use_cache and settings.answer_cache_enabled:
+        from crag.cache.answer_cache import SemanticAnswerCache
+        from crag.vectorstore.embeddings import get_embedding_model
+
+        answer_cache = SemanticAnswerCache(get_embedding_model())
+
+    server = CRAGServer(graph, answer_cache=answer_cache)
+    try:
+        asyncio.run(server.serve(host, port))
+    except KeyboardInterrupt:
+        pass
+
+
+@app.command()
+def worker(
+    use_cache: bool = typer.Option(True, "--cache/--no-cache", help="답변 캐시 사용"),
+) -> None:
+    """모델과 그래프를 메모리에 올려 두고 crag run 요청을 Unix 소켓으로 대신 처리"""
+    import asyncio
+
+    from crag.config.settings import settings
+    from crag.worker import CRAGWorker
+
+    graph, _ = _build_graph()
+    _ensure_llm_available()
+
+    answer_cache = None
+    if use_cache and settings.answer_cache_enabled:
+        from crag.cache.answer_cache import SemanticAnswerCache
+        from crag.vectorstore.embeddings import get_embedding_model
+
+        answer_cache = SemanticAnswerCache(get_embedding_model())
+
+    try:
+        asyncio.run(CRAGWorker(graph, answer_cache=answer_cache).serve())
+    except RuntimeError as e:
+        typer.echo(str(e))
         raise typer.Exit(1)
+    except KeyboardInterrupt:
+        pass
 
-    typer.echo(f"Question: {question}")
-    typer.echo("-" * 50)
 
+@app.command()
+def cache(
+    clear: bool = typer.Option(False, "--clear", help="캐시 비우기"),
+) -> None:
+    """캐시 통계 출력"""
+    from crag.cache.answer_cache import SemanticAnswerCache
+    from crag.cache.embedding_cache import EmbeddingCache
+    from crag.cache.llm_cache import SQLiteLLMCache
+    from crag.cache.search_cache import CachedSearchStrategy
+    from crag.vectorstore.embeddings import embedding_model_id
+    from crag.web.search import LocalSearchStrategy
+
+    # 통계와 비우기는 SQLite만 보므로 임베딩 모델을 로드하지 않는다
+    answer_cache = SemanticAnswerCache()
+    llm_cache = SQLiteLLMCache()
+    search_cache = CachedSearchStrategy(LocalSearchStrategy())
+    embedding_cache = EmbeddingCache(embedding_model_id())
+    if clear:
+        answer_cache.clear()
+        llm_cache.clear()
+        search_cache.clear()
+        embedding_cache.clear()
+        typer.echo("Caches cleared.")
+        return
+
+    stats = answer_cache.stats()
+    typer.echo(
+        f"[Answer Cache] entries: {stats['entries']}, "
+        f"hits: {stats['total_hits']}, misses: {stats['total_misses']}"
+    )
+
+    typer.echo(f"[LLM Cache] entries: {llm_cache.entry_count()}")
+    for node, counts in llm_cache.stats().items():
+        total = counts["hits"] + counts["misses"]
+        rate = counts["hits"] / total * 100 if total else 0.0
+        typer.echo(f"  - {node}: {counts['hits']}/{total} ({rate:.0f}%)")
+
+    typer.echo(f"[Search Cache] live entries: {search_cache.entry_count()}")
+    typer.echo(
+        f"[Embedding Cache] vectors: {embedding_cache.entry_count()}, "
+        f"size: {embedding_cache.size_bytes() / 1024 / 1024:.1f} MiB"
+    )
+
+
+@app.command("calibrate-grader")
+def calibrate_grader(
+    samples_path: Path = typer.Argument(
+        ..., help='JSONL 파일 ({"question": ..., "document": ..., "relevant": true})'
+    ),
+    precision: float = typer.Option(0.95, "--precision", help="빠른 판정의 목표 정밀도"),
+) -> None:
+    """라벨된 샘플로 채점 생략용 검색 점수 임계값 계산"""
+    import json
+
+    from crag.graph.nodes.grader import fit_score_thresholds
+    from crag.vectorstore.embeddings import get_embedding_model
+    from crag.vectorstore.store import distance_to_score
+
+    rows = [
+        json.loads(line)
+        for line in samples_path.read_text(encoding="utf-8").splitlines()
+        if line.strip()
+    ]
+    if not rows:
+        typer.echo("No samples found.")
+        raise typer.Exit(1)
+
+    model = get_embedding_model()
+    questions = model.encode([r["question"] for r in rows], normalize_embeddings=True)
+    documents = model.encode([r["document"] for r in rows], normalize_embeddings=True)
+    samples = [
+        (distance_to_score(1.0 - float(q @ d)), bool(r["relevant"]))
+        for q, d, r in zip(questions, documents, rows)
+    ]
+
+    high, low = fit_score_thresholds(samples, precision=precision)
+    relevant_count = sum(label for _, label in samples)
+    typer.echo(f"Samples: {len(samples)} (relevant: {relevant_count})")
+    if high is None and low is None:
+        typer.echo("No score band reaches the target precision; keep using the LLM grader.")
+        return
+
+    skipped = sum(
+        (high is not None and score >= high) or (low is not None and score <= low)
+        for score, _ in samples
+    )
+    typer.echo(f"LLM grading skipped for {skipped}/{len(samples)} samples")
+    if high is not None:
+        typer.echo(f"GRADER_RELEVANT_THRESHOLD={high:.4f}")
+    if low is not None:
+        typer.echo(f"GRADER_IRRELEVANT_THRESHOLD={low:.4f}")
+
+
+@app.command()
+def bench(
+    docs: int = typer.Option(200, "--docs", help="인제스트할 합성 문서 수"),
+    questions: int = typer.Option(20, "--questions", "-q", help="그래프에 넣을 질문 수"),
+    concurrency: int = typer.Option(4, "--concurrency", "-c", help="그래프 동시 실행 수"),
+    llm_latency: float = typer.Option(0.05, "--llm-latency", help="가짜 LLM 호출 지연(초)"),
+    token_latency: float = typer.Option(0.005, "--token-latency", help="가짜 LLM 토큰당 지연(초)"),
+    web_latency: float = typer.Option(0.02, "--web-latency", help="가짜 검색/페이지 서버 지연(초)"),
+    stages: list[str] = typer.Option(
+        ["import", "embedding", "ingest", "search", "html", "graph"],
+        "--stage",
+        "-s",
+        help="측정할 단계 (import, embedding, ingest, search, html, graph)",
+    ),
+    output: Path = typer.Option(None, "--output", "-o", help="결과를 JSON으로 저장"),
+) -> None:
+    """Ollama와 검색 서버 없이 가짜 LLM/검색/웹 페이지로 파이프라인 성능 측정"""
+    import asyncio
+    import json
+    import tempfile
+    import time
+
+    from crag.bench import (
+        FakeChatModel,
+        FakeWebServer,
+        StageResult,
+        measure,
+        measure_graph,
+        measure_import,
+        synthetic_corpus,
+        synthetic_page,
+        synthetic_questions,
+    )
+    from crag.graph.builder import build_graph
+    from crag.utils import percentile
+    from crag.vectorstore.embeddings import get_embedding_model
     from crag.vectorstore.store import VectorStore
+    from crag.web.extractor import extract_main_content
+    from crag.web.search import LocalSearchStrategy
 
-    llm = get_llm()
-    store = VectorStore()
-    graph = build_graph(llm, store)
-
-    initial_state = {
-        "question": question,
-        "search_query": question,
-        "web_search_queries": [],
-        "documents": [],
-        "web_search_results": [],
-        "generation": "",
-        "retry_count": 0,
-        "documents_relevant": False,
-        "needs_web_search": False,
-        "web_search_reason": "",
-    }
-
-    result = None
-    shown_decision = False
-
-    for event in graph.stream(initial_state):
-        for node_name, node_output in event.items():
-            result = node_output
-
-            if node_name == "retrieve":
-                doc_count = len(node_output.get("documents", []))
-                typer.echo(f"\n[Retrieve] {doc_count}개 문서 검색됨")
-
-            elif node_name == "grade_documents":
-                is_relevant = node_output.get("documents_relevant", False)
-                status = "관련 있음" if is_relevant else "관련 없음"
-                typer.echo(f"[Grade] 문서 관련성: {status}")
-
-            elif node_name == "decide_web_search" and not shown_decision:
-                needs_search = node_output.get("needs_web_search", False)
-                reason = node_output.get("web_search_reason", "")
-                decision = "필요함" if needs_search else "불필요"
-                typer.echo("\n[Web Search Decision]")
-                typer.echo(f"  - 판단: 웹 서치 {decision}")
-                typer.echo(f"  - 이유: {reason}")
-                if needs_search:
-                    typer.echo("\n  -> 웹 서치 진행...")
-                else:
-                    typer.echo("\n  -> 로컬 문서로 답변 생성...")
-                shown_decision = True
-
-            elif node_name == "web_search":
-                search_count = len(node_output.get("web_search_results", []))
-                typer.echo(f"[Web Search] {search_count}개 결과 수집됨")
+    unknown = set(stages) - {"import", "embedding", "ingest", "search", "html", "graph"}
+    if unknown:
+        typer.echo(f"Unknown stage: {', '.join(sorted(unknown))}")
+        raise typer.Exit(1)
 
-    typer.echo(f"\n{'=' * 50}")
-    typer.echo(f"Answer:\n{result['generation']}")
+    corpus = synthetic_corpus(docs)
+    question_set = synthetic_questions(questions)
+    results: list[StageResult] = []
+    node_seconds: dict[str, list[float]] = {}
+
+    if "import" in stages:
+        # crag run이 워커에 넘길 때와 직접 실행할 때 import하는 모듈
+        results.append(measure_import("crag.cli"))
+        results.append(measure_import("crag.graph.builder"))
+
+    with tempfile.TemporaryDirectory() as tmp, FakeWebServer(latency=web_latency) as web:
+        start = time.perf_counter()
+        model = get_embedding_model()
+        results.append(
+            StageResult("model_load", [time.perf_counter() - start], time.perf_counter() - start, 1)
+        )
+
+        if "embedding" in stages:
+            results.append(
+                measure("embedding", lambda q: model.encode([q]), question_set, unit="queries")
+            )
 
-    if result.get("retry_count", 0) > 0:
-        typer.echo(f"\n(Web search was triggered, retries: {result['retry_count']})")
+        # 합성 코퍼스가 실제 임베딩 캐시에 남지 않도록 캐시도 임시 디렉터리에 둔다
+        store = VectorStore(
+            persist_dir=Path(tmp),
+            collection_name="bench",
+            embedding_cache_dir=Path(tmp) / "embedding_cache",
+        )
+        batches = [corpus[i : i + 16] for i in range(0, len(corpus), 16)]
+        if "ingest" in stages:
+            results.append(measure("ingest", store.add_documents, batches, unit="docs", size=len))
+        elif {"search", "graph"} & set(stages):
+            store.add_documents(corpus)
+
+        if "search" in stages:
+            results.append(measure("search", store.search, question_set, unit="queries"))
+
+        if "html" in stages:
+            pages = [synthetic_page(q, i) for i, q in enumerate(question_set)]
+            results.append(measure("html", extract_main_content, pages, unit="pages"))
+
+        if "graph" in stages:
+            llm = FakeChatModel(latency=llm_latency, token_latency=token_latency)
+            graph = build_graph(llm, store, LocalSearchStrategy(web.url))
+            graph_result, node_seconds = asyncio.run(
+                measure_graph(graph, question_set, concurrency)
+            )
+            results.append(graph_result)
+
+    typer.echo(
+        f"{'stage':<24} {'calls':>6} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'throughput':>18}"
+    )
+    for result in results:
+        row = result.to_dict()
+        typer.echo(
+            f"{row['name']:<24} {row['calls']:>6} {row['p50_ms']:>10.1f} {row['p95_ms']:>10.1f} "
+            f"{row['p99_ms']:>10.1f} {row['throughput']:>10.2f} {result.unit + '/s':<8}"
+        )
+    for node, seconds in sorted(node_seconds.items()):
+        typer.echo(
+            f"  - {node}: calls {len(seconds)}, "
+            f"p50 {percentile(seconds, 50) * 1000:.1f}ms, p95 {percentile(seconds, 95) * 1000:.1f}ms"
+        )
+
+    if output is not None:
+        report = {
+            "config": {
+                "docs": docs,
+                "questions": questions,
+                "concurrency": concurrency,
+                "llm_latency": llm_latency,
+                "token_latency": token_latency,
+                "web_latency": web_latency,
+            },
+            "stages": [result.to_dict() for result in results],
+            "nodes": {
+                node: {
+                    "calls": len(seconds),
+                    **{
+                        f"p{p}_ms": round(percentile(seconds, p) * 1000, 3)
+                        for p in (50, 95, 99)
+                    },
+                }
+                for node, seconds in sorted(node_seconds.items())
+            },
+        }
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+        typer.echo(f"Results written to {output}")
+
+
+@app.command("bench-embeddings")
+def bench_embeddings(
+    backends: list[str] = typer.Option(
+        ["torch", "onnx", "onnx-int8"],
+        "--backend",
+        "-b",
+        help="비교할 임베딩 백엔드 (첫 번째가 일치도 기준)",
+    ),
+    docs: int = typer.Option(300, "--docs", help="인코딩할 합성 문서 수"),
+    questions: int = typer.Option(50, "--questions", "-q", help="질문 수"),
+    k: int = typer.Option(4, "--k", help="검색 일치도를 비교할 상위 문서 수"),
+    output: Path = typer.Option(None, "--output", "-o", help="결과를 JSON으로 저장"),
+) -> None:
+    """임베딩 백엔드(torch/ONNX/int8)의 인코딩 속도와 검색 결과 일치도 비교"""
+    import json
+    import time
+
+    from crag.bench import measure, retrieval_agreement, synthetic_corpus, synthetic_questions
+    from crag.config.settings import settings
+    from crag.vectorstore.embeddings import BACKENDS, load_embedding_model
+
+    unknown = set(backends) - set(BACKENDS)
+    if unknown:
+        typer.echo(f"Unknown backend: {', '.join(sorted(unknown))}")
+        raise typer.Exit(1)
+
+    texts = [doc.page_content for doc in synthetic_corpus(docs)]
+    question_set = synthetic_questions(questions)
+    batch_size = settings.embedding_batch_size
+
+    rows = []
+    reference = None
+    for backend in backends:
+        start = time.perf_counter()
+        model = load_embedding_model(backend)
+        load_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        doc_embeddings = model.encode(texts, batch_size=batch_size, normalize_embeddings=True)
+        encode_seconds = time.perf_counter() - start
+        query = measure(backend, lambda q: model.encode([q]), question_set, unit="queries")
+        query_embeddings = model.encode(
+            question_set, batch_size=batch_size, normalize_embeddings=True
+        )
+
+        row = {
+            "backend": backend,
+            "load_seconds": round(load_seconds, 3),
+            "docs_per_second": round(len(texts) / encode_seconds, 2),
+            "query_p50_ms": query.to_dict()["p50_ms"],
+            "query_p95_ms": query.to_dict()["p95_ms"],
+        }
+        if reference is None:
+            reference = (doc_embeddings, query_embeddings)
+        else:
+            row.update(retrieval_agreement(reference, (doc_embeddings, query_embeddings), k))
+        rows.append(row)
+
+    typer.echo(
+        f"{'backend':<12} {'load s':>8} {'docs/s':>10} {'query p50':>10} {'query p95':>10} "
+        f"{'cosine':>8} {f'overlap@{min(k, docs)}':>10}"
+    )
+    for row in rows:
+        cosine = row.get("cosine")
+        overlap = row.get("overlap")
+        typer.echo(
+            f"{row['backend']:<12} {row['load_seconds']:>8.2f} {row['docs_per_second']:>10.1f} "
+            f"{row['query_p50_ms']:>10.1f} {row['query_p95_ms']:>10.1f} "
+            f"{'-' if cosine is None else f'{cosine:.4f}':>8} "
+            f"{'-' if overlap is None else f'{overlap:.3f}':>10}"
+        )
+
+    if output is not None:
+        report = {
+            "config": {"docs": docs, "questions": questions, "k": k, "batch_size": batch_size},
+            "backends": rows,
+        }
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+        typer.echo(f"Results written to {output}")
+
+
+@app.command("bench-html")
+def bench_html(
+    sources: list[str] = typer.Argument(..., help="HTML 파일 경로 또는 URL"),
+    repeat: int = typer.Option(3, "--repeat", "-n", help="추출기 반복 횟수"),
+    with_llm: bool = typer.Option(False, "--llm", help="LLM 변환도 측정"),
+) -> None:
+    """HTML 본문 추출기와 LLM 변환의 속도/출력 크기 비교"""
+    import time
+
+    from crag.graph.nodes.html_fetcher import _fetch_html, _llm_html_to_markdown
+    from crag.web.extractor import extract_main_content, is_low_quality
+
+    llm = None
+    if with_llm:
+        _ensure_llm_available()
+        llm = _get_llm()
+
+    typer.echo(f"{'source':<40} {'html':>9} {'method':>9} {'chars':>8} {'ms':>10}")
+    for source in sources:
+        path = Path(source)
+        html = path.read_text(encoding="utf-8") if path.exists() else _fetch_html(source)
+        if not html:
+            typer.echo(f"{source[:40]:<40} (fetch failed)")
+            continue
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            markdown = extract_main_content(html)
+        elapsed = (time.perf_counter() - start) / repeat * 1000
+        flag = " (low)" if is_low_quality(markdown) else ""
+        typer.echo(
+            f"{source[:40]:<40} {len(html):>9} {'extract':>9} "
+            f"{len(markdown):>8} {elapsed:>10.1f}{flag}"
+        )
+
+        if llm is not None:
+            start = time.perf_counter()
+            markdown = _llm_html_to_markdown(html, llm)
+            elapsed = (time.perf_counter() - start) * 1000
+            typer.echo(
+                f"{'':<40} {'':>9} {'llm':>9} {len(markdown):>8} {elapsed:>10.1f}"
+            )
 
 
 if __name__ == "__main__":
@@ -23,17 +23,126 @@ class Settings(BaseSettings):
     # ChromaDB settings
     chroma_persist_dir: Path = Path("data/chroma_db")
     chroma_collection_name: str = "crag_documents"
+    upsert_batch_size: int = 256
 
     # Embedding model
     embedding_model: str = "intfloat/multilingual-e5-small"
     embedding_model_local_dir: Path = Path("models/multilingual-e5-small")
+    # "torch" | "onnx" | "onnx-int8" (onnx 계열은 sentence-transformers[onnx] 필요,
+    # 변환본은 embedding_model_local_dir 옆 <이름>-onnx 디렉터리에 저장)
+    embedding_backend: str = "torch"
+    # int8 양자화 대상 CPU 명령어셋: "avx2" | "avx512" | "avx512_vnni" | "arm64"
+    embedding_quantization: str = "avx2"
+    embedding_threads: int = 0  # 추론 스레드 수 (0이면 라이브러리 기본값)
+    embedding_batch_size: int = 32
+
+    # Embedding cache settings (모델과 텍스트 해시로 임베딩 재사용)
+    embedding_cache_enabled: bool = True
+    embedding_cache_dir: Path = Path("data/embedding_cache")
+    embedding_cache_dtype: str = "float16"  # "float16" | "float32"
+    embedding_cache_memory_size: int = 1024  # 프로세스 내 LRU에 두는 질문 벡터 수
+
+    # Chunking settings
+    chunk_mode: str = "sentences"  # "sentences" | "tokens" | "none"
+    chunk_size: int = 400  # 토큰 수 (multilingual-e5-small 최대 입력은 512)
+    chunk_overlap: int = 50
+    merge_adjacent_chunks: bool = False  # 검색 시 이웃한 chunk를 하나로 합침
+
+    # Ingest settings
+    ingest_workers: int = 4  # 파일 읽기/변환 프로세스 수 (1이면 현재 프로세스에서)
+    ingest_batch_size: int = 64  # 이만큼 문서가 모이면 임베딩하고 저장
+
+    # Query translation settings
+    translate_mode: str = "auto"  # "auto"(영어 질문은 번역 생략) | "always"
+    # 번역과 원문 검색을 동시에 실행하고 두 결과를 합침
+    # (동기 실행에서 grader_relevant_threshold가 있으면 원문 검색 후 필요할 때만 번역)
+    translate_parallel_retrieve: bool = False
 
     # RAG settings
     retriever_k: int = 4
     max_retries: int = 2
 
+    # Hybrid retrieval settings
+    retrieval_mode: str = "dense"  # "dense" | "hybrid" (BM25 + 벡터, RRF로 융합)
+    hybrid_candidates: int = 20  # 융합 전에 각 검색에서 가져오는 후보 수
+    hybrid_dense_weight: float = 1.0
+    hybrid_bm25_weight: float = 1.0
+    rrf_k: int = 60
+
+    # Rerank settings
+    rerank_enabled: bool = False  # 검색과 채점 사이에 cross-encoder 재정렬 노드를 넣음
+    rerank_model: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    rerank_model_local_dir: Path = Path("models/ms-marco-MiniLM-L-6-v2")
+    rerank_candidates: int = 20  # 재정렬 전에 검색하는 후보 수
+    rerank_top_n: int = 4  # 재정렬 후 남기는 문서 수
+    rerank_batch_size: int = 16
+    rerank_max_length: int = 512  # 질문+문서 최대 토큰 수 (넘으면 잘림)
+
+    # Grader settings
+    grader_mode: str = "per_document"  # "per_document" | "combined"
+    grader_concurrency: int = 4
+    grader_min_relevant: int = 0  # 관련 문서가 이만큼 모이면 채점 중단 (0이면 전부 채점)
+    # 검색 점수가 이 이상이면 관련, 이 이하이면 무관으로 보고 LLM 채점을 생략 (None이면 사용 안 함)
+    grader_relevant_threshold: float | None = None
+    grader_irrelevant_threshold: float | None = None
+
+    # Context compression settings (검색과 채점 사이에서 질문과 가까운 문장만 남김)
+    compress_enabled: bool = False
+    compress_max_strips: int = 12  # 남기는 조각 수 (전체 문서 합계)
+    compress_sentences_per_strip: int = 2
+    compress_min_similarity: float = 0.0  # 질문과의 코사인 유사도 하한
+
+    # Context packing settings (토큰 수는 추정치)
+    context_token_budget: int = 3000  # generate 프롬프트의 문서 토큰 상한
+    grader_token_budget: int = 2000  # combined는 전체, per_document는 문서 하나의 상한
+    decision_token_budget: int = 1000  # 웹 서치 판단 프롬프트
+    context_dedup_threshold: float = 0.95  # 임베딩 코사인 유사도가 이 이상이면 중복
+
+    # Answer cache settings
+    # 임계값이 임베딩 모델에 맞게 보정되지 않아 다른 질문의 답이 나갈 수 있으므로 기본은 끔
+    answer_cache_enabled: bool = False
+    answer_cache_path: Path = Path("data/answer_cache.sqlite3")
+    answer_cache_threshold: float = 0.95  # 코사인 유사도
+    answer_cache_ttl: float = 86400.0  # 초, 0이면 만료 없음
+    answer_cache_max_entries: int = 1000
+
+    # LLM response cache settings
+    llm_cache_enabled: bool = True
+    llm_cache_path: Path = Path("data/llm_cache.sqlite3")
+    llm_cache_max_entries: int = 10000
+    llm_cache_exclude_nodes: list[str] = ["generate"]
+
+    # Server settings
+    server_host: str = "127.0.0.1"
+    server_port: int = 8000
+    server_max_concurrency: int = 4  # 동시에 실행하는 그래프 수
+    server_max_queue: int = 32  # 대기 가능한 요청 수, 넘으면 503
+    server_request_timeout: float = 300.0
+    worker_socket: Path = Path("data/crag.sock")  # crag worker가 듣는 Unix 소켓
+
     # Web search settings
     local_search_url: str = "http://127.0.0.1:5000"
+    web_search_concurrency: int = 4
+    web_search_query_timeout: float = 20.0  # 검색어 하나당 제한 시간(초)
+    web_search_total_timeout: float = 45.0  # 웹 검색 단계 전체 제한 시간(초)
+
+    # Web search cache settings
+    search_cache_enabled: bool = True
+    search_cache_path: Path = Path("data/search_cache.sqlite3")
+    search_cache_ttl: float = 3600.0
+    search_cache_negative_ttl: float = 60.0  # 실패/빈 결과
+    search_cache_memory_size: int = 256
+
+    # HTML fetch settings
+    fetch_concurrency: int = 8
+    fetch_per_host_limit: int = 2
+    fetch_timeout: float = 15.0
+    convert_concurrency: int = 2
+    html_llm_fallback: bool = False  # 추출 결과가 부실할 때만 LLM으로 변환
+    html_min_content_chars: int = 200
+
+    # Tracing settings
+    trace_path: Path | None = None  # 지정하면 span을 JSON lines로 추가 기록
 
 
 settings = Settings()
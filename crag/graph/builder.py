@@ -1,18 +1,29 @@
 from typing import Literal
 
 from langchain_core.language_models import BaseChatModel
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import END, StateGraph
 
+from crag.cache.llm_cache import SQLiteLLMCache, with_node_cache
 from crag.config.settings import settings
-from crag.graph.nodes.generator import generate
-from crag.graph.nodes.grader import grade_documents
-from crag.graph.nodes.html_fetcher import fetch_html
-from crag.graph.nodes.query_rewriter import rewrite_query
-from crag.graph.nodes.query_translator import translate_query
-from crag.graph.nodes.retriever import retrieve
-from crag.graph.nodes.web_search_decision import decide_web_search
-from crag.graph.nodes.web_searcher import web_search
+from crag.graph.nodes.compressor import acompress, compress
+from crag.graph.nodes.generator import agenerate, generate
+from crag.graph.nodes.grader import agrade_documents, grade_documents
+from crag.graph.nodes.html_fetcher import afetch_html, fetch_html
+from crag.graph.nodes.query_rewriter import arewrite_query, rewrite_query
+from crag.graph.nodes.query_translator import (
+    atranslate_and_retrieve,
+    atranslate_query,
+    translate_and_retrieve,
+    translate_query,
+)
+from crag.graph.nodes.reranker import arerank, rerank
+from crag.graph.nodes.retriever import aretrieve, retrieve
+from crag.graph.nodes.web_search_decision import adecide_web_search, decide_web_search
+from crag.graph.nodes.web_searcher import aweb_search, web_search
 from crag.models.state import CRAGState
+from crag.tracing import tracer, with_node_tracing
+from crag.vectorstore.reranker import Reranker
 from crag.vectorstore.store import VectorStore
 from crag.web.search import LocalSearchStrategy, WebSearchStrategy
 
@@ -37,27 +48,156 @@ def after_web_search_decision(
     return "generate"
 
 
+def _node(name: str, func, afunc) -> RunnableLambda:
+    """노드 함수를 동기/비동기 실행을 모두 지원하고 실행 시간을 기록하는 Runnable로 감싼다."""
+
+    def run(state: CRAGState) -> CRAGState:
+        with tracer.span("node", node=name):
+            return func(state)
+
+    async def arun(state: CRAGState) -> CRAGState:
+        with tracer.span("node", node=name):
+            return await afunc(state)
+
+    return RunnableLambda(run, afunc=arun, name=name)
+
+
 def build_graph(
     llm: BaseChatModel,
     store: VectorStore,
     search_strategy: WebSearchStrategy | None = None,
+    llm_cache: SQLiteLLMCache | None = None,
 ) -> StateGraph:
     strategy = search_strategy or LocalSearchStrategy()
     workflow = StateGraph(CRAGState)
 
-    workflow.add_node("translate_query", lambda s: translate_query(s, llm))
-    workflow.add_node("retrieve", lambda s: retrieve(s, store))
-    workflow.add_node("grade_documents", lambda s: grade_documents(s, llm))
-    workflow.add_node("decide_web_search", lambda s: decide_web_search(s, llm))
-    workflow.add_node("generate", lambda s: generate(s, llm))
-    workflow.add_node("rewrite_query", lambda s: rewrite_query(s, llm))
-    workflow.add_node("web_search", lambda s: web_search(s, strategy))
-    workflow.add_node("fetch_html", lambda s: fetch_html(s, store, llm))
+    def node_llm(node: str) -> BaseChatModel:
+        return with_node_tracing(with_node_cache(llm, llm_cache, node), node)
+
+    translate_llm = node_llm("translate_query")
+    grade_llm = node_llm("grade_documents")
+    decide_llm = node_llm("decide_web_search")
+    generate_llm = node_llm("generate")
+    rewrite_llm = node_llm("rewrite_query")
+    fetch_llm = node_llm("fetch_html")
+    # 프롬프트에 넣을 문서의 중복 제거용. 검색된 chunk는 컬렉션에 저장된 벡터를 재사용한다
+    embed = store.embed_texts
+
+    # 각 노드는 동기(invoke/stream)와 비동기(ainvoke/astream) 실행을 모두 지원
+    if settings.translate_parallel_retrieve:
+        # 번역과 원문 검색을 겹쳐 실행하고 첫 검색 결과까지 만들어 둔다
+        workflow.add_node(
+            "translate_query",
+            _node(
+                "translate_query",
+                lambda s: translate_and_retrieve(s, translate_llm, store),
+                lambda s: atranslate_and_retrieve(s, translate_llm, store),
+            ),
+        )
+    else:
+        workflow.add_node(
+            "translate_query",
+            _node(
+                "translate_query",
+                lambda s: translate_query(s, translate_llm),
+                lambda s: atranslate_query(s, translate_llm),
+            ),
+        )
+    workflow.add_node(
+        "retrieve",
+        _node(
+            "retrieve",
+            lambda s: retrieve(s, store),
+            lambda s: aretrieve(s, store),
+        ),
+    )
+    if settings.rerank_enabled:
+        reranker = Reranker()
+        workflow.add_node(
+            "rerank",
+            _node(
+                "rerank",
+                lambda s: rerank(s, reranker),
+                lambda s: arerank(s, reranker),
+            ),
+        )
+    if settings.compress_enabled:
+        workflow.add_node(
+            "compress_documents",
+            _node(
+                "compress_documents",
+                lambda s: compress(s, embed),
+                lambda s: acompress(s, embed),
+            ),
+        )
+    workflow.add_node(
+        "grade_documents",
+        _node(
+            "grade_documents",
+            lambda s: grade_documents(s, grade_llm, embed),
+            lambda s: agrade_documents(s, grade_llm, embed),
+        ),
+    )
+    workflow.add_node(
+        "decide_web_search",
+        _node(
+            "decide_web_search",
+            lambda s: decide_web_search(s, decide_llm, embed),
+            lambda s: adecide_web_search(s, decide_llm, embed),
+        ),
+    )
+    workflow.add_node(
+        "generate",
+        _node(
+            "generate",
+            lambda s: generate(s, generate_llm, embed),
+            lambda s: agenerate(s, generate_llm, embed),
+        ),
+    )
+    workflow.add_node(
+        "rewrite_query",
+        _node(
+            "rewrite_query",
+            lambda s: rewrite_query(s, rewrite_llm),
+            lambda s: arewrite_query(s, rewrite_llm),
+        ),
+    )
+    workflow.add_node(
+        "web_search",
+        _node(
+            "web_search",
+            lambda s: web_search(s, strategy),
+            lambda s: aweb_search(s, strategy),
+        ),
+    )
+    workflow.add_node(
+        "fetch_html",
+        _node(
+            "fetch_html",
+            lambda s: fetch_html(s, store, fetch_llm),
+            lambda s: afetch_html(s, store, fetch_llm),
+        ),
+    )
 
     workflow.set_entry_point("translate_query")
 
-    workflow.add_edge("translate_query", "retrieve")
-    workflow.add_edge("retrieve", "grade_documents")
+    # 검색 결과는 켜져 있는 재정렬/압축 노드를 차례로 거쳐 채점으로 간다
+    refine = [
+        name
+        for name, enabled in (
+            ("rerank", settings.rerank_enabled),
+            ("compress_documents", settings.compress_enabled),
+        )
+        if enabled
+    ]
+    after_retrieve = refine[0] if refine else "grade_documents"
+    if settings.translate_parallel_retrieve:
+        workflow.add_edge("translate_query", after_retrieve)
+    else:
+        workflow.add_edge("translate_query", "retrieve")
+    workflow.add_edge("retrieve", after_retrieve)
+    for current, following in zip(refine, refine[1:] + ["grade_documents"]):
+        workflow.add_edge(current, following)
     workflow.add_conditional_edges(
         "grade_documents",
         after_grade,
@@ -0,0 +1,212 @@
+import logging
+import math
+import re
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from langchain_core.documents import Document
+
+from crag.config.settings import settings
+from crag.tracing import tracer
+from crag.vectorstore.chunker import split_sentences
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 텍스트 목록 -> (문서 수, 차원) 임베딩 배열 (VectorStore.embed_texts)
+Embed = Callable[[list[str]], "np.ndarray"]
+
+
+@dataclass
+class PackedContext:
+    """프롬프트에 넣을 문서와 빠진 문서."""
+
+    documents: list[Document]
+    tokens: int = 0
+    duplicates: list[Document] = field(default_factory=list)
+    over_budget: list[Document] = field(default_factory=list)
+    truncated: int = 0
+
+    def summary(self) -> str:
+        return (
+            f"{len(self.documents)} documents (~{self.tokens} tokens), dropped "
+            f"{len(self.duplicates)} duplicate, {len(self.over_budget)} over budget, "
+            f"truncated {self.truncated}"
+        )
+
+
+def estimate_tokens(text: str) -> int:
+    """토크나이저 없이 어림한 토큰 수 (영문은 약 4자, 그 외 문자는 약 1.5자에 1토큰)."""
+    ascii_chars = sum(1 for c in text if c.isascii())
+    return math.ceil(ascii_chars / 4 + (len(text) - ascii_chars) / 1.5)
+
+
+def truncate_to_tokens(text: str, tokens: int) -> str:
+    """추정 토큰 수가 tokens 이하가 되도록 뒤를 자른다. 가능하면 문단/문장 경계에서 자른다."""
+    if estimate_tokens(text) <= tokens:
+        return text
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if estimate_tokens(text[:mid]) <= tokens:
+            low = mid
+        else:
+            high = mid - 1
+    cut = text[:low]
+    boundary = max(cut.rfind("\n\n"), cut.rfind(". "), cut.rfind("\n"))
+    if boundary > low // 2:
+        cut = cut[: boundary + 1]
+    return cut.rstrip()
+
+
+def document_score(doc: Document) -> float:
+    """정렬 기준 점수. 재정렬 점수가 있으면 그것을 쓴다."""
+    if "rerank_score" in doc.metadata:
+        return doc.metadata["rerank_score"]
+    return doc.metadata.get("score", 0.0)
+
+
+def _normalized(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def remove_near_duplicates(
+    documents: list[Document],
+    embed: Embed | None = None,
+    threshold: float | None = None,
+) -> tuple[list[Document], list[Document]]:
+    """거의 같은 문서를 빼고 (남은 문서, 뺀 문서)를 반환한다. documents는 우선순위 순이어야 한다.
+
+    embed가 있으면 임베딩 코사인 유사도가 threshold 이상인 문서를, 없으면 공백과
+    대소문자만 다른 문서를 중복으로 본다.
+    """
+    threshold = threshold if threshold is not None else settings.context_dedup_threshold
+    if len(documents) < 2:
+        return list(documents), []
+
+    vectors = None
+    if embed is not None:
+        try:
+            import numpy as np
+
+            vectors = np.asarray(embed([doc.page_content for doc in documents]), dtype=np.float32)
+            vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        except Exception as e:
+            logger.warning("[Context] Embedding failed, using exact dedup: %s", e)
+            vectors = None
+
+    kept: list[int] = []
+    dropped: list[Document] = []
+    seen: set[str] = set()
+    for i, doc in enumerate(documents):
+        text = _normalized(doc.page_content)
+        duplicate = text in seen
+        if not duplicate and vectors is not None and kept:
+            duplicate = float((vectors[kept] @ vectors[i]).max()) >= threshold
+        if duplicate:
+            dropped.append(doc)
+            continue
+        seen.add(text)
+        kept.append(i)
+    return [documents[i] for i in kept], dropped
+
+
+def pack_context(
+    documents: list[Document],
+    budget: int,
+    embed: Embed | None = None,
+    label: str = "context",
+    min_tokens: int = 64,
+) -> PackedContext:
+    """점수 순으로 정렬하고 중복을 뺀 뒤 budget(추정 토큰)까지 문서를 채운다.
+
+    남은 예산이 min_tokens 이상이면 들어가지 않는 문서는 잘라서라도 넣는다.
+    """
+    ordered = sorted(documents, key=document_score, reverse=True)
+    candidates, duplicates = remove_near_duplicates(ordered, embed)
+
+    packed = PackedContext(documents=[], duplicates=duplicates)
+    for doc in candidates:
+        remaining = budget - packed.tokens
+        tokens = estimate_tokens(doc.page_content)
+        if tokens <= remaining:
+            packed.documents.append(doc)
+            packed.tokens += tokens
+        elif remaining >= min_tokens:
+            text = truncate_to_tokens(doc.page_content, remaining)
+            packed.documents.append(Document(page_content=text, metadata=doc.metadata))
+            packed.tokens += estimate_tokens(text)
+            packed.truncated += 1
+        else:
+            packed.over_budget.append(doc)
+
+    if duplicates or packed.over_budget or packed.truncated:
+        logger.info("[Context] %s: %s", label, packed.summary())
+    tracer.increment("context_dropped", len(duplicates), prompt=label, reason="duplicate")
+    tracer.increment("context_dropped", len(packed.over_budget), prompt=label, reason="budget")
+    return packed
+
+
+def split_strips(text: str, sentences_per_strip: int) -> list[str]:
+    """연속된 sentences_per_strip개 문장씩 묶은 조각."""
+    sentences = split_sentences(text)
+    return [
+        " ".join(sentences[i : i + sentences_per_strip])
+        for i in range(0, len(sentences), sentences_per_strip)
+    ]
+
+
+def compress_documents(
+    query: str,
+    documents: list[Document],
+    embed: Embed,
+    max_strips: int | None = None,
+    sentences_per_strip: int | None = None,
+    min_similarity: float | None = None,
+) -> list[Document]:
+    """문서를 문장 조각으로 나눠 질문과 가장 비슷한 조각만 남긴다 (LLM 호출 없음).
+
+    모든 조각을 질문과 함께 한 번에 임베딩하고, 유사도 상위 max_strips개 조각을
+    문서별로 원래 순서대로 이어 붙인다. 남은 조각이 없는 문서는 뺀다.
+    """
+    import numpy as np
+
+    max_strips = max_strips or settings.compress_max_strips
+    sentences_per_strip = sentences_per_strip or settings.compress_sentences_per_strip
+    if min_similarity is None:
+        min_similarity = settings.compress_min_similarity
+
+    strips: list[tuple[int, int, str]] = []  # (문서 번호, 조각 번호, 텍스트)
+    for doc_index, doc in enumerate(documents):
+        for strip_index, strip in enumerate(split_strips(doc.page_content, sentences_per_strip)):
+            strips.append((doc_index, strip_index, strip))
+    if len(strips) <= max_strips:
+        return documents
+
+    vectors = np.asarray(embed([query] + [strip for _, _, strip in strips]), dtype=np.float32)
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    similarities = vectors[1:] @ vectors[0]
+
+    selected = [
+        i for i in np.argsort(-similarities)[:max_strips] if similarities[i] >= min_similarity
+    ]
+    kept: dict[int, list[tuple[int, str]]] = {}
+    for i in selected:
+        doc_index, strip_index, strip = strips[i]
+        kept.setdefault(doc_index, []).append((strip_index, strip))
+
+    compressed = []
+    for doc_index, doc in enumerate(documents):
+        if doc_index not in kept:
+            continue
+        text = "\n".join(strip for _, strip in sorted(kept[doc_index]))
+        compressed.append(
+            Document(
+                page_content=text,
+                metadata={**doc.metadata, "original_chars": len(doc.page_content)},
+            )
+        )
+    return compressed
@@ -0,0 +1,34 @@
+import asyncio
+import logging
+
+from crag.graph.context import Embed, compress_documents, estimate_tokens
+from crag.models.state import CRAGState
+
+logger = logging.getLogger(__name__)
+
+
+def compress(state: CRAGState, embed: Embed) -> CRAGState:
+    """검색된 문서에서 검색어와 가까운 문장 조각만 남겨 채점/판단/생성 프롬프트를 줄인다."""
+    search_query = state.get("search_query") or state["question"]
+    documents = state["documents"]
+    compressed = compress_documents(search_query, documents, embed)
+
+    before = sum(estimate_tokens(doc.page_content) for doc in documents)
+    after = sum(estimate_tokens(doc.page_content) for doc in compressed)
+    logger.info(
+        "[Compress] %d -> %d documents, ~%d -> ~%d tokens",
+        len(documents),
+        len(compressed),
+        before,
+        after,
+    )
+
+    return {
+        **state,
+        "documents": compressed,
+    }
+
+
+async def acompress(state: CRAGState, embed: Embed) -> CRAGState:
+    """compress의 비동기 버전. 임베딩은 스레드에서 실행한다."""
+    return await asyncio.to_thread(compress, state, embed)
@@ -1,8 +1,12 @@
+import asyncio
+
 from langchain_core.language_models import BaseChatModel
 from langchain_core.prompts import ChatPromptTemplate
 
+from crag.config.settings import settings
+from crag.graph.context import Embed, pack_context
 from crag.models.state import CRAGState
-from crag.utils import strip_think_tags
+from crag.utils import ThinkTagFilter
 
 GENERATOR_PROMPT = ChatPromptTemplate.from_messages(
     [
@@ -25,16 +29,45 @@ Answer:""",
 )
 
 
-def generate(state: CRAGState, llm: BaseChatModel) -> CRAGState:
-    question = state["question"]
-    documents = state["documents"]
+def _prompt_inputs(state: CRAGState, embed: Embed | None) -> dict:
+    packed = pack_context(state["documents"], settings.context_token_budget, embed, "generate")
+    context = "\n\n".join([doc.page_content for doc in packed.documents])
+    return {"question": state["question"], "context": context}
+
+
+def generate(state: CRAGState, llm: BaseChatModel, embed: Embed | None = None) -> CRAGState:
+    """답변을 생성한다.
+
+    문서는 중복을 빼고 점수 순으로 context_token_budget까지만 넣는다.
+    토큰 단위로 스트리밍하므로 graph.stream(stream_mode="messages")로 받아볼 수 있다.
+    <think> 구간은 받는 즉시 걸러낸다.
+    """
+    chain = GENERATOR_PROMPT | llm
+    think_filter = ThinkTagFilter()
+    parts: list[str] = []
+    for chunk in chain.stream(_prompt_inputs(state, embed)):
+        parts.append(think_filter.feed(chunk.content))
+    parts.append(think_filter.flush())
+
+    return {
+        **state,
+        "generation": "".join(parts).strip(),
+    }
 
-    context = "\n\n".join([doc.page_content for doc in documents])
 
+async def agenerate(
+    state: CRAGState, llm: BaseChatModel, embed: Embed | None = None
+) -> CRAGState:
+    """generate의 비동기 버전."""
     chain = GENERATOR_PROMPT | llm
-    response = chain.invoke({"question": question, "context": context})
+    think_filter = ThinkTagFilter()
+    parts: list[str] = []
+    inputs = await asyncio.to_thread(_prompt_inputs, state, embed)
+    async for chunk in chain.astream(inputs):
+        parts.append(think_filter.feed(chunk.content))
+    parts.append(think_filter.flush())
 
     return {
         **state,
-        "generation": strip_think_tags(response.content),
+        "generation": "".join(parts).strip(),
     }
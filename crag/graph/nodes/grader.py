@@ -1,9 +1,17 @@
+import asyncio
+import logging
+
+from langchain_core.documents import Document
 from langchain_core.language_models import BaseChatModel
 from langchain_core.prompts import ChatPromptTemplate
 
+from crag.config.settings import settings
+from crag.graph.context import Embed, pack_context, remove_near_duplicates, truncate_to_tokens
 from crag.models.state import CRAGState
 from crag.utils import strip_think_tags
 
+logger = logging.getLogger(__name__)
+
 GRADER_PROMPT = ChatPromptTemplate.from_messages(
     [
         (
@@ -27,8 +35,193 @@ Are these documents relevant to the question? (yes/no)""",
     ]
 )
 
+DOCUMENT_GRADER_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        (
+            "system",
+            """You are a grader assessing relevance of a retrieved document to a user question.
+If the document contains information relevant to answering the question, grade it as relevant.
+IMPORTANT: The question and document may be in different languages (e.g., Korean question with English document).
+Assess semantic relevance regardless of language differences.
+Give a binary score 'yes' or 'no' to indicate whether the document is relevant.
+Respond with only 'yes' or 'no'.""",
+        ),
+        (
+            "human",
+            """Question: {question}
+
+Document:
+{document}
+
+Is this document relevant to the question? (yes/no)""",
+        ),
+    ]
+)
+
+
+def _split_by_score(
+    documents: list[Document],
+) -> tuple[list[Document], list[Document], list[Document]]:
+    """검색 점수로 확실히 관련/무관한 문서와 애매한 문서를 나눈다."""
+    high = settings.grader_relevant_threshold
+    low = settings.grader_irrelevant_threshold
+    relevant, irrelevant, ambiguous = [], [], []
+    for doc in documents:
+        score = doc.metadata.get("score")
+        if score is not None and high is not None and score >= high:
+            relevant.append(doc)
+        elif score is not None and low is not None and score <= low:
+            irrelevant.append(doc)
+        else:
+            ambiguous.append(doc)
+    return relevant, irrelevant, ambiguous
+
+
+def fit_score_thresholds(
+    samples: list[tuple[float, bool]],
+    precision: float = 0.95,
+    min_support: int = 5,
+) -> tuple[float | None, float | None]:
+    """라벨된 (점수, 관련 여부) 샘플로 (관련 임계값, 무관 임계값)을 구한다.
+
+    관련 임계값은 그 이상인 샘플의 관련 비율이 precision 이상인 가장 낮은 점수,
+    무관 임계값은 그 이하인 샘플의 무관 비율이 precision 이상인 가장 높은 점수다.
+    두 구간이 겹치면 안전한 구간이 없으므로 (None, None)을 반환한다.
+    """
+
+    def fit(ordered: list[tuple[float, bool]], target: bool) -> float | None:
+        threshold = None
+        matched = 0
+        for i, (score, label) in enumerate(ordered, 1):
+            matched += label == target
+            if i >= min_support and matched / i >= precision:
+                threshold = score
+        return threshold
+
+    high = fit(sorted(samples, key=lambda s: s[0], reverse=True), True)
+    low = fit(sorted(samples, key=lambda s: s[0]), False)
+    if high is not None and low is not None and low >= high:
+        return None, None
+    return high, low
+
+
+def _is_yes(content: str) -> bool:
+    return "yes" in strip_think_tags(content).lower()
+
+
+def _combined_text(documents: list[Document]) -> str:
+    packed = pack_context(documents, settings.grader_token_budget, label="grade_documents")
+    return "\n\n".join(
+        [f"Document {i + 1}:\n{doc.page_content}" for i, doc in enumerate(packed.documents)]
+    )
+
+
+def _document_text(doc: Document) -> str:
+    return truncate_to_tokens(doc.page_content, settings.grader_token_budget)
+
+
+def _grade_combined(question: str, documents: list[Document], llm: BaseChatModel) -> bool:
+    chain = GRADER_PROMPT | llm
+    response = chain.invoke({"question": question, "documents": _combined_text(documents)})
+    return _is_yes(response.content)
+
+
+async def _agrade_combined(
+    question: str, documents: list[Document], llm: BaseChatModel
+) -> bool:
+    chain = GRADER_PROMPT | llm
+    response = await chain.ainvoke(
+        {"question": question, "documents": _combined_text(documents)}
+    )
+    return _is_yes(response.content)
+
+
+def _collect_relevant(wave: list[Document], responses: list) -> list[Document]:
+    relevant = []
+    for doc, response in zip(wave, responses):
+        if isinstance(response, Exception):
+            logger.warning("[Grade] Failed to grade document: %s", response)
+            continue
+        if _is_yes(response.content):
+            relevant.append(doc)
+    return relevant
+
+
+def _grade_each(
+    question: str,
+    documents: list[Document],
+    llm: BaseChatModel,
+    min_relevant: int = 0,
+) -> list[Document]:
+    """문서를 하나씩 동시에 채점하고 관련 있는 문서만 원래 순서대로 반환한다."""
+    chain = DOCUMENT_GRADER_PROMPT | llm
+    concurrency = max(1, settings.grader_concurrency)
+    # 조기 종료를 하려면 concurrency 크기씩 나눠 채점
+    wave_size = concurrency if min_relevant > 0 else len(documents)
 
-def grade_documents(state: CRAGState, llm: BaseChatModel) -> CRAGState:
+    relevant: list[Document] = []
+    for start in range(0, len(documents), wave_size):
+        wave = documents[start : start + wave_size]
+        responses = chain.batch(
+            [{"question": question, "document": _document_text(doc)} for doc in wave],
+            config={"max_concurrency": concurrency},
+            return_exceptions=True,
+        )
+        relevant.extend(_collect_relevant(wave, responses))
+
+        if min_relevant > 0 and len(relevant) >= min_relevant:
+            logger.info(
+                "[Grade] Early exit after %d/%d documents",
+                start + len(wave),
+                len(documents),
+            )
+            break
+
+    return relevant
+
+
+async def _agrade_each(
+    question: str,
+    documents: list[Document],
+    llm: BaseChatModel,
+    min_relevant: int = 0,
+) -> list[Document]:
+    """_grade_each의 비동기 버전."""
+    chain = DOCUMENT_GRADER_PROMPT | llm
+    concurrency = max(1, settings.grader_concurrency)
+    wave_size = concurrency if min_relevant > 0 else len(documents)
+
+    relevant: list[Document] = []
+    for start in range(0, len(documents), wave_size):
+        wave = documents[start : start + wave_size]
+        responses = await chain.abatch(
+            [{"question": question, "document": _document_text(doc)} for doc in wave],
+            config={"max_concurrency": concurrency},
+            return_exceptions=True,
+        )
+        relevant.extend(_collect_relevant(wave, responses))
+
+        if min_relevant > 0 and len(relevant) >= min_relevant:
+            logger.info(
+                "[Grade] Early exit after %d/%d documents",
+                start + len(wave),
+                len(documents),
+            )
+            break
+
+    return relevant
+
+
+def grade_documents(
+    state: CRAGState, llm: BaseChatModel, embed: Embed | None = None
+) -> CRAGState:
+    """검색된 문서의 관련성을 채점한다.
+
+    거의 같은 문서는 채점 전에 뺀다 (LLM 호출 수 감소).
+    per_document 모드에서는 관련 있는 문서만 state["documents"]에 남긴다.
+    관련 문서가 하나도 없으면 웹 서치 판단을 위해 문서를 그대로 둔다.
+    """
+    state = _without_duplicates(state, embed)
     question = state["question"]
     documents = state["documents"]
 
@@ -38,17 +231,96 @@ def grade_documents(state: CRAGState, llm: BaseChatModel) -> CRAGState:
             "documents_relevant": False,
         }
 
-    docs_text = "\n\n".join(
-        [f"Document {i + 1}:\n{doc.page_content}" for i, doc in enumerate(documents)]
-    )
+    # 검색 점수가 확실한 문서는 LLM 없이 판정
+    by_score, ambiguous = _fast_path(documents)
+
+    if settings.grader_mode == "combined":
+        if by_score:
+            is_relevant = True
+        elif ambiguous:
+            is_relevant = _grade_combined(question, ambiguous, llm)
+        else:
+            is_relevant = False
+        return {
+            **state,
+            "documents_relevant": is_relevant,
+        }
+
+    min_relevant = settings.grader_min_relevant
+    graded: list[Document] = []
+    if ambiguous and not (min_relevant > 0 and len(by_score) >= min_relevant):
+        graded = _grade_each(question, ambiguous, llm, max(0, min_relevant - len(by_score)))
+
+    return _with_relevant(state, by_score + graded)
+
+
+async def agrade_documents(
+    state: CRAGState, llm: BaseChatModel, embed: Embed | None = None
+) -> CRAGState:
+    """grade_documents의 비동기 버전."""
+    state = await asyncio.to_thread(_without_duplicates, state, embed)
+    question = state["question"]
+    documents = state["documents"]
+
+    if not documents:
+        return {
+            **state,
+            "documents_relevant": False,
+        }
+
+    by_score, ambiguous = _fast_path(documents)
+
+    if settings.grader_mode == "combined":
+        if by_score:
+            is_relevant = True
+        elif ambiguous:
+            is_relevant = await _agrade_combined(question, ambiguous, llm)
+        else:
+            is_relevant = False
+        return {
+            **state,
+            "documents_relevant": is_relevant,
+        }
+
+    min_relevant = settings.grader_min_relevant
+    graded: list[Document] = []
+    if ambiguous and not (min_relevant > 0 and len(by_score) >= min_relevant):
+        graded = await _agrade_each(
+            question, ambiguous, llm, max(0, min_relevant - len(by_score))
+        )
+
+    return _with_relevant(state, by_score + graded)
 
-    chain = GRADER_PROMPT | llm
-    response = chain.invoke({"question": question, "documents": docs_text})
 
-    grade = strip_think_tags(response.content).lower()
-    is_relevant = "yes" in grade
+def _without_duplicates(state: CRAGState, embed: Embed | None) -> CRAGState:
+    documents, duplicates = remove_near_duplicates(state["documents"], embed)
+    if not duplicates:
+        return state
+    logger.info("[Grade] Dropped %d near-duplicate documents", len(duplicates))
+    return {**state, "documents": documents}
+
+
+def _fast_path(documents: list[Document]) -> tuple[list[Document], list[Document]]:
+    """점수로 관련 판정된 문서와 LLM 채점이 필요한 문서를 반환한다."""
+    by_score, irrelevant, ambiguous = _split_by_score(documents)
+    if len(ambiguous) < len(documents):
+        logger.info(
+            "[Grade] Score fast path: %d relevant, %d irrelevant, %d ambiguous",
+            len(by_score),
+            len(irrelevant),
+            len(ambiguous),
+        )
+    return by_score, ambiguous
+
+
+def _with_relevant(state: CRAGState, relevant_docs: list[Document]) -> CRAGState:
+    documents = state["documents"]
+    kept = {id(doc) for doc in relevant_docs}
+    relevant = [doc for doc in documents if id(doc) in kept]
+    logger.info("[Grade] %d/%d documents relevant", len(relevant), len(documents))
 
     return {
         **state,
-        "documents_relevant": is_relevant,
+        "documents": relevant or documents,
+        "documents_relevant": bool(relevant),
     }
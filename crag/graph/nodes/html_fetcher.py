@@ -1,11 +1,19 @@
+import asyncio
+import contextvars
 import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import urlsplit
 
 import httpx
 from langchain_core.documents import Document
 from langchain_core.language_models import BaseChatModel
 
+from crag.config.settings import settings
 from crag.models.state import CRAGState
+from crag.tracing import tracer
 from crag.vectorstore.store import VectorStore
+from crag.web.extractor import extract_main_content, is_low_quality
 
 logger = logging.getLogger(__name__)
 
@@ -19,70 +27,284 @@ HTML:
 
 Markdown:"""
 
+_client: httpx.Client | None = None
+_client_lock = threading.Lock()
+_host_semaphores: dict[str, threading.Semaphore] = {}
 
-def _fetch_html(url: str) -> str | None:
-    """URL에서 HTML을 가져온다."""
-    try:
-        response = httpx.get(
-            url,
-            timeout=15.0,
+# 비동기 클라이언트와 세마포어는 이벤트 루프에 묶이므로 루프가 바뀌면 새로 만든다
+_async_client: httpx.AsyncClient | None = None
+_async_loop: asyncio.AbstractEventLoop | None = None
+_async_host_semaphores: dict[str, asyncio.Semaphore] = {}
+
+
+def _get_client() -> httpx.Client:
+    """프로세스 전체에서 공유하는 커넥션 풀 클라이언트를 반환한다."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = httpx.Client(
+                timeout=settings.fetch_timeout,
+                follow_redirects=True,
+                headers={"User-Agent": "Mozilla/5.0 (compatible; CRAG/1.0)"},
+                limits=httpx.Limits(
+                    max_connections=settings.fetch_concurrency,
+                    max_keepalive_connections=settings.fetch_concurrency,
+                ),
+            )
+        return _client
+
+
+def _host_semaphore(url: str) -> threading.Semaphore:
+    """호스트별 동시 요청 수를 제한하는 세마포어를 반환한다."""
+    host = urlsplit(url).netloc.lower()
+    with _client_lock:
+        if host not in _host_semaphores:
+            _host_semaphores[host] = threading.Semaphore(settings.fetch_per_host_limit)
+        return _host_semaphores[host]
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    """현재 이벤트 루프에서 공유하는 비동기 커넥션 풀 클라이언트를 반환한다."""
+    global _async_client, _async_loop
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_loop is not loop:
+        if _async_client is not None and _async_loop.is_running():
+            # 다른 스레드에서 아직 도는 루프의 클라이언트는 그 루프에서 닫는다
+            asyncio.run_coroutine_threadsafe(_async_client.aclose(), _async_loop)
+        _async_client = httpx.AsyncClient(
+            timeout=settings.fetch_timeout,
             follow_redirects=True,
             headers={"User-Agent": "Mozilla/5.0 (compatible; CRAG/1.0)"},
+            limits=httpx.Limits(
+                max_connections=settings.fetch_concurrency,
+                max_keepalive_connections=settings.fetch_concurrency,
+            ),
         )
-        response.raise_for_status()
-        return response.text
-    except (httpx.RequestError, httpx.HTTPStatusError) as e:
-        logger.warning("[Fetch HTML] Failed to fetch %s: %s", url, e)
-        return None
+        _async_loop = loop
+        _async_host_semaphores.clear()
+    return _async_client
 
 
-def _html_to_markdown(html: str, llm: BaseChatModel) -> str:
-    """LLM을 사용해 HTML을 Markdown으로 변환한다."""
+async def aclose_async_client() -> None:
+    """현재 이벤트 루프의 비동기 클라이언트를 닫는다.
+
+    서버/워커/배치처럼 이벤트 루프 하나로 오래 도는 실행이 끝날 때 부른다. 닫힌 루프에
+    묶인 클라이언트는 나중에 닫을 수 없으므로 루프가 끝나기 전에 닫아야 한다.
+    """
+    global _async_client, _async_loop
+    client = _async_client
+    if client is None or _async_loop is not asyncio.get_running_loop():
+        return
+    _async_client = None
+    _async_loop = None
+    _async_host_semaphores.clear()
+    await client.aclose()
+
+
+def _async_host_semaphore(url: str) -> asyncio.Semaphore:
+    host = urlsplit(url).netloc.lower()
+    if host not in _async_host_semaphores:
+        _async_host_semaphores[host] = asyncio.Semaphore(settings.fetch_per_host_limit)
+    return _async_host_semaphores[host]
+
+
+def _fetch_html(url: str) -> str | None:
+    """URL에서 HTML을 가져온다."""
+    with tracer.span("fetch") as span:
+        try:
+            with _host_semaphore(url):
+                response = _get_client().get(url)
+            span.add("bytes", len(response.content))
+            response.raise_for_status()
+            return response.text
+        except (httpx.RequestError, httpx.HTTPStatusError) as e:
+            span.error = type(e).__name__
+            logger.warning("[Fetch HTML] Failed to fetch %s: %s", url, e)
+            return None
+
+
+async def _afetch_html(url: str) -> str | None:
+    """_fetch_html의 비동기 버전."""
+    client = _get_async_client()
+    with tracer.span("fetch") as span:
+        try:
+            async with _async_host_semaphore(url):
+                response = await client.get(url)
+            span.add("bytes", len(response.content))
+            response.raise_for_status()
+            return response.text
+        except (httpx.RequestError, httpx.HTTPStatusError) as e:
+            span.error = type(e).__name__
+            logger.warning("[Fetch HTML] Failed to fetch %s: %s", url, e)
+            return None
+
+
+def _truncate_html(html: str) -> str:
     # HTML이 너무 길면 truncate (토큰 제한)
     max_chars = 30000
     if len(html) > max_chars:
         html = html[:max_chars] + "\n... (truncated)"
+    return html
+
 
-    prompt = HTML_TO_MARKDOWN_PROMPT.format(html=html)
+def _llm_html_to_markdown(html: str, llm: BaseChatModel) -> str:
+    """LLM을 사용해 HTML을 Markdown으로 변환한다."""
+    prompt = HTML_TO_MARKDOWN_PROMPT.format(html=_truncate_html(html))
     response = llm.invoke(prompt)
     return response.content
 
 
-def fetch_html(
-    state: CRAGState, store: VectorStore, llm: BaseChatModel
-) -> CRAGState:
-    """웹 검색 결과 URL에서 HTML을 가져와 Markdown으로 변환 후 저장한다."""
-    web_results = state.get("web_search_results", [])
-    documents = list(state.get("documents", []))
+def _needs_llm_fallback(markdown: str) -> bool:
+    if settings.html_llm_fallback and is_low_quality(
+        markdown, settings.html_min_content_chars
+    ):
+        logger.info("[Fetch HTML] Extraction looks poor, falling back to LLM")
+        return True
+    return False
+
+
+def _html_to_markdown(html: str, llm: BaseChatModel) -> str:
+    """HTML에서 본문을 추출한다. 추출 결과가 부실하면 설정에 따라 LLM으로 변환한다."""
+    markdown = extract_main_content(html)
+    if _needs_llm_fallback(markdown):
+        return _llm_html_to_markdown(html, llm)
+    return markdown
+
+
+async def _ahtml_to_markdown(html: str, llm: BaseChatModel) -> str:
+    """_html_to_markdown의 비동기 버전. 추출은 스레드에서 실행한다."""
+    markdown = await asyncio.to_thread(extract_main_content, html)
+    if _needs_llm_fallback(markdown):
+        prompt = HTML_TO_MARKDOWN_PROMPT.format(html=_truncate_html(html))
+        response = await llm.ainvoke(prompt)
+        return response.content
+    return markdown
 
-    for result in web_results:
-        url = result.get("href", "")
-        if not url:
-            continue
 
-        # 이미 저장된 URL은 스킵
-        if store.exists_by_source(url):
-            logger.debug("[Fetch HTML] Already exists: %s", url)
-            continue
+def _fetch_and_convert(urls: list[str], llm: BaseChatModel) -> dict[str, str]:
+    """URL들을 동시에 가져오고, 가져온 순서대로 변환 작업 풀에 넘긴다."""
+    fetch_pool = ThreadPoolExecutor(max_workers=max(1, settings.fetch_concurrency))
+    convert_pool = ThreadPoolExecutor(max_workers=max(1, settings.convert_concurrency))
+    conversions: dict[str, Future] = {}
+    lock = threading.Lock()
 
-        # HTML 가져오기
-        html = _fetch_html(url)
+    def on_fetched(url: str, future: Future) -> None:
+        try:
+            html = future.result()
+        except Exception as e:
+            logger.warning("[Fetch HTML] Failed to fetch %s: %s", url, e)
+            return
         if not html:
-            continue
+            return
+        logger.info("[Fetch HTML] Converting to markdown: %s", url)
+        with lock:
+            conversions[url] = convert_pool.submit(
+                contextvars.copy_context().run, _html_to_markdown, html, llm
+            )
+
+    try:
+        for url in urls:
+            # 작업 스레드의 span도 같은 trace에 묶이도록 컨텍스트를 넘긴다
+            future = fetch_pool.submit(contextvars.copy_context().run, _fetch_html, url)
+            future.add_done_callback(lambda f, url=url: on_fetched(url, f))
+        fetch_pool.shutdown(wait=True)
+
+        markdowns: dict[str, str] = {}
+        for url, future in conversions.items():
+            try:
+                markdowns[url] = future.result()
+            except Exception as e:
+                logger.warning("[Fetch HTML] Failed to convert %s: %s", url, e)
+        return markdowns
+    finally:
+        fetch_pool.shutdown(wait=False, cancel_futures=True)
+        convert_pool.shutdown(wait=False, cancel_futures=True)
+
 
-        # LLM으로 Markdown 변환
+async def _afetch_and_convert(urls: list[str], llm: BaseChatModel) -> dict[str, str]:
+    """_fetch_and_convert의 비동기 버전."""
+    fetch_semaphore = asyncio.Semaphore(max(1, settings.fetch_concurrency))
+    convert_semaphore = asyncio.Semaphore(max(1, settings.convert_concurrency))
+    markdowns: dict[str, str] = {}
+
+    async def process(url: str) -> None:
+        async with fetch_semaphore:
+            html = await _afetch_html(url)
+        if not html:
+            return
         logger.info("[Fetch HTML] Converting to markdown: %s", url)
-        markdown = _html_to_markdown(html, llm)
+        async with convert_semaphore:
+            try:
+                markdowns[url] = await _ahtml_to_markdown(html, llm)
+            except Exception as e:
+                logger.warning("[Fetch HTML] Failed to convert %s: %s", url, e)
+
+    await asyncio.gather(*(process(url) for url in urls))
+    return markdowns
+
 
-        doc = Document(
-            page_content=markdown,
+def _new_targets(web_results: list[dict], store: VectorStore) -> dict[str, dict]:
+    """아직 저장되지 않은 URL과 검색 결과를 순서대로 반환한다."""
+    targets: dict[str, dict] = {}
+    for result in web_results:
+        url = result.get("href", "")
+        if url and url not in targets:
+            targets[url] = result
+
+    # 이미 저장된 URL은 스킵 (한 번에 조회)
+    for url in store.existing_sources(targets):
+        logger.debug("[Fetch HTML] Already exists: %s", url)
+        del targets[url]
+    return targets
+
+
+def _new_documents(targets: dict[str, dict], markdowns: dict[str, str]) -> list[Document]:
+    # 검색 결과 순서를 유지
+    return [
+        Document(
+            page_content=markdowns[url],
             metadata={
                 "source": url,
                 "title": result.get("title", ""),
             },
         )
-        documents.append(doc)
-        store.add_documents([doc])
+        for url, result in targets.items()
+        if markdowns.get(url, "").strip()
+    ]
+
+
+def fetch_html(
+    state: CRAGState, store: VectorStore, llm: BaseChatModel
+) -> CRAGState:
+    """웹 검색 결과 URL에서 HTML을 가져와 Markdown으로 변환 후 저장한다."""
+    documents = list(state.get("documents", []))
+
+    targets = _new_targets(state.get("web_search_results", []), store)
+    markdowns = _fetch_and_convert(list(targets), llm)
+
+    # 한 번에 저장
+    new_documents = _new_documents(targets, markdowns)
+    documents.extend(new_documents)
+    store.add_documents(new_documents)
+
+    return {
+        **state,
+        "documents": documents,
+    }
+
+
+async def afetch_html(
+    state: CRAGState, store: VectorStore, llm: BaseChatModel
+) -> CRAGState:
+    """fetch_html의 비동기 버전."""
+    documents = list(state.get("documents", []))
+
+    targets = await asyncio.to_thread(_new_targets, state.get("web_search_results", []), store)
+    markdowns = await _afetch_and_convert(list(targets), llm)
+
+    new_documents = _new_documents(targets, markdowns)
+    documents.extend(new_documents)
+    await asyncio.to_thread(store.add_documents, new_documents)
 
     return {
         **state,
@@ -37,7 +37,24 @@ def rewrite_query(state: CRAGState, llm: BaseChatModel) -> CRAGState:
     chain = REWRITER_PROMPT | llm
     response = chain.invoke({"question": question, "reason": reason})
 
-    raw_queries = strip_think_tags(response.content)
+    return _with_queries(state, response.content)
+
+
+async def arewrite_query(state: CRAGState, llm: BaseChatModel) -> CRAGState:
+    """rewrite_query의 비동기 버전."""
+    chain = REWRITER_PROMPT | llm
+    response = await chain.ainvoke(
+        {"question": state["question"], "reason": state.get("web_search_reason", "")}
+    )
+
+    return _with_queries(state, response.content)
+
+
+def _with_queries(state: CRAGState, content: str) -> CRAGState:
+    question = state["question"]
+    reason = state.get("web_search_reason", "")
+
+    raw_queries = strip_think_tags(content)
     queries = [q.strip() for q in raw_queries.strip().split("\n") if q.strip()]
 
     # 3개 미만이면 원본 질문 추가
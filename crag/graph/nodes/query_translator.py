@@ -1,10 +1,17 @@
+import asyncio
+import contextvars
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
+from langchain_core.documents import Document
 from langchain_core.language_models import BaseChatModel
 from langchain_core.prompts import ChatPromptTemplate
 
+from crag.config.settings import settings
+from crag.graph.nodes.retriever import candidate_k, merge_documents, retrieve
 from crag.models.state import CRAGState
-from crag.utils import strip_think_tags
+from crag.utils import is_probably_english, strip_think_tags
+from crag.vectorstore.store import VectorStore
 
 logger = logging.getLogger(__name__)
 
@@ -25,16 +32,133 @@ English query:""",
 )
 
 
+def _needs_translation(question: str) -> bool:
+    if settings.translate_mode == "always":
+        return True
+    if is_probably_english(question):
+        logger.info("[Translate] Skipped (already English): %s", question)
+        return False
+    return True
+
+
 def translate_query(state: CRAGState, llm: BaseChatModel) -> CRAGState:
-    """최초 검색을 위해 질문을 영어로 번역."""
+    """최초 검색을 위해 질문을 영어로 번역. 이미 영어면 LLM을 부르지 않는다."""
     question = state["question"]
+    if not _needs_translation(question):
+        return {**state, "search_query": question}
 
     chain = TRANSLATOR_PROMPT | llm
     response = chain.invoke({"question": question})
 
-    translated_query = strip_think_tags(response.content)
+    return _with_translation(state, response.content)
+
+
+async def atranslate_query(state: CRAGState, llm: BaseChatModel) -> CRAGState:
+    """translate_query의 비동기 버전."""
+    question = state["question"]
+    if not _needs_translation(question):
+        return {**state, "search_query": question}
+
+    chain = TRANSLATOR_PROMPT | llm
+    response = await chain.ainvoke({"question": question})
+
+    return _with_translation(state, response.content)
+
+
+def translate_and_retrieve(
+    state: CRAGState, llm: BaseChatModel, store: VectorStore
+) -> CRAGState:
+    """번역하는 동안 원문 질문으로 먼저 검색하고, 번역된 질문의 결과와 합친다.
+
+    원문 검색 결과가 이미 확실히 관련 있으면(grader_relevant_threshold 이상)
+    번역하지 않는다. 스레드에서 시작한 LLM 호출은 취소할 수 없으므로, 임계값이
+    있으면 번역은 원문 검색이 확실하지 않을 때만 검색 뒤에 부른다.
+    """
+    question = state["question"]
+    if not _needs_translation(question):
+        return retrieve({**state, "search_query": question}, store)
+
+    chain = TRANSLATOR_PROMPT | llm
+    if settings.grader_relevant_threshold is not None:
+        original = store.search(question, candidate_k())
+        if _is_decisive(original):
+            return _with_original(state, original)
+        translated = _with_translation(state, chain.invoke({"question": question}).content)
+    else:
+        # 원문 결과로 끝낼 수 없으므로 번역은 항상 필요하다: 검색과 겹쳐 실행
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(
+                contextvars.copy_context().run, chain.invoke, {"question": question}
+            )
+            original = store.search(question, candidate_k())
+            translated = _with_translation(state, future.result().content)
+
+    documents = store.search(translated["search_query"], candidate_k())
+    return _with_merged(translated, documents, original)
+
+
+async def atranslate_and_retrieve(
+    state: CRAGState, llm: BaseChatModel, store: VectorStore
+) -> CRAGState:
+    """translate_and_retrieve의 비동기 버전. 번역은 원문 검색과 동시에 시작하고,
+    원문 결과가 확실하면 번역 태스크를 취소한다.
+    """
+    question = state["question"]
+    if not _needs_translation(question):
+        return await asyncio.to_thread(retrieve, {**state, "search_query": question}, store)
+
+    chain = TRANSLATOR_PROMPT | llm
+    task = asyncio.create_task(chain.ainvoke({"question": question}))
+    try:
+        original = await asyncio.to_thread(store.search, question, candidate_k())
+        if _is_decisive(original):
+            return _with_original(state, original)
+        translated = _with_translation(state, (await task).content)
+    finally:
+        if not task.done():
+            task.cancel()
+
+    documents = await asyncio.to_thread(
+        store.search, translated["search_query"], candidate_k()
+    )
+    return _with_merged(translated, documents, original)
+
+
+def _is_decisive(documents: list[Document]) -> bool:
+    threshold = settings.grader_relevant_threshold
+    return threshold is not None and any(
+        doc.metadata.get("score", 0.0) >= threshold for doc in documents
+    )
+
+
+def _with_original(state: CRAGState, documents: list[Document]) -> CRAGState:
+    logger.info("[Translate] Original question already retrieved relevant documents")
+    return {
+        **state,
+        "search_query": state["question"],
+        "documents": documents,
+    }
+
+
+def _with_merged(
+    state: CRAGState, translated: list[Document], original: list[Document]
+) -> CRAGState:
+    documents = merge_documents(translated, original, candidate_k())
+    logger.info(
+        "[Retrieve] '%s' + original question -> %d documents",
+        state["search_query"],
+        len(documents),
+    )
+    return {
+        **state,
+        "documents": documents,
+    }
+
+
+def _with_translation(state: CRAGState, content: str) -> CRAGState:
+    translated_query = strip_think_tags(content)
 
-    logger.info("[Translate] %s -> %s", question, translated_query)
+    logger.info("[Translate] %s -> %s", state["question"], translated_query)
 
     return {
         **state,
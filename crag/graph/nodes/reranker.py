@@ -0,0 +1,25 @@
+import asyncio
+import logging
+
+from crag.models.state import CRAGState
+from crag.vectorstore.reranker import Reranker
+
+logger = logging.getLogger(__name__)
+
+
+def rerank(state: CRAGState, reranker: Reranker) -> CRAGState:
+    """검색된 후보 문서를 cross-encoder로 다시 정렬해 상위 문서만 채점/생성에 넘긴다."""
+    search_query = state.get("search_query") or state["question"]
+    documents = reranker.rerank(search_query, state["documents"])
+
+    logger.info("[Rerank] %d -> %d documents", len(state["documents"]), len(documents))
+
+    return {
+        **state,
+        "documents": documents,
+    }
+
+
+async def arerank(state: CRAGState, reranker: Reranker) -> CRAGState:
+    """rerank의 비동기 버전. 모델 추론은 스레드에서 실행한다."""
+    return await asyncio.to_thread(rerank, state, reranker)
@@ -1,14 +1,25 @@
+import asyncio
 import logging
 
+from langchain_core.documents import Document
+
+from crag.config.settings import settings
 from crag.models.state import CRAGState
 from crag.vectorstore.store import VectorStore
 
 logger = logging.getLogger(__name__)
 
 
+def candidate_k() -> int:
+    """검색할 문서 수. 재정렬을 켜면 더 많은 후보를 가져와 rerank 노드가 추린다."""
+    if settings.rerank_enabled:
+        return max(settings.rerank_candidates, settings.retriever_k)
+    return settings.retriever_k
+
+
 def retrieve(state: CRAGState, store: VectorStore) -> CRAGState:
     search_query = state.get("search_query") or state["question"]
-    documents = store.search(search_query)
+    documents = store.search(search_query, candidate_k())
 
     logger.info("[Retrieve] '%s' -> %d documents", search_query, len(documents))
 
@@ -16,3 +27,21 @@ def retrieve(state: CRAGState, store: VectorStore) -> CRAGState:
         **state,
         "documents": documents,
     }
+
+
+async def aretrieve(state: CRAGState, store: VectorStore) -> CRAGState:
+    """retrieve의 비동기 버전. 임베딩과 DB 조회는 스레드에서 실행한다."""
+    return await asyncio.to_thread(retrieve, state, store)
+
+
+def merge_documents(
+    primary: list[Document], secondary: list[Document], k: int
+) -> list[Document]:
+    """두 검색 결과를 점수 순으로 합쳐 상위 k개를 반환한다. 같은 chunk는 점수가 높은 쪽을 남긴다."""
+    best: dict[str, Document] = {}
+    for doc in primary + secondary:
+        kept = best.get(doc.page_content)
+        if kept is None or doc.metadata.get("score", 0.0) > kept.metadata.get("score", 0.0):
+            best[doc.page_content] = doc
+    merged = sorted(best.values(), key=lambda doc: doc.metadata.get("score", 0.0), reverse=True)
+    return merged[:k]
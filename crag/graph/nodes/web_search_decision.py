@@ -1,6 +1,10 @@
+import asyncio
+
 from langchain_core.language_models import BaseChatModel
 from langchain_core.prompts import ChatPromptTemplate
 
+from crag.config.settings import settings
+from crag.graph.context import Embed, pack_context
 from crag.models.state import CRAGState
 from crag.utils import strip_think_tags
 
@@ -40,38 +44,66 @@ Should we perform a web search? Respond with DECISION and REASON.""",
 )
 
 
-def decide_web_search(state: CRAGState, llm: BaseChatModel) -> CRAGState:
+def decide_web_search(
+    state: CRAGState, llm: BaseChatModel, embed: Embed | None = None
+) -> CRAGState:
     """
     웹 서치가 필요한지 판단하는 노드.
 
     검색된 문서의 관련성과 질문의 특성을 고려하여
     웹 서치가 필요한지 LLM을 통해 판단한다.
     """
-    question = state["question"]
+    # 문서가 관련 있으면 웹 서치 불필요
+    if state.get("documents_relevant", False):
+        return _no_search_needed(state)
+
+    chain = DECISION_PROMPT | llm
+    response = chain.invoke(_prompt_inputs(state, embed))
+
+    return _with_decision(state, response.content)
+
+
+async def adecide_web_search(
+    state: CRAGState, llm: BaseChatModel, embed: Embed | None = None
+) -> CRAGState:
+    """decide_web_search의 비동기 버전."""
+    if state.get("documents_relevant", False):
+        return _no_search_needed(state)
+
+    chain = DECISION_PROMPT | llm
+    inputs = await asyncio.to_thread(_prompt_inputs, state, embed)
+    response = await chain.ainvoke(inputs)
+
+    return _with_decision(state, response.content)
+
+
+def _no_search_needed(state: CRAGState) -> CRAGState:
+    return {
+        **state,
+        "needs_web_search": False,
+        "web_search_reason": "검색된 문서가 질문과 관련이 있어 웹 서치가 필요하지 않습니다.",
+    }
+
+
+def _prompt_inputs(state: CRAGState, embed: Embed | None) -> dict:
     documents = state["documents"]
     is_relevant = state.get("documents_relevant", False)
 
-    # 문서가 관련 있으면 웹 서치 불필요
-    if is_relevant:
-        return {
-            **state,
-            "needs_web_search": False,
-            "web_search_reason": "검색된 문서가 질문과 관련이 있어 웹 서치가 필요하지 않습니다.",
-        }
-
+    packed = pack_context(documents, settings.decision_token_budget, embed, "decide_web_search")
     docs_text = "\n\n".join(
-        [f"Document {i + 1}:\n{doc.page_content[:500]}..." for i, doc in enumerate(documents)]
+        [f"Document {i + 1}:\n{doc.page_content}" for i, doc in enumerate(packed.documents)]
     ) if documents else "(No documents retrieved)"
 
-    chain = DECISION_PROMPT | llm
-    response = chain.invoke({
-        "question": question,
+    return {
+        "question": state["question"],
         "doc_count": len(documents),
         "is_relevant": "yes" if is_relevant else "no",
         "documents": docs_text,
-    })
+    }
+
 
-    content = strip_think_tags(response.content)
+def _with_decision(state: CRAGState, content: str) -> CRAGState:
+    content = strip_think_tags(content)
 
     # 응답 파싱
     needs_search = False
@@ -1,7 +1,7 @@
 import logging
 
 from crag.models.state import CRAGState
-from crag.web.search import WebSearchStrategy
+from crag.web.search import SearchResult, WebSearcher, WebSearchStrategy
 
 logger = logging.getLogger(__name__)
 
@@ -9,12 +9,33 @@ logger = logging.getLogger(__name__)
 def web_search(state: CRAGState, strategy: WebSearchStrategy) -> CRAGState:
     search_queries = state.get("web_search_queries") or [state["question"]]
 
-    # 여러 검색어로 웹 검색하고 결과 합치기 (URL 기준 중복 제거)
+    # 여러 검색어를 동시에 검색
+    results_per_query = WebSearcher(strategy).search_many(search_queries, max_results=3)
+
+    return _with_results(state, search_queries, results_per_query)
+
+
+async def aweb_search(state: CRAGState, strategy: WebSearchStrategy) -> CRAGState:
+    """web_search의 비동기 버전."""
+    search_queries = state.get("web_search_queries") or [state["question"]]
+
+    results_per_query = await WebSearcher(strategy).asearch_many(
+        search_queries, max_results=3
+    )
+
+    return _with_results(state, search_queries, results_per_query)
+
+
+def _with_results(
+    state: CRAGState,
+    search_queries: list[str],
+    results_per_query: list[list[SearchResult]],
+) -> CRAGState:
+    # 검색어 순서대로 결과 합치기 (URL 기준 중복 제거)
     seen_urls: set[str] = set()
     all_results: list[dict] = []
 
-    for query in search_queries:
-        results = strategy.search(query, max_results=3)
+    for query, results in zip(search_queries, results_per_query):
         new_count = 0
         for result in results:
             url = result.href
@@ -14,3 +14,19 @@ class CRAGState(TypedDict):
     documents_relevant: bool
     needs_web_search: bool
     web_search_reason: str
+
+
+def initial_state(question: str) -> CRAGState:
+    """질문 하나에 대한 그래프 초기 상태."""
+    return {
+        "question": question,
+        "search_query": question,
+        "web_search_queries": [],
+        "documents": [],
+        "web_search_results": [],
+        "generation": "",
+        "retry_count": 0,
+        "documents_relevant": False,
+        "needs_web_search": False,
+        "web_search_reason": "",
+    }
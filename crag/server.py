@@ -0,0 +1,195 @@
+import asyncio
+import json
+import logging
+import time
+from http import HTTPStatus
+
+from crag.cache.answer_cache import SemanticAnswerCache
+from crag.config.settings import settings
+from crag.models.state import initial_state
+from crag.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+_MAX_BODY = 64 * 1024
+
+
+class ServerBusy(Exception):
+    pass
+
+
+class CRAGServer:
+    """컴파일된 그래프 하나로 여러 질문을 동시에 처리하는 HTTP 서버.
+
+    동시에 실행하는 그래프 수는 max_concurrency로 제한하고, 대기열이 max_queue를
+    넘으면 새 요청을 503으로 거절한다.
+
+    - POST /ask  {"question": "..."} -> {"question", "generation", "retry_count", "cached", "elapsed"}
+    - GET /health
+    - GET /metrics  (Prometheus 텍스트 형식)
+    """
+
+    def __init__(
+        self,
+        graph,
+        answer_cache: SemanticAnswerCache | None = None,
+        max_concurrency: int | None = None,
+        max_queue: int | None = None,
+        request_timeout: float | None = None,
+    ) -> None:
+        self._graph = graph
+        self._answer_cache = answer_cache
+        self._max_concurrency = max_concurrency or settings.server_max_concurrency
+        self._max_queue = max_queue if max_queue is not None else settings.server_max_queue
+        self._request_timeout = request_timeout or settings.server_request_timeout
+        self._slots = asyncio.Semaphore(self._max_concurrency)
+        self._running = 0
+        self._waiting = 0
+
+    async def answer(self, question: str) -> dict:
+        start = time.perf_counter()
+
+        if self._answer_cache is not None:
+            cached = await asyncio.to_thread(self._answer_cache.get, question)
+            if cached is not None:
+                return {
+                    "question": question,
+                    "generation": cached[0],
+                    "retry_count": 0,
+                    "cached": True,
+                    "elapsed": time.perf_counter() - start,
+                }
+
+        if self._waiting >= self._max_queue:
+            raise ServerBusy
+
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+
+        self._running += 1
+        try:
+            with tracer.trace():
+                result = await asyncio.wait_for(
+                    self._graph.ainvoke(initial_state(question)), self._request_timeout
+                )
+        finally:
+            self._running -= 1
+            self._slots.release()
+
+        if self._answer_cache is not None and result["generation"]:
+            await asyncio.to_thread(self._answer_cache.put, question, result["generation"])
+
+        return {
+            "question": question,
+            "generation": result["generation"],
+            "retry_count": result.get("retry_count", 0),
+            "cached": False,
+            "elapsed": time.perf_counter() - start,
+        }
+
+    async def _read_request(
+        self, reader: asyncio.StreamReader
+    ) -> tuple[str, str, bytes]:
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        method, path, _ = request_line.split(" ", 2)
+
+        headers: dict[str, str] = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get("content-length", "0"))
+        if length > _MAX_BODY:
+            raise ValueError("request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return method, path, body
+
+    async def _route(
+        self, method: str, path: str, body: bytes
+    ) -> tuple[HTTPStatus, dict | str]:
+        if method == "GET" and path == "/metrics":
+            return HTTPStatus.OK, tracer.render_prometheus()
+
+        if method == "GET" and path == "/health":
+            return HTTPStatus.OK, {
+                "status": "ok",
+                "running": self._running,
+                "queued": self._waiting,
+            }
+
+        if path != "/ask":
+            return HTTPStatus.NOT_FOUND, {"error": "not found"}
+        if method != "POST":
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "use POST"}
+
+        try:
+            question = json.loads(body or b"{}").get("question", "").strip()
+        except (json.JSONDecodeError, AttributeError):
+            return HTTPStatus.BAD_REQUEST, {"error": "invalid JSON"}
+        if not question:
+            return HTTPStatus.BAD_REQUEST, {"error": "question is required"}
+
+        try:
+            return HTTPStatus.OK, await self.answer(question)
+        except ServerBusy:
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": "server busy"}
+        except TimeoutError:
+            return HTTPStatus.GATEWAY_TIMEOUT, {"error": "timed out"}
+        except Exception as e:
+            logger.exception("[Serve] Failed to answer %r", question)
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            try:
+                method, path, body = await self._read_request(reader)
+            except (ValueError, asyncio.IncompleteReadError) as e:
+                status, payload = HTTPStatus.BAD_REQUEST, {"error": str(e) or "bad request"}
+            else:
+                status, payload = await self._route(method, path, body)
+
+            if isinstance(payload, str):
+                data = payload.encode("utf-8")
+                content_type = "text/plain; version=0.0.4; charset=utf-8"
+            else:
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                content_type = "application/json; charset=utf-8"
+            headers = [
+                f"HTTP/1.1 {status.value} {status.phrase}",
+                f"Content-Type: {content_type}",
+                f"Content-Length: {len(data)}",
+                "Connection: close",
+            ]
+            if status == HTTPStatus.SERVICE_UNAVAILABLE:
+                headers.append("Retry-After: 1")
+            writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + data)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str | None = None, port: int | None = None) -> None:
+        host = host or settings.server_host
+        port = port or settings.server_port
+        server = await asyncio.start_server(self._handle, host, port)
+        logger.info(
+            "[Serve] Listening on http://%s:%d (concurrency %d, queue %d)",
+            host,
+            port,
+            self._max_concurrency,
+            self._max_queue,
+        )
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            from crag.graph.nodes.html_fetcher import aclose_async_client
+
+            await aclose_async_client()
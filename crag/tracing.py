@@ -0,0 +1,284 @@
+import json
+import logging
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models import BaseChatModel
+from langchain_core.outputs import LLMResult
+
+logger = logging.getLogger(__name__)
+
+_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_trace_id: ContextVar[str | None] = ContextVar("crag_trace_id", default=None)
+
+LabelKey = tuple[tuple[str, str], ...]
+
+
+@dataclass
+class Span:
+    """한 번의 작업(노드, LLM 호출, 검색, fetch, 벡터스토어 연산) 기록.
+
+    labels는 Prometheus 레이블로 쓰이는 값(노드 이름 등), counts는 합산되는 수치
+    (토큰 수, 바이트, 임베딩한 문서 수 등)다.
+    """
+
+    name: str
+    labels: dict[str, str] = field(default_factory=dict)
+    counts: dict[str, float] = field(default_factory=dict)
+    trace_id: str | None = None
+    start: float = 0.0
+    duration: float = 0.0
+    error: str | None = None
+
+    def add(self, key: str, value: float = 1) -> None:
+        self.counts[key] = self.counts.get(key, 0) + value
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class Collector:
+    """tracer.collect() 구간 동안 끝난 span과 카운터 증가분."""
+
+    def __init__(self) -> None:
+        self.spans: list[Span] = []
+        self.counters: dict[tuple[str, LabelKey], float] = {}
+
+
+class Tracer:
+    """span을 모아 Prometheus용 집계를 유지하고 등록된 exporter로 내보낸다."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._exporters: list[Callable[[Span], None]] = []
+        self._collectors: list[Collector] = []
+        # (span 이름, 레이블) -> [버킷별 개수..., 합계, 개수]
+        self._histograms: dict[tuple[str, LabelKey], list[float]] = {}
+        self._errors: dict[tuple[str, LabelKey], int] = {}
+        # (메트릭 이름, 레이블) -> 누적 값
+        self._counters: dict[tuple[str, LabelKey], float] = {}
+
+    def add_exporter(self, exporter: Callable[[Span], None]) -> None:
+        self._exporters.append(exporter)
+
+    @contextmanager
+    def trace(self, trace_id: str | None = None) -> Iterator[str]:
+        """이 구간에서 만들어지는 span에 같은 trace_id를 붙인다 (질문 하나 단위)."""
+        trace_id = trace_id or uuid.uuid4().hex
+        token = _trace_id.set(trace_id)
+        try:
+            yield trace_id
+        finally:
+            _trace_id.reset(token)
+
+    @contextmanager
+    def span(self, name: str, **labels: str) -> Iterator[Span]:
+        span = Span(name=name, labels=labels, trace_id=_trace_id.get(), start=time.time())
+        start = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.error = type(e).__name__
+            raise
+        finally:
+            span.duration = time.perf_counter() - start
+            self.record(span)
+
+    def record(self, span: Span) -> None:
+        """끝난 span을 집계하고 내보낸다."""
+        key = (span.name, tuple(sorted(span.labels.items())))
+        with self._lock:
+            histogram = self._histograms.setdefault(key, [0.0] * (len(_BUCKETS) + 2))
+            for i, bound in enumerate(_BUCKETS):
+                if span.duration <= bound:
+                    histogram[i] += 1
+            histogram[-2] += span.duration
+            histogram[-1] += 1
+            if span.error:
+                self._errors[key] = self._errors.get(key, 0) + 1
+            for count, value in span.counts.items():
+                self._increment(f"{span.name}_{count}", key[1], value)
+            for collector in self._collectors:
+                collector.spans.append(span)
+
+        for exporter in self._exporters:
+            try:
+                exporter(span)
+            except Exception as e:
+                logger.warning("[Tracing] Exporter failed: %s", e)
+
+    def increment(self, name: str, value: float = 1, **labels: str) -> None:
+        """span과 무관한 카운터 (캐시 히트 등)."""
+        with self._lock:
+            self._increment(name, tuple(sorted(labels.items())), value)
+
+    def _increment(self, name: str, labels: LabelKey, value: float) -> None:
+        key = (name, labels)
+        self._counters[key] = self._counters.get(key, 0) + value
+        for collector in self._collectors:
+            collector.counters[key] = collector.counters.get(key, 0) + value
+
+    @contextmanager
+    def collect(self) -> Iterator[Collector]:
+        """구간 동안 끝난 span과 카운터 증가분을 모은다 (--profile 등)."""
+        collector = Collector()
+        with self._lock:
+            self._collectors.append(collector)
+        try:
+            yield collector
+        finally:
+            with self._lock:
+                self._collectors.remove(collector)
+
+    def render_prometheus(self) -> str:
+        """Prometheus 텍스트 노출 형식."""
+        with self._lock:
+            histograms = dict(self._histograms)
+            errors = dict(self._errors)
+            counters = dict(self._counters)
+
+        lines = [
+            "# HELP crag_span_duration_seconds Duration of traced operations.",
+            "# TYPE crag_span_duration_seconds histogram",
+        ]
+        for (name, labels), values in sorted(histograms.items()):
+            base = (("span", name),) + labels
+            for bound, count in zip(_BUCKETS, values):
+                lines.append(
+                    f"crag_span_duration_seconds_bucket{_labels(base + (('le', str(bound)),))} "
+                    f"{count:g}"
+                )
+            lines.append(
+                f"crag_span_duration_seconds_bucket{_labels(base + (('le', '+Inf'),))} "
+                f"{values[-1]:g}"
+            )
+            lines.append(f"crag_span_duration_seconds_sum{_labels(base)} {values[-2]:.6f}")
+            lines.append(f"crag_span_duration_seconds_count{_labels(base)} {values[-1]:g}")
+
+        lines.append("# TYPE crag_span_errors_total counter")
+        for (name, labels), count in sorted(errors.items()):
+            lines.append(f"crag_span_errors_total{_labels((('span', name),) + labels)} {count}")
+
+        by_metric: dict[str, list[tuple[LabelKey, float]]] = {}
+        for (name, labels), value in counters.items():
+            by_metric.setdefault(_metric_name(name), []).append((labels, value))
+        for metric, rows in sorted(by_metric.items()):
+            lines.append(f"# TYPE {metric} counter")
+            for labels, value in sorted(rows):
+                lines.append(f"{metric}{_labels(labels)} {value:g}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _metric_name(name: str) -> str:
+    cleaned = "".join(c if c.isalnum() else "_" for c in name.lower())
+    return f"crag_{cleaned}_total"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: LabelKey) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+class JsonlExporter:
+    """끝난 span을 JSON 한 줄씩 파일에 추가한다."""
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self._lock = threading.Lock()
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+
+    def __call__(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), ensure_ascii=False)
+        with self._lock, self._path.open("a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+class LLMTracingHandler(BaseCallbackHandler):
+    """노드의 LLM 호출마다 소요 시간과 프롬프트/생성 토큰 수를 llm span으로 기록한다."""
+
+    run_inline = True
+
+    def __init__(self, tracer: Tracer, node: str) -> None:
+        self._tracer = tracer
+        self._node = node
+        self._started: dict[UUID, tuple[float, float, str | None]] = {}
+
+    def _start(self, run_id: UUID) -> None:
+        self._started[run_id] = (time.time(), time.perf_counter(), _trace_id.get())
+
+    def on_chat_model_start(
+        self, serialized: dict, messages: list, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._start(run_id)
+
+    def on_llm_start(
+        self, serialized: dict, prompts: list[str], *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._start(run_id)
+
+    def _finish(self, run_id: UUID, response: LLMResult | None, error: str | None) -> None:
+        started = self._started.pop(run_id, None)
+        if started is None:
+            return
+        span = Span(
+            name="llm",
+            labels={"node": self._node},
+            trace_id=started[2],
+            start=started[0],
+            duration=time.perf_counter() - started[1],
+            error=error,
+        )
+        span.add("calls")
+        if response is not None:
+            prompt_tokens, completion_tokens = _token_usage(response)
+            span.add("prompt_tokens", prompt_tokens)
+            span.add("completion_tokens", completion_tokens)
+        self._tracer.record(span)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, response, None)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, None, type(error).__name__)
+
+
+def _token_usage(response: LLMResult) -> tuple[int, int]:
+    """응답의 (프롬프트 토큰, 생성 토큰). 모델이 알려주지 않으면 0."""
+    prompt_tokens = completion_tokens = 0
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                prompt_tokens += usage.get("input_tokens", 0)
+                completion_tokens += usage.get("output_tokens", 0)
+    if not (prompt_tokens or completion_tokens):
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        prompt_tokens = usage.get("prompt_tokens", 0)
+        completion_tokens = usage.get("completion_tokens", 0)
+    return prompt_tokens, completion_tokens
+
+
+def with_node_tracing(llm: BaseChatModel, node: str) -> BaseChatModel:
+    """LLM 호출을 노드 이름으로 기록하는 콜백을 붙인 사본을 반환한다."""
+    callbacks = list(llm.callbacks) if isinstance(llm.callbacks, list) else []
+    callbacks.append(LLMTracingHandler(tracer, node))
+    return llm.model_copy(update={"callbacks": callbacks})
+
+
+tracer = Tracer()
@@ -1,7 +1,122 @@
+import hashlib
 import re
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future
 
 
 def strip_think_tags(text: str) -> str:
     """Remove <think>...</think> tags from Qwen3 output."""
     result = re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL)
     return result.strip()
+
+
+class ThinkTagFilter:
+    """스트리밍 출력에서 <think>...</think> 구간을 걸러낸다.
+
+    태그가 chunk 경계에 걸쳐 나뉘어 와도 동작하며, strip_think_tags처럼
+    답변 앞의 공백도 제거한다.
+    """
+
+    _OPEN = "<think>"
+    _CLOSE = "</think>"
+
+    def __init__(self) -> None:
+        self._buffer = ""
+        self._inside = False
+        self._started = False
+
+    def _emit(self, text: str) -> str:
+        if not self._started:
+            text = text.lstrip()
+            self._started = bool(text)
+        return text
+
+    def feed(self, text: str) -> str:
+        """새 chunk를 받아 지금까지 확정된 보이는 텍스트를 반환한다."""
+        self._buffer += text
+        out: list[str] = []
+        while True:
+            tag = self._CLOSE if self._inside else self._OPEN
+            index = self._buffer.find(tag)
+            if index >= 0:
+                if not self._inside:
+                    out.append(self._buffer[:index])
+                self._buffer = self._buffer[index + len(tag) :]
+                self._inside = not self._inside
+                continue
+
+            # 태그의 앞부분일 수 있는 끝부분은 다음 chunk까지 보류
+            keep = 0
+            for k in range(min(len(tag) - 1, len(self._buffer)), 0, -1):
+                if self._buffer.endswith(tag[:k]):
+                    keep = k
+                    break
+            if not self._inside:
+                out.append(self._buffer[: len(self._buffer) - keep])
+            self._buffer = self._buffer[len(self._buffer) - keep :]
+            break
+        return self._emit("".join(out))
+
+    def flush(self) -> str:
+        """남은 텍스트를 반환한다. 닫히지 않은 <think> 구간은 버린다."""
+        rest = "" if self._inside else self._buffer
+        self._buffer = ""
+        return self._emit(rest)
+
+
+# 영어가 아닌 라틴 문자 언어에서 흔한 기능어 (스페인어, 프랑스어, 독일어, 포르투갈어, 이탈리아어)
+_NON_ENGLISH_WORDS = frozenset(
+    "el los las del que por para como qué cómo es una uno "
+    "le les des est une dans pour avec qui quoi comment "
+    "der die das und ist nicht ein eine wie mit "
+    "não uma com quem onde "
+    "il di che non per come cosa".split()
+)
+
+
+def is_probably_english(text: str) -> bool:
+    """문자 체계와 기능어로 영어 질문인지 빠르게 추정한다.
+
+    글자가 모두 ASCII이고 다른 라틴 문자 언어의 기능어가 단어의 1/4 이하이면 영어로 본다.
+    """
+    letters = [c for c in text if c.isalpha()]
+    if any(not c.isascii() for c in letters):
+        return False
+    words = re.findall(r"[a-z]+", text.lower())
+    foreign = sum(word in _NON_ENGLISH_WORDS for word in words)
+    return foreign * 4 <= len(words)
+
+
+def content_hash(*parts: str) -> str:
+    """프로세스와 무관하게 항상 같은 값을 주는 내용 해시."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def percentile(values: list[float], p: float) -> float:
+    """선형 보간 백분위수 (p는 0~100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * p / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def run_in_background(load: Callable[[], object]) -> Future:
+    """load를 데몬 스레드에서 실행한다 (로드 중에 CLI가 끝나도 종료를 막지 않음)."""
+    future: Future = Future()
+
+    def run() -> None:
+        try:
+            future.set_result(load())
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name="crag-load", daemon=True).start()
+    return future
@@ -0,0 +1,165 @@
+import math
+import re
+import sqlite3
+import threading
+from collections import Counter
+from pathlib import Path
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    length INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS docs_source ON docs (source);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    doc_id TEXT NOT NULL,
+    tf INTEGER NOT NULL,
+    PRIMARY KEY (term, doc_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc_id);
+"""
+
+_TOKEN = re.compile(r"\w+(?:[.\-:/]\w+)*")
+
+
+def tokenize(text: str) -> list[str]:
+    """소문자 단어 토큰.
+
+    식별자(OLLAMA_HOST, E1101, v1.2.3)는 통째로 남기고, 구분자로 이어진 토큰은
+    조각도 함께 넣어 부분 일치도 잡는다.
+    """
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        tokens.append(token)
+        parts = re.split(r"[.\-:/_]", token)
+        if len(parts) > 1:
+            tokens.extend(part for part in parts if part)
+    return tokens
+
+
+class BM25Index:
+    """chunk id 단위로 BM25 점수를 계산하는 SQLite 역색인.
+
+    벡터스토어와 같은 chunk id를 쓰며, 본문은 저장하지 않고 (term, chunk) 빈도만 저장한다.
+    """
+
+    def __init__(self, path: Path, k1: float = 1.2, b: float = 0.75) -> None:
+        self._path = path
+        self._k1 = k1
+        self._b = b
+        self._lock = threading.Lock()
+        # (문서 수, 평균 길이). 쓰기가 일어나면 다시 계산한다
+        self._stats: tuple[int, float] | None = None
+
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self._path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def add(self, ids: list[str], texts: list[str], sources: list[str]) -> None:
+        """chunk를 추가한다. 이미 있는 id는 새 내용으로 바꾼다."""
+        docs = []
+        postings = []
+        for doc_id, text, source in zip(ids, texts, sources):
+            counts = Counter(tokenize(text))
+            docs.append((doc_id, source, sum(counts.values())))
+            postings.extend((term, doc_id, tf) for term, tf in counts.items())
+
+        with self._lock:
+            self._delete_ids(ids)
+            self._conn.executemany(
+                "INSERT INTO docs (id, source, length) VALUES (?, ?, ?)", docs
+            )
+            self._conn.executemany(
+                "INSERT INTO postings (term, doc_id, tf) VALUES (?, ?, ?)", postings
+            )
+            self._conn.commit()
+            self._stats = None
+
+    def delete_ids(self, ids: list[str]) -> None:
+        with self._lock:
+            self._delete_ids(ids)
+            self._conn.commit()
+            self._stats = None
+
+    def _delete_ids(self, ids: list[str]) -> None:
+        for start in range(0, len(ids), 500):
+            batch = ids[start : start + 500]
+            marks = ",".join("?" * len(batch))
+            self._conn.execute(f"DELETE FROM postings WHERE doc_id IN ({marks})", batch)
+            self._conn.execute(f"DELETE FROM docs WHERE id IN ({marks})", batch)
+
+    def delete_sources(self, sources: list[str]) -> None:
+        with self._lock:
+            for start in range(0, len(sources), 500):
+                batch = sources[start : start + 500]
+                marks = ",".join("?" * len(batch))
+                self._conn.execute(
+                    f"DELETE FROM postings WHERE doc_id IN "
+                    f"(SELECT id FROM docs WHERE source IN ({marks}))",
+                    batch,
+                )
+                self._conn.execute(f"DELETE FROM docs WHERE source IN ({marks})", batch)
+            self._conn.commit()
+            self._stats = None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM postings")
+            self._conn.execute("DELETE FROM docs")
+            self._conn.commit()
+            self._stats = None
+
+    def ids(self) -> set[str]:
+        with self._lock:
+            return {row[0] for row in self._conn.execute("SELECT id FROM docs")}
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def search(self, query: str, k: int) -> list[tuple[str, float]]:
+        """BM25 점수 상위 k개의 (chunk id, 점수)."""
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+
+        with self._lock:
+            if self._stats is None:
+                count, total = self._conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM docs"
+                ).fetchone()
+                self._stats = (count, total / count if count else 0.0)
+            doc_count, avg_length = self._stats
+            if doc_count == 0:
+                return []
+
+            scores: dict[str, float] = {}
+            for term in terms:
+                rows = self._conn.execute(
+                    "SELECT p.doc_id, p.tf, d.length FROM postings p "
+                    "JOIN docs d ON d.id = p.doc_id WHERE p.term = ?",
+                    (term,),
+                ).fetchall()
+                if not rows:
+                    continue
+                idf = math.log(1 + (doc_count - len(rows) + 0.5) / (len(rows) + 0.5))
+                for doc_id, tf, length in rows:
+                    norm = self._k1 * (1 - self._b + self._b * length / avg_length)
+                    weight = tf * (self._k1 + 1) / (tf + norm)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * weight
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+
+def reciprocal_rank_fusion(
+    rankings: list[list[str]], weights: list[float], k: int = 60
+) -> list[tuple[str, float]]:
+    """여러 순위 목록을 RRF(가중치 / (k + 순위))로 합친다."""
+    scores: dict[str, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, doc_id in enumerate(ranking, 1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + weight / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
@@ -0,0 +1,178 @@
+import re
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from langchain_core.documents import Document
+
+from crag.utils import content_hash
+
+_SENTENCE_RE = re.compile(r"[^\n.!?。！？]*(?:[.!?。！？]+|\n+|$)\s*")
+_WORD_RE = re.compile(r"\S+\s*")
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def approximate_token_count(text: str) -> int:
+    """토크나이저가 없을 때 사용하는 근사 토큰 수."""
+    return len(_TOKEN_RE.findall(text))
+
+
+def split_sentences(text: str) -> list[str]:
+    """빈 문장을 뺀 문장 목록."""
+    return [m.group().strip() for m in _SENTENCE_RE.finditer(text) if m.group().strip()]
+
+
+@dataclass
+class _Unit:
+    start: int
+    end: int
+    tokens: int
+
+
+class Chunker:
+    """문서를 토큰 또는 문장 단위로 겹치게 나눈다.
+
+    mode가 "sentences"이면 문장 경계에서만 자르고, 한 문장이 chunk_size보다 길면
+    단어 단위로 나눈다. "tokens"이면 단어 단위로 chunk_size까지 채운다.
+    """
+
+    def __init__(
+        self,
+        mode: str = "sentences",
+        chunk_size: int = 400,
+        chunk_overlap: int = 50,
+        count_tokens: Callable[[str], int] | None = None,
+    ) -> None:
+        if mode not in ("tokens", "sentences", "none"):
+            raise ValueError(f"Unknown chunk mode: {mode}")
+        if chunk_overlap >= chunk_size:
+            raise ValueError("chunk_overlap must be smaller than chunk_size")
+        self._mode = mode
+        self._chunk_size = chunk_size
+        self._chunk_overlap = chunk_overlap
+        self._count_tokens = count_tokens or approximate_token_count
+
+    def _units(self, text: str) -> list[_Unit]:
+        pattern = _SENTENCE_RE if self._mode == "sentences" else _WORD_RE
+        units: list[_Unit] = []
+        for match in pattern.finditer(text):
+            if not match.group().strip():
+                continue
+            tokens = self._count_tokens(match.group())
+            if tokens > self._chunk_size and pattern is _SENTENCE_RE:
+                # 너무 긴 문장은 단어 단위로
+                for word in _WORD_RE.finditer(match.group()):
+                    units.append(
+                        _Unit(
+                            match.start() + word.start(),
+                            match.start() + word.end(),
+                            self._count_tokens(word.group()),
+                        )
+                    )
+            else:
+                units.append(_Unit(match.start(), match.end(), tokens))
+        return units
+
+    def split_text(self, text: str) -> list[tuple[int, int]]:
+        """chunk들의 (시작, 끝) 문자 위치를 반환한다."""
+        if self._mode == "none" or not text.strip():
+            return [(0, len(text))]
+
+        units = self._units(text)
+        spans: list[tuple[int, int]] = []
+        i = 0
+        while i < len(units):
+            tokens = 0
+            j = i
+            while j < len(units) and (j == i or tokens + units[j].tokens <= self._chunk_size):
+                tokens += units[j].tokens
+                j += 1
+            spans.append((units[i].start, units[j - 1].end))
+            if j >= len(units):
+                break
+
+            # 뒤쪽 unit들을 chunk_overlap 토큰만큼 다음 chunk에 다시 포함
+            next_i = j
+            overlap = 0
+            while next_i - 1 > i and overlap + units[next_i - 1].tokens <= self._chunk_overlap:
+                next_i -= 1
+                overlap += units[next_i].tokens
+            i = next_i
+
+        return spans
+
+    def split_documents(self, documents: list[Document]) -> list[Document]:
+        """문서를 chunk로 나누고 parent/child 메타데이터를 붙인다."""
+        chunks: list[Document] = []
+        for doc in documents:
+            text = doc.page_content
+            key = [doc.metadata.get("source", "")]
+            if "record" in doc.metadata:
+                # 한 파일에서 여러 문서가 나오면(jsonl) 내용이 같은 레코드도 구분한다
+                key.append(str(doc.metadata["record"]))
+            parent_id = content_hash(*key, text)
+            spans = self.split_text(text)
+            for index, (start, end) in enumerate(spans):
+                chunks.append(
+                    Document(
+                        page_content=text[start:end].strip(),
+                        metadata={
+                            **doc.metadata,
+                            "parent_id": parent_id,
+                            "chunk_index": index,
+                            "chunk_count": len(spans),
+                            "start_char": start,
+                            "end_char": end,
+                        },
+                    )
+                )
+        return chunks
+
+
+def _join_run(run: list[Document]) -> Document:
+    """연속된 chunk들을 겹치는 부분 없이 하나로 잇는다."""
+    text = run[0].page_content
+    end = run[0].metadata.get("end_char", 0)
+    for doc in run[1:]:
+        overlap = max(0, end - doc.metadata.get("start_char", end))
+        rest = doc.page_content[overlap:].strip()
+        if rest:
+            text += " " + rest
+        end = doc.metadata.get("end_char", end)
+
+    metadata = {**run[0].metadata, "end_char": end, "merged_chunks": len(run)}
+    scores = [doc.metadata["score"] for doc in run if "score" in doc.metadata]
+    if scores:
+        metadata["score"] = max(scores)
+    return Document(page_content=text, metadata=metadata)
+
+
+def merge_adjacent_chunks(documents: list[Document]) -> list[Document]:
+    """같은 부모에서 나온 연속된 chunk를 하나로 합친다.
+
+    합쳐진 문서는 그 구간에서 가장 먼저 검색된 chunk의 자리에 놓인다.
+    """
+    by_parent: dict[str, list[Document]] = {}
+    for doc in documents:
+        parent_id = doc.metadata.get("parent_id") or f"doc-{id(doc)}"
+        by_parent.setdefault(parent_id, []).append(doc)
+
+    run_of: dict[int, list[Document]] = {}
+    for docs in by_parent.values():
+        run: list[Document] = []
+        for doc in sorted(docs, key=lambda d: d.metadata.get("chunk_index", 0)):
+            index = doc.metadata.get("chunk_index", 0)
+            if run and index != run[-1].metadata.get("chunk_index", 0) + 1:
+                run = []
+            run.append(doc)
+            run_of[id(doc)] = run
+
+    merged: list[Document] = []
+    emitted: set[int] = set()
+    for doc in documents:
+        run = run_of[id(doc)]
+        if id(run) in emitted:
+            continue
+        emitted.add(id(run))
+        merged.append(run[0] if len(run) == 1 else _join_run(run))
+
+    return merged
@@ -1,31 +1,126 @@
 import logging
+import threading
 import warnings
-
-import transformers
-from sentence_transformers import SentenceTransformer
+from pathlib import Path
+from typing import TYPE_CHECKING
 
 from crag.config.settings import settings
 
-transformers.logging.set_verbosity_error()
-logging.getLogger("sentence_transformers").setLevel(logging.ERROR)
-warnings.filterwarnings("ignore")
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
 
-_model: SentenceTransformer | None = None
+_model: "SentenceTransformer | None" = None
+_lock = threading.Lock()
 
 
-def get_embedding_model() -> SentenceTransformer:
-    """임베딩 모델을 로드합니다. 로컬에 모델이 있으면 그것을 사용하고, 없으면 다운로드 후 저장합니다."""
+def get_embedding_model() -> "SentenceTransformer":
+    """임베딩 모델을 로드합니다. 로컬에 모델이 있으면 그것을 사용하고, 없으면 다운로드 후 저장합니다.
+
+    transformers와 sentence-transformers는 처음 호출할 때 import한다 (CLI 시작 시간 단축).
+    여러 스레드에서 동시에 호출해도 모델은 한 번만 로드된다.
+    """
     global _model
-    if _model is None:
+    with _lock:
+        if _model is None:
+            _model = load_embedding_model(settings.embedding_backend)
+
+    return _model
+
+
+def embedding_model_id() -> str:
+    """같은 텍스트에 같은 벡터를 내는 모델 설정의 식별자 (임베딩 캐시 키)."""
+    backend = settings.embedding_backend
+    if backend == "onnx-int8":
+        backend = f"{backend}-{settings.embedding_quantization}"
+    return f"{settings.embedding_model}:{backend}"
+
+
+def load_embedding_model(backend: str = "torch") -> "SentenceTransformer":
+    """backend("torch" | "onnx" | "onnx-int8")로 임베딩 모델을 새로 로드한다 (캐시하지 않음)."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {backend}")
+
+    import transformers
+
+    transformers.logging.set_verbosity_error()
+    logging.getLogger("sentence_transformers").setLevel(logging.ERROR)
+    warnings.filterwarnings("ignore")
+
+    if backend == "torch":
+        return _load_torch()
+    return _load_onnx(quantize=backend == "onnx-int8")
+
+
+def _load_torch() -> "SentenceTransformer":
+    from sentence_transformers import SentenceTransformer
+
+    if settings.embedding_threads:
+        import torch
+
+        torch.set_num_threads(settings.embedding_threads)
+
+    local_path = settings.embedding_model_local_dir
+
+    if local_path.exists() and any(local_path.iterdir()):
+        # 로컬에 모델이 있으면 로컬에서 로드
+        return SentenceTransformer(str(local_path))
+
+    # 로컬에 모델이 없으면 다운로드 후 저장
+    model = SentenceTransformer(settings.embedding_model)
+    local_path.parent.mkdir(parents=True, exist_ok=True)
+    model.save(str(local_path))
+    return model
+
+
+def onnx_model_dir() -> Path:
+    """ONNX로 변환한 모델을 저장하는 디렉터리 (embedding_model_local_dir 옆)."""
+    local_path = settings.embedding_model_local_dir
+    return local_path.with_name(f"{local_path.name}-onnx")
+
+
+def _load_onnx(quantize: bool) -> "SentenceTransformer":
+    """처음에는 torch 가중치를 ONNX로 변환(및 int8 동적 양자화)해 저장하고, 이후에는 저장본을 쓴다."""
+    import importlib.util
+
+    if not all(importlib.util.find_spec(name) for name in ("optimum", "onnxruntime")):
+        raise ImportError(
+            "The onnx / onnx-int8 embedding backends need the onnx extra: "
+            "pip install 'crag[onnx]' (or uv sync --extra onnx)"
+        )
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    model_kwargs: dict = {"provider": "CPUExecutionProvider"}
+    if settings.embedding_threads:
+        import onnxruntime
+
+        session_options = onnxruntime.SessionOptions()
+        session_options.intra_op_num_threads = settings.embedding_threads
+        model_kwargs["session_options"] = session_options
+
+    onnx_dir = onnx_model_dir()
+    if not (onnx_dir / "onnx" / "model.onnx").exists():
         local_path = settings.embedding_model_local_dir
+        source = (
+            str(local_path)
+            if local_path.exists() and any(local_path.iterdir())
+            else settings.embedding_model
+        )
+        # 저장본이 없으면 sentence-transformers가 불러오면서 ONNX로 변환한다
+        exported = SentenceTransformer(source, backend="onnx", model_kwargs=model_kwargs)
+        onnx_dir.parent.mkdir(parents=True, exist_ok=True)
+        exported.save(str(onnx_dir))
 
-        if local_path.exists() and any(local_path.iterdir()):
-            # 로컬에 모델이 있으면 로컬에서 로드
-            _model = SentenceTransformer(str(local_path))
-        else:
-            # 로컬에 모델이 없으면 다운로드 후 저장
-            _model = SentenceTransformer(settings.embedding_model)
-            local_path.parent.mkdir(parents=True, exist_ok=True)
-            _model.save(str(local_path))
+    if quantize:
+        config = settings.embedding_quantization
+        quantized = onnx_dir / "onnx" / f"model_qint8_{config}.onnx"
+        if not quantized.exists():
+            export_dynamic_quantized_onnx_model(
+                SentenceTransformer(str(onnx_dir), backend="onnx", model_kwargs=model_kwargs),
+                config,
+                str(onnx_dir),
+            )
+        model_kwargs["file_name"] = f"onnx/{quantized.name}"
 
-    return _model
+    return SentenceTransformer(str(onnx_dir), backend="onnx", model_kwargs=model_kwargs)
@@ -0,0 +1,100 @@
+import json
+import logging
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+# (파일 경로, 파일 내용) -> 문서 목록. 인제스트 프로세스 풀에서 실행되므로 모듈 최상위 함수여야 한다
+Loader = Callable[[Path, str], list[Document]]
+
+_LOADERS: dict[str, Loader] = {}
+
+
+def register_loader(*suffixes: str) -> Callable[[Loader], Loader]:
+    """확장자(".txt" 등)에 로더를 등록하는 데코레이터. 같은 확장자는 나중 등록이 이긴다."""
+
+    def register(loader: Loader) -> Loader:
+        for suffix in suffixes:
+            _LOADERS[suffix.lower()] = loader
+        return loader
+
+    return register
+
+
+def get_loader(path: Path) -> Loader | None:
+    return _LOADERS.get(path.suffix.lower())
+
+
+def iter_files(root: Path) -> Iterator[Path]:
+    """root 아래에서 로더가 있는 파일을 재귀적으로 찾는다. 숨김 파일/디렉터리는 건너뛴다."""
+    for path in sorted(root.rglob("*")):
+        relative = path.relative_to(root)
+        if any(part.startswith(".") for part in relative.parts):
+            continue
+        if path.is_file() and get_loader(path) is not None:
+            yield path
+
+
+def _metadata(path: Path) -> dict:
+    return {"source": str(path), "filename": path.name}
+
+
+@register_loader(".txt", ".md", ".markdown")
+def load_text(path: Path, text: str) -> list[Document]:
+    return [Document(page_content=text, metadata=_metadata(path))]
+
+
+@register_loader(".html", ".htm")
+def load_html(path: Path, text: str) -> list[Document]:
+    """본문만 추출한 마크다운. 본문이 없으면 문서를 만들지 않는다."""
+    from crag.web.extractor import extract_main_content
+
+    content = extract_main_content(text)
+    if not content.strip():
+        return []
+    return [Document(page_content=content, metadata=_metadata(path))]
+
+
+@register_loader(".jsonl")
+def load_jsonl(path: Path, text: str) -> list[Document]:
+    """한 줄에 문서 하나. 본문은 text/content/page_content 필드, 나머지 스칼라 필드는 메타데이터.
+
+    source는 파일 경로로 두어 파일 단위 동기화(갱신/삭제)가 그대로 동작하게 한다
+    (레코드의 source 필드는 record_source로 남긴다).
+    """
+    documents = []
+    for line_number, line in enumerate(text.splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            logger.warning("[Ingest] %s:%d: invalid JSON (%s)", path, line_number, e)
+            continue
+        if not isinstance(record, dict):
+            record = {}
+        content = next(
+            (record[key] for key in ("text", "content", "page_content") if record.get(key)),
+            None,
+        )
+        if not isinstance(content, str):
+            logger.warning("[Ingest] %s:%d: no text field", path, line_number)
+            continue
+        metadata = {
+            key: value
+            for key, value in record.items()
+            if key not in ("text", "content", "page_content")
+            and isinstance(value, (str, int, float, bool))
+        }
+        if "source" in metadata:
+            metadata["record_source"] = metadata.pop("source")
+        documents.append(
+            Document(
+                page_content=content,
+                metadata={**metadata, **_metadata(path), "record": line_number},
+            )
+        )
+    return documents
@@ -0,0 +1,73 @@
+import logging
+import threading
+from typing import TYPE_CHECKING
+
+from langchain_core.documents import Document
+
+from crag.config.settings import settings
+from crag.tracing import tracer
+from crag.utils import run_in_background
+
+if TYPE_CHECKING:
+    from sentence_transformers import CrossEncoder
+
+_model: "CrossEncoder | None" = None
+_lock = threading.Lock()
+
+
+def get_reranker_model() -> "CrossEncoder":
+    """cross-encoder를 CPU로 로드합니다. 로컬에 모델이 있으면 그것을 사용하고, 없으면 다운로드 후 저장합니다."""
+    global _model
+    with _lock:
+        if _model is None:
+            from sentence_transformers import CrossEncoder
+
+            logging.getLogger("sentence_transformers").setLevel(logging.ERROR)
+
+            local_path = settings.rerank_model_local_dir
+            if local_path.exists() and any(local_path.iterdir()):
+                _model = CrossEncoder(
+                    str(local_path), max_length=settings.rerank_max_length, device="cpu"
+                )
+            else:
+                _model = CrossEncoder(
+                    settings.rerank_model, max_length=settings.rerank_max_length, device="cpu"
+                )
+                local_path.parent.mkdir(parents=True, exist_ok=True)
+                _model.save(str(local_path))
+
+    return _model
+
+
+class Reranker:
+    """질문-문서 쌍을 cross-encoder로 채점해 상위 문서만 남긴다."""
+
+    def __init__(self) -> None:
+        # 모델은 백그라운드에서 로드하고 처음 쓰는 시점에 기다린다
+        self._loading = run_in_background(get_reranker_model)
+
+    def rerank(
+        self, query: str, documents: list[Document], top_n: int | None = None
+    ) -> list[Document]:
+        """cross-encoder 점수 상위 top_n개. 점수는 metadata["rerank_score"]에 붙는다."""
+        top_n = top_n or settings.rerank_top_n
+        if not documents:
+            return []
+
+        pairs = [(query, doc.page_content) for doc in documents]
+        with tracer.span("rerank") as span:
+            scores = self._loading.result().predict(
+                pairs, batch_size=settings.rerank_batch_size, show_progress_bar=False
+            )
+            span.add("pairs", len(pairs))
+
+        ranked = sorted(zip(documents, scores), key=lambda item: item[1], reverse=True)
+        reranked = []
+        for doc, score in ranked[:top_n]:
+            reranked.append(
+                Document(
+                    page_content=doc.page_content,
+                    metadata={**doc.metadata, "rerank_score": float(score)},
+                )
+            )
+        return reranked
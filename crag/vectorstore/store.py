@@ -1,47 +1,205 @@
 import logging
+import math
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from pathlib import Path
 
-import chromadb
 from langchain_core.documents import Document
 
 from crag.config.settings import settings
-from crag.vectorstore.embeddings import get_embedding_model
+from crag.tracing import tracer
+from crag.utils import content_hash, run_in_background
+from crag.vectorstore.bm25 import BM25Index, reciprocal_rank_fusion
+from crag.vectorstore.chunker import Chunker, merge_adjacent_chunks
+from crag.vectorstore.embeddings import embedding_model_id, get_embedding_model
 
 logger = logging.getLogger(__name__)
 
+# 검색으로 가져온 chunk 벡터를 기억해 두는 개수 (embed_texts에서 재사용)
+_RETRIEVED_VECTORS_SIZE = 1024
+
+
+def distance_to_score(distance: float) -> float:
+    """코사인 거리(0~2)를 0~1 유사도 점수로 변환한다."""
+    return min(1.0, max(0.0, 1.0 - distance / 2))
+
+
+def cosine_distance(a: list[float], b: list[float]) -> float:
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    if not norm:
+        return 1.0
+    return 1.0 - sum(x * y for x, y in zip(a, b)) / norm
+
 
 class VectorStore:
-    def __init__(self) -> None:
-        self._client = chromadb.PersistentClient(path=str(settings.chroma_persist_dir))
-        self._collection = self._client.get_or_create_collection(
-            name=settings.chroma_collection_name,
+    def __init__(
+        self,
+        persist_dir: Path | None = None,
+        collection_name: str | None = None,
+        embedding_cache_dir: Path | None = None,
+    ) -> None:
+        """embedding_cache_dir: 임베딩 캐시 위치 (기본 settings.embedding_cache_dir).
+        임시 컬렉션(벤치마크 등)은 따로 지정해 실제 캐시를 채우지 않게 한다.
+        """
+        self._persist_dir = persist_dir or settings.chroma_persist_dir
+        self._collection_name = collection_name or settings.chroma_collection_name
+        # 클라이언트와 모델은 백그라운드에서 함께 열고, 처음 쓰는 시점에 기다린다
+        self._opening = run_in_background(self._open)
+        self._loading = run_in_background(get_embedding_model)
+        self._chunker = Chunker(
+            mode=settings.chunk_mode,
+            chunk_size=settings.chunk_size,
+            chunk_overlap=settings.chunk_overlap,
+            count_tokens=self._count_tokens,
+        )
+        # 하이브리드 검색용 키워드 색인. 하이브리드 모드에서만 열고 컬렉션과 함께 갱신한다
+        self._keyword_index: BM25Index | None = None
+        if settings.retrieval_mode == "hybrid":
+            self._keyword_index = BM25Index(
+                self._persist_dir / f"{self._collection_name}_bm25.sqlite3"
+            )
+        self._keyword_index_synced = False
+        # 저장된 source 집합. 처음 조회할 때 컬렉션에서 한 번 읽고 이후에는 쓰기와 함께 갱신한다
+        self._sources: set[str] | None = None
+        self._sources_lock = threading.Lock()
+        # 검색 결과 chunk의 저장된 벡터. 텍스트 해시 -> 벡터 (LRU)
+        self._retrieved_vectors: OrderedDict[str, object] = OrderedDict()
+        self._retrieved_vectors_lock = threading.Lock()
+        self._embedding_cache = None
+        if settings.embedding_cache_enabled:
+            from crag.cache.embedding_cache import EmbeddingCache
+
+            self._embedding_cache = EmbeddingCache(embedding_model_id(), embedding_cache_dir)
+
+    def _open(self):
+        import chromadb
+
+        client = chromadb.PersistentClient(path=str(self._persist_dir))
+        collection = client.get_or_create_collection(
+            name=self._collection_name,
             metadata={"hnsw:space": "cosine"},
         )
-        self._embedding_model = get_embedding_model()
+        return client, collection
+
+    @property
+    def _client(self):
+        return self._opening.result()[0]
+
+    @property
+    def _collection(self):
+        return self._opening.result()[1]
+
+    @property
+    def _embedding_model(self):
+        return self._loading.result()
+
+    def _count_tokens(self, text: str) -> int:
+        return len(self._embedding_model.tokenizer.tokenize(text))
+
+    def _embed(self, texts: list[str]):
+        if self._embedding_cache is not None:
+            return self._embedding_cache.encode(self._embedding_model, texts)
+        return self._embedding_model.encode(texts, batch_size=settings.embedding_batch_size)
+
+    def embed_texts(self, texts: list[str]):
+        """텍스트 임베딩. 검색으로 가져온 chunk는 컬렉션에 저장된 벡터를 그대로 쓰고
+        나머지(웹 문서, 합치거나 자른 문서)만 임베딩한다.
+        """
+        import numpy as np
+
+        keys = [content_hash(text) for text in texts]
+        with self._retrieved_vectors_lock:
+            vectors = {
+                key: self._retrieved_vectors[key] for key in keys if key in self._retrieved_vectors
+            }
+        missing = {key: text for key, text in zip(keys, texts) if key not in vectors}
+        with tracer.span("vectorstore", op="embed") as span:
+            if missing:
+                vectors.update(zip(missing, self._embed(list(missing.values()))))
+            span.add("embedded", len(missing))
+            span.add("reused", len(texts) - len(missing))
+        return np.asarray([vectors[key] for key in keys], dtype=np.float32)
+
+    def _remember_vectors(self, texts: list[str], embeddings) -> None:
+        with self._retrieved_vectors_lock:
+            for text, embedding in zip(texts, embeddings):
+                key = content_hash(text)
+                self._retrieved_vectors[key] = embedding
+                self._retrieved_vectors.move_to_end(key)
+            while len(self._retrieved_vectors) > _RETRIEVED_VECTORS_SIZE:
+                self._retrieved_vectors.popitem(last=False)
 
     def add_documents(self, documents: list[Document]) -> None:
+        """문서를 chunk로 나눠 저장한다. 각 chunk에는 parent_id와 chunk_index가 붙는다."""
         if not documents:
             return
 
-        texts = [doc.page_content for doc in documents]
-        embeddings = self._embedding_model.encode(texts).tolist()
-        ids = [f"doc_{i}_{hash(text)}" for i, text in enumerate(texts)]
-        metadatas = [doc.metadata for doc in documents]
-
-        self._collection.add(
-            ids=ids,
-            embeddings=embeddings,
-            documents=texts,
-            metadatas=metadatas,
+        # 같은 id가 한 upsert에 두 번 들어가면 Chroma가 배치 전체를 거부한다
+        chunks = list(
+            {
+                f"{chunk.metadata['parent_id']}_{chunk.metadata['chunk_index']}": chunk
+                for chunk in self._chunker.split_documents(documents)
+            }.values()
         )
+        batch_size = settings.upsert_batch_size
+        for start in range(0, len(chunks), batch_size):
+            batch = chunks[start : start + batch_size]
+            texts = [chunk.page_content for chunk in batch]
+            with tracer.span("vectorstore", op="embed") as span:
+                embeddings = self._embed(texts).tolist()
+                span.add("embedded", len(texts))
+            ids = [
+                f"{chunk.metadata['parent_id']}_{chunk.metadata['chunk_index']}"
+                for chunk in batch
+            ]
+            metadatas = [chunk.metadata for chunk in batch]
+
+            with tracer.span("vectorstore", op="upsert"):
+                self._collection.upsert(
+                    ids=ids,
+                    embeddings=embeddings,
+                    documents=texts,
+                    metadatas=metadatas,
+                )
+            sources = [metadata.get("source", "") for metadata in metadatas]
+            if self._keyword_index is not None:
+                with tracer.span("vectorstore", op="index"):
+                    self._keyword_index.add(ids, texts, sources)
+            with self._sources_lock:
+                if self._sources is not None:
+                    self._sources.update(source for source in sources if source)
 
     def search(self, query: str, k: int | None = None) -> list[Document]:
         k = k or settings.retriever_k
-        query_embedding = self._embedding_model.encode([query]).tolist()
+        with tracer.span("vectorstore", op="embed") as span:
+            if self._embedding_cache is not None:
+                query_embedding = self._embedding_cache.encode_query(self._embedding_model, query)
+            else:
+                query_embedding = self._embedding_model.encode([query])[0]
+            query_embedding = query_embedding.tolist()
+            span.add("embedded", 1)
 
-        results = self._collection.query(
-            query_embeddings=query_embedding,
-            n_results=k,
-        )
+        if self._keyword_index is not None:
+            documents = self._hybrid_search(query, query_embedding, k)
+        else:
+            documents = list(self._dense_search(query, query_embedding, k).values())
+
+        if settings.merge_adjacent_chunks:
+            documents = merge_adjacent_chunks(documents)
+
+        return documents
+
+    def _dense_search(
+        self, query: str, query_embedding: list[float], k: int
+    ) -> dict[str, Document]:
+        """벡터 검색 상위 k개. chunk id -> 문서 (유사도 순)."""
+        with tracer.span("vectorstore", op="query"):
+            results = self._collection.query(
+                query_embeddings=[query_embedding],
+                n_results=k,
+                include=["documents", "metadatas", "distances", "embeddings"],
+            )
 
         logger.debug("\n[DB Query Results]")
         logger.debug("  Query: %s", query)
@@ -55,25 +213,156 @@ class VectorStore:
                 logger.debug("    Source: %s", metadata.get("source", "N/A"))
                 logger.debug("    Content:\n%s", doc_text)
 
-        documents = []
+        documents = {}
         if results["documents"]:
             for i, doc_text in enumerate(results["documents"][0]):
-                metadata = results["metadatas"][0][i] if results["metadatas"] else {}
-                documents.append(Document(page_content=doc_text, metadata=metadata))
+                metadata = dict(results["metadatas"][0][i]) if results["metadatas"] else {}
+                if results.get("distances"):
+                    distance = results["distances"][0][i]
+                    metadata["distance"] = distance
+                    metadata["score"] = distance_to_score(distance)
+                documents[results["ids"][0][i]] = Document(
+                    page_content=doc_text, metadata=metadata
+                )
+            if results.get("embeddings") is not None:
+                self._remember_vectors(results["documents"][0], results["embeddings"][0])
+        return documents
+
+    def _hybrid_search(
+        self, query: str, query_embedding: list[float], k: int
+    ) -> list[Document]:
+        """벡터 검색과 BM25 검색 결과를 RRF로 합친 상위 k개.
+
+        BM25에서만 나온 chunk도 질문과의 코사인 거리로 score를 채워, 이후 노드는
+        검색 모드와 관계없이 같은 기준의 score를 본다.
+        """
+        self._sync_keyword_index()
+        candidates = max(k, settings.hybrid_candidates)
+        dense = self._dense_search(query, query_embedding, candidates)
+        with tracer.span("vectorstore", op="bm25"):
+            keyword = dict(self._keyword_index.search(query, candidates))
 
+        fused = reciprocal_rank_fusion(
+            [list(dense), list(keyword)],
+            [settings.hybrid_dense_weight, settings.hybrid_bm25_weight],
+            k=settings.rrf_k,
+        )[:k]
+        missing = [doc_id for doc_id, _ in fused if doc_id not in dense]
+        if missing:
+            dense.update(self._get_scored(missing, query_embedding))
+
+        documents = []
+        for doc_id, rrf_score in fused:
+            document = dense.get(doc_id)
+            if document is None:
+                # 컬렉션에서 이미 지워진 chunk
+                continue
+            document.metadata["rrf_score"] = rrf_score
+            if doc_id in keyword:
+                document.metadata["bm25_score"] = keyword[doc_id]
+            documents.append(document)
         return documents
 
+    def _get_scored(self, ids: list[str], query_embedding: list[float]) -> dict[str, Document]:
+        """id로 chunk를 가져와 질문 임베딩과의 코사인 거리로 score를 붙인다."""
+        with tracer.span("vectorstore", op="get"):
+            results = self._collection.get(
+                ids=ids, include=["documents", "metadatas", "embeddings"]
+            )
+        documents = {}
+        for doc_id, doc_text, metadata, embedding in zip(
+            results["ids"], results["documents"], results["metadatas"], results["embeddings"]
+        ):
+            metadata = dict(metadata or {})
+            metadata["distance"] = cosine_distance(query_embedding, list(embedding))
+            metadata["score"] = distance_to_score(metadata["distance"])
+            documents[doc_id] = Document(page_content=doc_text, metadata=metadata)
+        self._remember_vectors(results["documents"], results["embeddings"])
+        return documents
+
+    def _sync_keyword_index(self) -> None:
+        """키워드 색인을 컬렉션의 chunk id 집합에 맞춘다. 프로세스당 한 번.
+
+        색인 도입 전 데이터나 dense 모드에서 바뀐 컬렉션을 따라잡는다. chunk id는 내용
+        해시라서 내용이 바뀐 chunk도 id 차이로 드러난다.
+        """
+        if self._keyword_index_synced:
+            return
+        collection_ids: set[str] = set()
+        for results in self._scan([], self._collection.count()):
+            collection_ids.update(results["ids"])
+        indexed_ids = self._keyword_index.ids()
+        stale = list(indexed_ids - collection_ids)
+        missing = list(collection_ids - indexed_ids)
+        if stale or missing:
+            logger.info(
+                "[VectorStore] Syncing keyword index (+%d, -%d chunks)", len(missing), len(stale)
+            )
+            self._keyword_index.delete_ids(stale)
+            page_size = 1000
+            for start in range(0, len(missing), page_size):
+                results = self._collection.get(
+                    ids=missing[start : start + page_size], include=["documents", "metadatas"]
+                )
+                self._keyword_index.add(
+                    results["ids"],
+                    results["documents"],
+                    [(metadata or {}).get("source", "") for metadata in results["metadatas"]],
+                )
+        self._keyword_index_synced = True
+
+    def _scan(self, include: list[str], total: int, page_size: int = 1000) -> Iterator[dict]:
+        """컬렉션 전체를 page_size개씩 읽는다."""
+        for offset in range(0, total, page_size):
+            yield self._collection.get(include=include, limit=page_size, offset=offset)
+
+    def _known_sources(self) -> set[str]:
+        """저장된 source 집합 (호출 측은 _sources_lock을 잡고 있어야 한다)."""
+        if self._sources is None:
+            with tracer.span("vectorstore", op="load_sources"):
+                sources: set[str] = set()
+                for results in self._scan(["metadatas"], self._collection.count()):
+                    sources.update(
+                        (metadata or {}).get("source", "") for metadata in results["metadatas"]
+                    )
+                sources.discard("")
+            logger.debug("[VectorStore] Loaded %d sources", len(sources))
+            self._sources = sources
+        return self._sources
+
+    def existing_sources(self, sources: Iterable[str]) -> set[str]:
+        """sources 중 이미 저장된 문서가 있는 것.
+
+        같은 프로세스의 쓰기만 반영한다. 다른 프로세스가 그 사이에 넣은 source는
+        새 것으로 보이지만, 다시 저장해도 upsert라 결과는 같다.
+        """
+        with tracer.span("vectorstore", op="exists"), self._sources_lock:
+            known = self._known_sources()
+            return {source for source in sources if source in known}
+
     def exists_by_source(self, source: str) -> bool:
         """URL(source)로 이미 저장된 문서가 있는지 확인."""
-        results = self._collection.get(
-            where={"source": source},
-            limit=1,
-        )
-        return bool(results["ids"])
+        return bool(self.existing_sources([source]))
+
+    def delete_by_source(self, sources: list[str]) -> None:
+        """source가 일치하는 모든 chunk를 삭제."""
+        batch_size = settings.upsert_batch_size
+        for start in range(0, len(sources), batch_size):
+            batch = sources[start : start + batch_size]
+            self._collection.delete(where={"source": {"$in": batch}})
+        if self._keyword_index is not None:
+            self._keyword_index.delete_sources(sources)
+        with self._sources_lock:
+            if self._sources is not None:
+                self._sources.difference_update(sources)
+
+    def count(self) -> int:
+        return self._collection.count()
 
     def clear(self) -> None:
-        self._client.delete_collection(settings.chroma_collection_name)
-        self._collection = self._client.get_or_create_collection(
-            name=settings.chroma_collection_name,
-            metadata={"hnsw:space": "cosine"},
-        )
+        self._client.delete_collection(self._collection_name)
+        if self._keyword_index is not None:
+            self._keyword_index.clear()
+        with self._sources_lock:
+            self._sources = set()
+        self._opening = run_in_background(self._open)
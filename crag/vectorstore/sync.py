@@ -0,0 +1,248 @@
+import json
+import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import NamedTuple
+
+from langchain_core.documents import Document
+
+from crag.config.settings import settings
+from crag.utils import content_hash
+from crag.vectorstore.embeddings import embedding_model_id
+from crag.vectorstore.loaders import Loader, get_loader, iter_files, load_text
+from crag.vectorstore.store import VectorStore
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+
+def _config_fingerprint() -> str:
+    """이 값이 바뀌면 저장된 임베딩/chunk를 재사용할 수 없다."""
+    return content_hash(
+        embedding_model_id(),
+        settings.chunk_mode,
+        str(settings.chunk_size),
+        str(settings.chunk_overlap),
+    )
+
+
+@dataclass
+class SyncResult:
+    added: list[str] = field(default_factory=list)
+    updated: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    failed: list[str] = field(default_factory=list)
+    unchanged: int = 0
+
+
+@dataclass
+class IngestProgress:
+    files_total: int
+    files_done: int = 0
+    documents: int = 0  # 임베딩해 저장한 문서 수
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def rate(self) -> float:
+        """초당 저장한 문서 수."""
+        elapsed = time.perf_counter() - self.started
+        return self.documents / elapsed if elapsed > 0 else 0.0
+
+
+class _Parsed(NamedTuple):
+    digest: str | None
+    documents: list[Document] | None  # 내용이 그대로면 None
+    error: str | None = None
+
+
+class IngestManifest:
+    """인제스트된 파일의 경로, mtime, 크기, 내용 해시를 기록한다."""
+
+    def __init__(self, path: Path | None = None) -> None:
+        self._path = path or settings.chroma_persist_dir / "ingest_manifest.json"
+        self.fingerprint = _config_fingerprint()
+        self.entries: dict[str, dict] = {}
+
+    def load(self) -> bool:
+        """manifest를 읽는다. 없거나 현재 설정과 맞지 않으면 False."""
+        if not self._path.exists():
+            return False
+        try:
+            data = json.loads(self._path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning("[Ingest] Ignoring unreadable manifest %s: %s", self._path, e)
+            return False
+        if data.get("version") != MANIFEST_VERSION or data.get("fingerprint") != self.fingerprint:
+            return False
+        self.entries = data.get("files", {})
+        return True
+
+    def save(self) -> None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._path.with_suffix(".tmp")
+        tmp_path.write_text(
+            json.dumps(
+                {
+                    "version": MANIFEST_VERSION,
+                    "fingerprint": self.fingerprint,
+                    "files": self.entries,
+                },
+                ensure_ascii=False,
+                indent=2,
+            ),
+            encoding="utf-8",
+        )
+        tmp_path.replace(self._path)
+
+
+def _parse(loader: Loader, file_path: Path, known_hash: str | None) -> _Parsed:
+    """파일을 읽어 해시를 구하고, 내용이 바뀌었으면 문서로 변환한다 (프로세스 풀에서 실행)."""
+    try:
+        text = file_path.read_text(encoding="utf-8")
+        digest = content_hash(text)
+        if digest == known_hash:
+            return _Parsed(digest, None)
+        return _Parsed(digest, loader(file_path, text))
+    except Exception as e:
+        return _Parsed(None, None, f"{type(e).__name__}: {e}")
+
+
+def sync_documents(
+    store: VectorStore,
+    docs_dir: Path,
+    files: list[Path] | None = None,
+    full: bool = False,
+    workers: int | None = None,
+    progress: Callable[[IngestProgress], None] | None = None,
+) -> SyncResult:
+    """docs_dir 아래 파일들을 벡터스토어와 동기화한다.
+
+    새 파일과 내용이 바뀐 파일만 임베딩하고, 사라진 파일의 chunk는 삭제한다.
+    full이거나 manifest를 신뢰할 수 없으면 컬렉션을 비우고 전부 다시 넣는다.
+
+    files를 주지 않으면 docs_dir 아래에서 로더가 있는 파일을 재귀적으로 찾는다.
+    파일 읽기와 변환은 workers개 프로세스에서 하고, 처리 중인 파일 수와 임베딩 대기
+    문서 수(ingest_batch_size)를 제한해 코퍼스 크기와 관계없이 메모리를 일정하게 유지한다.
+    """
+    if files is None:
+        files = list(iter_files(docs_dir))
+    workers = workers or settings.ingest_workers
+    batch_size = settings.ingest_batch_size
+
+    manifest = IngestManifest()
+    if full or not manifest.load() or (manifest.entries and store.count() == 0):
+        logger.info("[Ingest] Full rebuild")
+        store.clear()
+        manifest.entries = {}
+
+    result = SyncResult()
+    state = IngestProgress(files_total=len(files))
+    current: set[str] = set()
+    pending: list[Document] = []
+    # 내용이 바뀐 파일의 이전 chunk. 새 chunk를 넣기 전에 지운다 (chunk 수가 달라질 수 있음)
+    stale: list[str] = []
+
+    def flush(count: int) -> None:
+        batch = pending[:count]
+        del pending[:count]
+        if stale:
+            store.delete_by_source(stale)
+            stale.clear()
+        store.add_documents(batch)
+        state.documents += len(batch)
+        if progress is not None:
+            progress(state)
+
+    def handle(file_path: Path, stat: os.stat_result, parsed: _Parsed) -> None:
+        source = str(file_path)
+        state.files_done += 1
+        entry = manifest.entries.get(source)
+        if parsed.error is not None:
+            logger.warning("[Ingest] Failed to load %s: %s", source, parsed.error)
+            result.failed.append(source)
+        elif parsed.documents is None:
+            entry["mtime"] = stat.st_mtime
+            entry["size"] = stat.st_size
+            result.unchanged += 1
+        else:
+            if entry:
+                result.updated.append(source)
+                stale.append(source)
+            else:
+                result.added.append(source)
+            manifest.entries[source] = {
+                "mtime": stat.st_mtime,
+                "size": stat.st_size,
+                "hash": parsed.digest,
+            }
+            pending.extend(parsed.documents)
+            while len(pending) >= batch_size:
+                flush(batch_size)
+        if progress is not None:
+            progress(state)
+
+    executor = None
+    if workers > 1:
+        # 부모가 모델 로딩 스레드를 띄운 뒤이므로 fork 대신 spawn
+        executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    inflight: deque[tuple[Path, os.stat_result, Future]] = deque()
+    try:
+        for file_path in files:
+            source = str(file_path)
+            current.add(source)
+            stat = file_path.stat()
+            entry = manifest.entries.get(source)
+
+            # mtime과 크기가 같으면 읽지도 않는다
+            if entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+                result.unchanged += 1
+                state.files_done += 1
+                continue
+
+            loader = get_loader(file_path) or load_text
+            known_hash = entry["hash"] if entry else None
+            if executor is None:
+                handle(file_path, stat, _parse(loader, file_path, known_hash))
+                continue
+
+            inflight.append(
+                (file_path, stat, executor.submit(_parse, loader, file_path, known_hash))
+            )
+            # 변환이 임베딩보다 빠르면 여기서 기다린다 (backpressure)
+            while len(inflight) > workers * 2:
+                done_path, done_stat, future = inflight.popleft()
+                handle(done_path, done_stat, future.result())
+
+        while inflight:
+            done_path, done_stat, future = inflight.popleft()
+            handle(done_path, done_stat, future.result())
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    if pending:
+        flush(len(pending))
+    if stale:
+        store.delete_by_source(stale)
+
+    root = docs_dir.resolve()
+    for source in list(manifest.entries):
+        if source in current:
+            continue
+        if not Path(source).resolve().is_relative_to(root):
+            continue
+        result.removed.append(source)
+        del manifest.entries[source]
+    store.delete_by_source(result.removed)
+
+    manifest.save()
+    return result
@@ -0,0 +1,243 @@
+import re
+
+from bs4 import BeautifulSoup, NavigableString, Tag
+
+# 본문과 무관한 태그
+_DROP_TAGS = [
+    "script",
+    "style",
+    "noscript",
+    "template",
+    "iframe",
+    "svg",
+    "canvas",
+    "form",
+    "button",
+    "input",
+    "select",
+    "textarea",
+    "nav",
+    "header",
+    "footer",
+    "aside",
+]
+
+# class/id에 이 패턴이 있으면 보일러플레이트로 간주
+_BOILERPLATE_RE = re.compile(
+    r"(^|[-_ ])(nav|navbar|menu|footer|sidebar|side-bar|cookie|banner|advert|ads?|"
+    r"promo|share|social|comments?|breadcrumbs?|popup|modal|subscribe|newsletter|"
+    r"related|skip-link)([-_ ]|$)",
+    re.IGNORECASE,
+)
+
+_BLOCK_TAGS = {
+    "p",
+    "div",
+    "section",
+    "article",
+    "main",
+    "ul",
+    "ol",
+    "li",
+    "pre",
+    "blockquote",
+    "table",
+    "tr",
+    "h1",
+    "h2",
+    "h3",
+    "h4",
+    "h5",
+    "h6",
+    "dl",
+    "dt",
+    "dd",
+    "figure",
+    "figcaption",
+}
+
+_CANDIDATE_TAGS = ["div", "section", "td"]
+
+
+def _is_boilerplate(tag: Tag) -> bool:
+    if tag.get("role") in ("navigation", "banner", "contentinfo", "complementary"):
+        return True
+    if tag.get("aria-hidden") == "true" or tag.has_attr("hidden"):
+        return True
+    names = " ".join(tag.get("class") or []) + " " + (tag.get("id") or "")
+    return bool(_BOILERPLATE_RE.search(names))
+
+
+def _clean(soup: BeautifulSoup) -> None:
+    for tag in soup.find_all(_DROP_TAGS):
+        tag.decompose()
+    for tag in soup.find_all(True):
+        # 앞에서 제거된 태그의 자손은 건너뛴다
+        if tag.decomposed or tag.name in ("html", "body"):
+            continue
+        if tag.find_parent(["pre", "code"]):
+            continue
+        if _is_boilerplate(tag):
+            tag.decompose()
+
+
+def _text_len(tag: Tag) -> int:
+    return len(tag.get_text(" ", strip=True))
+
+
+def _score(tag: Tag) -> float:
+    """텍스트가 많고 링크 비율이 낮을수록 높은 점수."""
+    text_len = _text_len(tag)
+    if text_len == 0:
+        return 0.0
+    link_len = sum(_text_len(a) for a in tag.find_all("a"))
+    link_density = link_len / text_len
+    paragraphs = len(tag.find_all(["p", "pre", "li"], recursive=False))
+    return text_len * (1 - link_density) + paragraphs * 25
+
+
+def _find_main(soup: BeautifulSoup) -> Tag:
+    for selector in ("main", "article", "[role=main]"):
+        found = soup.select(selector)
+        if found:
+            return max(found, key=_text_len)
+
+    body = soup.body or soup
+    candidates = body.find_all(_CANDIDATE_TAGS)
+    if not candidates:
+        return body
+
+    best = max(candidates, key=_score)
+    # 최고 후보가 본문 대부분을 담지 못하면 body 전체를 사용
+    if _text_len(best) < _text_len(body) * 0.3:
+        return body
+    return best
+
+
+def _inline(node: Tag | NavigableString) -> str:
+    if isinstance(node, NavigableString):
+        # 주석, doctype 등은 제외
+        return str(node) if node.__class__ is NavigableString else ""
+    if node.name == "br":
+        return "\n"
+    if node.name == "code":
+        return f"`{node.get_text()}`"
+    if node.name in ("strong", "b"):
+        text = "".join(_inline(c) for c in node.children).strip()
+        return f"**{text}**" if text else ""
+    if node.name in ("em", "i"):
+        text = "".join(_inline(c) for c in node.children).strip()
+        return f"*{text}*" if text else ""
+    if node.name == "img":
+        return node.get("alt") or ""
+    return "".join(_inline(c) for c in node.children)
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"[ \t\r\f\v]+", " ", text).strip()
+
+
+def _render(node: Tag, out: list[str], list_depth: int = 0) -> None:
+    """블록 단위로 Markdown을 만들어 out에 추가한다."""
+    inline_buffer: list[str] = []
+
+    def flush() -> None:
+        text = _normalize("".join(inline_buffer))
+        if text:
+            out.append(text)
+        inline_buffer.clear()
+
+    for child in node.children:
+        if isinstance(child, NavigableString):
+            if child.__class__ is NavigableString:
+                inline_buffer.append(str(child))
+            continue
+        if not isinstance(child, Tag):
+            continue
+
+        name = child.name
+        if name not in _BLOCK_TAGS:
+            inline_buffer.append(_inline(child))
+            continue
+
+        flush()
+        if name in ("h1", "h2", "h3", "h4", "h5", "h6"):
+            text = _normalize(_inline(child))
+            if text:
+                out.append(f"{'#' * int(name[1])} {text}")
+        elif name == "pre":
+            code = child.get_text().strip("\n")
+            if code.strip():
+                out.append(f"```\n{code}\n```")
+        elif name in ("ul", "ol"):
+            items = _render_list(child, list_depth)
+            if items:
+                out.append("\n".join(items))
+        elif name == "blockquote":
+            inner: list[str] = []
+            _render(child, inner, list_depth)
+            if inner:
+                out.append("\n".join(f"> {line}" for line in "\n\n".join(inner).split("\n")))
+        elif name == "table":
+            rows = []
+            for tr in child.find_all("tr"):
+                cells = [_normalize(_inline(c)) for c in tr.find_all(["th", "td"])]
+                if any(cells):
+                    rows.append("| " + " | ".join(cells) + " |")
+            if rows:
+                out.append("\n".join(rows))
+        else:
+            _render(child, out, list_depth)
+    flush()
+
+
+def _render_list(node: Tag, list_depth: int) -> list[str]:
+    """ul/ol을 Markdown 목록 줄로 변환한다. 중첩 목록은 들여쓴다."""
+    lines: list[str] = []
+    indent = "  " * list_depth
+    for i, li in enumerate(node.find_all("li", recursive=False), 1):
+        marker = f"{i}." if node.name == "ol" else "-"
+        nested: list[str] = []
+        parts: list[str] = []
+        for c in li.children:
+            if isinstance(c, Tag) and c.name in ("ul", "ol"):
+                nested.extend(_render_list(c, list_depth + 1))
+            elif isinstance(c, Tag):
+                parts.append(f" {_inline(c)} " if c.name in _BLOCK_TAGS else _inline(c))
+            elif c.__class__ is NavigableString:
+                parts.append(str(c))
+        text = _normalize("".join(parts))
+        if text:
+            lines.append(f"{indent}{marker} {text}")
+        lines.extend(nested)
+    return lines
+
+
+def extract_main_content(html: str) -> str:
+    """HTML에서 보일러플레이트를 제거하고 본문만 Markdown으로 추출한다.
+
+    제목, 목록, 코드 블록 구조는 유지한다.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    _clean(soup)
+    main = _find_main(soup)
+
+    blocks: list[str] = []
+    title = soup.title.get_text(strip=True) if soup.title else ""
+    if title and not main.find(["h1"]):
+        blocks.append(f"# {title}")
+    _render(main, blocks)
+
+    return "\n\n".join(blocks).strip()
+
+
+def is_low_quality(text: str, min_chars: int = 200) -> bool:
+    """추출 결과가 비어 있거나 본문으로 보기 어려운지 판단한다."""
+    stripped = text.strip()
+    if len(stripped) < min_chars:
+        return True
+
+    # 문장다운 줄이 거의 없으면 메뉴/링크 모음일 가능성이 높다
+    lines = [line for line in stripped.split("\n") if line.strip()]
+    long_lines = [line for line in lines if len(line) >= 60]
+    return len(long_lines) == 0
@@ -1,9 +1,17 @@
+import asyncio
+import contextvars
+import logging
+import time
 from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
 
 import httpx
 
 from crag.config.settings import settings
+from crag.tracing import tracer
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -21,14 +29,25 @@ class WebSearchStrategy(ABC):
     def search(self, query: str, max_results: int = 5) -> list[SearchResult]:
         pass
 
+    @property
+    def cache_namespace(self) -> str:
+        """검색 결과 캐시 키에 들어가는 백엔드 식별자. 같은 값이면 같은 결과를 준다고 본다."""
+        return type(self).__name__
+
+    async def asearch(self, query: str, max_results: int = 5) -> list[SearchResult]:
+        """비동기 검색. 기본 구현은 search를 스레드에서 실행한다."""
+        return await asyncio.to_thread(self.search, query, max_results)
+
 
 class DuckDuckGoInstantAnswerStrategy(WebSearchStrategy):
     """DuckDuckGo Instant Answer API (위키피디아 기반)."""
 
+    _URL = "https://api.duckduckgo.com/"
+
     def search(self, query: str, max_results: int = 5) -> list[SearchResult]:
         try:
             response = httpx.get(
-                "https://api.duckduckgo.com/",
+                self._URL,
                 params={"q": query, "format": "json", "no_html": "1"},
                 timeout=10.0,
             )
@@ -37,6 +56,24 @@ class DuckDuckGoInstantAnswerStrategy(WebSearchStrategy):
         except (httpx.RequestError, httpx.HTTPStatusError):
             return []
 
+        return self._parse(data, max_results)
+
+    async def asearch(self, query: str, max_results: int = 5) -> list[SearchResult]:
+        try:
+            async with httpx.AsyncClient(timeout=10.0) as client:
+                response = await client.get(
+                    self._URL,
+                    params={"q": query, "format": "json", "no_html": "1"},
+                )
+            response.raise_for_status()
+            data = response.json()
+        except (httpx.RequestError, httpx.HTTPStatusError):
+            return []
+
+        return self._parse(data, max_results)
+
+    @staticmethod
+    def _parse(data: dict, max_results: int) -> list[SearchResult]:
         results: list[SearchResult] = []
 
         if data.get("Abstract"):
@@ -91,6 +128,10 @@ class LocalSearchStrategy(WebSearchStrategy):
     def __init__(self, base_url: str | None = None) -> None:
         self._base_url = base_url or settings.local_search_url
 
+    @property
+    def cache_namespace(self) -> str:
+        return f"{type(self).__name__}:{self._base_url.rstrip('/')}"
+
     def search(self, query: str, max_results: int = 5) -> list[SearchResult]:
         try:
             response = httpx.get(
@@ -103,6 +144,24 @@ class LocalSearchStrategy(WebSearchStrategy):
         except (httpx.RequestError, httpx.HTTPStatusError):
             return []
 
+        return self._parse(data, max_results)
+
+    async def asearch(self, query: str, max_results: int = 5) -> list[SearchResult]:
+        try:
+            async with httpx.AsyncClient(timeout=30.0) as client:
+                response = await client.get(
+                    f"{self._base_url}/search",
+                    params={"q": query, "format": "json"},
+                )
+            response.raise_for_status()
+            data = response.json()
+        except (httpx.RequestError, httpx.HTTPStatusError):
+            return []
+
+        return self._parse(data, max_results)
+
+    @staticmethod
+    def _parse(data: dict, max_results: int) -> list[SearchResult]:
         results: list[SearchResult] = []
         for item in data.get("results", [])[:max_results]:
             results.append(
@@ -121,7 +180,142 @@ class WebSearcher:
         self._strategy = strategy
 
     def search(self, query: str, max_results: int = 5) -> list[SearchResult]:
-        return self._strategy.search(query, max_results)
+        with tracer.span("search", strategy=type(self._strategy).__name__) as span:
+            results = self._strategy.search(query, max_results)
+            span.add("results", len(results))
+        return results
+
+    async def asearch(self, query: str, max_results: int = 5) -> list[SearchResult]:
+        with tracer.span("search", strategy=type(self._strategy).__name__) as span:
+            results = await self._strategy.asearch(query, max_results)
+            span.add("results", len(results))
+        return results
+
+    def search_many(
+        self,
+        queries: list[str],
+        max_results: int = 5,
+        concurrency: int | None = None,
+        query_timeout: float | None = None,
+        total_timeout: float | None = None,
+    ) -> list[list[SearchResult]]:
+        """여러 검색어를 동시에 검색한다.
+
+        결과는 입력 순서대로 반환되며, 제한 시간을 넘기거나 실패한 검색어는 빈 리스트가 된다.
+        """
+        concurrency = concurrency or settings.web_search_concurrency
+        query_timeout = query_timeout or settings.web_search_query_timeout
+        total_timeout = total_timeout or settings.web_search_total_timeout
+
+        results: list[list[SearchResult]] = [[] for _ in queries]
+        if not queries:
+            return results
+
+        started: dict[int, float] = {}
+
+        def run(index: int, query: str) -> list[SearchResult]:
+            started[index] = time.monotonic()
+            return self.search(query, max_results)
+
+        executor = ThreadPoolExecutor(max_workers=max(1, concurrency))
+        # 작업 스레드의 span도 같은 trace에 묶이도록 컨텍스트를 넘긴다
+        futures: dict[Future, int] = {
+            executor.submit(contextvars.copy_context().run, run, i, query): i
+            for i, query in enumerate(queries)
+        }
+        pending = set(futures)
+        deadline = time.monotonic() + total_timeout
+
+        try:
+            while pending:
+                now = time.monotonic()
+                if now >= deadline:
+                    logger.warning(
+                        "[Web Search] Total timeout (%.1fs), %d queries dropped",
+                        total_timeout,
+                        len(pending),
+                    )
+                    break
+
+                # 시작된 지 query_timeout이 지난 검색어는 포기
+                wake = min(deadline, now + query_timeout)
+                for future in list(pending):
+                    index = futures[future]
+                    if index not in started:
+                        continue
+                    expires = started[index] + query_timeout
+                    if now >= expires:
+                        pending.discard(future)
+                        logger.warning(
+                            "[Web Search] '%s' timed out after %.1fs",
+                            queries[index],
+                            query_timeout,
+                        )
+                    else:
+                        wake = min(wake, expires)
+
+                if not pending:
+                    break
+
+                done, pending = wait(
+                    pending, timeout=max(0.0, wake - now), return_when=FIRST_COMPLETED
+                )
+                for future in done:
+                    index = futures[future]
+                    try:
+                        results[index] = future.result()
+                    except Exception as e:
+                        logger.warning("[Web Search] '%s' failed: %s", queries[index], e)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return results
+
+    async def asearch_many(
+        self,
+        queries: list[str],
+        max_results: int = 5,
+        concurrency: int | None = None,
+        query_timeout: float | None = None,
+        total_timeout: float | None = None,
+    ) -> list[list[SearchResult]]:
+        """search_many의 비동기 버전."""
+        concurrency = concurrency or settings.web_search_concurrency
+        query_timeout = query_timeout or settings.web_search_query_timeout
+        total_timeout = total_timeout or settings.web_search_total_timeout
+
+        results: list[list[SearchResult]] = [[] for _ in queries]
+        if not queries:
+            return results
+
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def run(index: int, query: str) -> None:
+            async with semaphore:
+                try:
+                    results[index] = await asyncio.wait_for(
+                        self.asearch(query, max_results), query_timeout
+                    )
+                except TimeoutError:
+                    logger.warning(
+                        "[Web Search] '%s' timed out after %.1fs", query, query_timeout
+                    )
+                except Exception as e:
+                    logger.warning("[Web Search] '%s' failed: %s", query, e)
+
+        tasks = [asyncio.create_task(run(i, query)) for i, query in enumerate(queries)]
+        _, pending = await asyncio.wait(tasks, timeout=total_timeout)
+        if pending:
+            logger.warning(
+                "[Web Search] Total timeout (%.1fs), %d queries dropped",
+                total_timeout,
+                len(pending),
+            )
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        return results
 
 
 # 기본 검색기 (하위 호환성)
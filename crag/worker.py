@@ -0,0 +1,154 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+from collections.abc import Iterator
+from pathlib import Path
+
+from crag.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def node_summary(node_output: dict) -> dict:
+    """CLI 출력에 필요한 필드만 남긴 노드 결과."""
+    return {
+        "documents": len(node_output.get("documents", [])),
+        "documents_relevant": node_output.get("documents_relevant", False),
+        "needs_web_search": node_output.get("needs_web_search", False),
+        "web_search_reason": node_output.get("web_search_reason", ""),
+        "web_search_results": len(node_output.get("web_search_results", [])),
+        "retry_count": node_output.get("retry_count", 0),
+        "generation": node_output.get("generation", ""),
+    }
+
+
+class CRAGWorker:
+    """모델, Chroma 클라이언트, 그래프를 메모리에 올려 두고 crag run 요청을 대신 처리하는 상주 프로세스.
+
+    Unix 소켓으로 JSON 한 줄 요청 {"question", "cache"}를 받아 다음 이벤트를 한 줄씩 보낸다.
+
+    - {"type": "cached", "generation", "similarity"}
+    - {"type": "node", "node", "state"}  (state는 node_summary 결과)
+    - {"type": "token", "text"}  (generate 노드의 토큰, <think> 포함 원문)
+    - {"type": "done"} / {"type": "error", "message"}
+    """
+
+    def __init__(self, graph, answer_cache=None, max_concurrency: int | None = None) -> None:
+        self._graph = graph
+        self._answer_cache = answer_cache
+        self._slots = asyncio.Semaphore(max_concurrency or settings.server_max_concurrency)
+
+    async def _answer(self, question: str, use_cache: bool, send) -> None:
+        # crag run은 워커에 연결할 때 이 모듈만 import하므로 무거운 모듈은 여기서 가져온다
+        from crag.models.state import initial_state
+        from crag.tracing import tracer
+
+        if use_cache and self._answer_cache is not None:
+            cached = await asyncio.to_thread(self._answer_cache.get, question)
+            if cached is not None:
+                await send({"type": "cached", "generation": cached[0], "similarity": cached[1]})
+                return
+
+        generation = ""
+        async with self._slots:
+            with tracer.trace():
+                async for mode, data in self._graph.astream(
+                    initial_state(question), stream_mode=["updates", "messages"]
+                ):
+                    if mode == "messages":
+                        chunk, metadata = data
+                        if metadata.get("langgraph_node") == "generate" and chunk.content:
+                            await send({"type": "token", "text": chunk.content})
+                        continue
+                    for node_name, node_output in data.items():
+                        state = node_summary(node_output)
+                        generation = state["generation"] or generation
+                        await send({"type": "node", "node": node_name, "state": state})
+
+        if use_cache and self._answer_cache is not None and generation:
+            await asyncio.to_thread(self._answer_cache.put, question, generation)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        async def send(event: dict) -> None:
+            writer.write(json.dumps(event, ensure_ascii=False).encode("utf-8") + b"\n")
+            await writer.drain()
+
+        try:
+            try:
+                request = json.loads(await reader.readline())
+                question = str(request.get("question", "")).strip()
+            except (json.JSONDecodeError, AttributeError):
+                await send({"type": "error", "message": "invalid request"})
+                return
+            if not question:
+                await send({"type": "error", "message": "question is required"})
+                return
+
+            logger.info("[Worker] %s", question)
+            try:
+                await self._answer(question, bool(request.get("cache", True)), send)
+            except ConnectionError:
+                raise
+            except Exception as e:
+                logger.exception("[Worker] Failed to answer %r", question)
+                await send({"type": "error", "message": str(e)})
+                return
+            await send({"type": "done"})
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, path: Path | None = None) -> None:
+        path = path or settings.worker_socket
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.exists():
+            sock = connect(path)
+            if sock is not None:
+                sock.close()
+                raise RuntimeError(f"Worker already running on {path}")
+            # 이전 실행이 남긴 소켓 파일
+            path.unlink()
+
+        server = await asyncio.start_unix_server(self._handle, path=str(path))
+        os.chmod(path, 0o600)
+        logger.info("[Worker] Listening on %s", path)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            path.unlink(missing_ok=True)
+            from crag.graph.nodes.html_fetcher import aclose_async_client
+
+            await aclose_async_client()
+
+
+def connect(path: Path | None = None, timeout: float = 0.5) -> socket.socket | None:
+    """실행 중인 워커에 연결한다. 워커가 없으면 None."""
+    path = path or settings.worker_socket
+    if not hasattr(socket, "AF_UNIX") or not path.exists():
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        sock.close()
+        return None
+    sock.settimeout(None)
+    return sock
+
+
+def ask(sock: socket.socket, question: str, use_cache: bool = True) -> Iterator[dict]:
+    """워커에 질문을 보내고 받은 이벤트를 차례로 반환한다."""
+    with sock, sock.makefile("rb") as stream:
+        request = {"question": question, "cache": use_cache}
+        sock.sendall(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+        for line in stream:
+            event = json.loads(line)
+            yield event
+            if event["type"] in ("done", "error"):
+                return
+    raise ConnectionError("worker closed the connection")
@@ -0,0 +1,56 @@
+import sqlite3
+
+import numpy as np
+
+from crag.cache.answer_cache import SemanticAnswerCache, invalidate_answers
+
+
+class FakeModel:
+    """질문마다 정해 둔 단위 벡터를 낸다."""
+
+    def __init__(self, vectors: dict[str, list[float]]) -> None:
+        self.vectors = vectors
+
+    def encode(self, texts: list[str], normalize_embeddings: bool = True) -> np.ndarray:
+        return np.array([self.vectors[text] for text in texts], dtype=np.float32)
+
+
+MODEL = FakeModel({"q": [1.0, 0.0], "near": [0.96, 0.28], "far": [0.0, 1.0]})
+
+
+def test_hit_above_threshold_only(tmp_path):
+    cache = SemanticAnswerCache(MODEL, tmp_path / "answers.sqlite3", threshold=0.9)
+    cache.put("q", "answer")
+
+    assert cache.get("q") == ("answer", 1.0)
+    assert cache.get("near")[0] == "answer"
+    assert cache.get("far") is None
+    assert cache.stats()["hits"] == 2
+
+
+def test_row_deleted_elsewhere_does_not_shadow_other_entries(tmp_path):
+    path = tmp_path / "answers.sqlite3"
+    cache = SemanticAnswerCache(MODEL, path, threshold=0.9)
+    cache.put("q", "old")
+    cache.put("near", "kept")
+
+    # 다른 프로세스의 ingest가 "q" 답변을 지운 경우
+    with sqlite3.connect(path) as conn:
+        conn.execute("DELETE FROM answers WHERE question = 'q'")
+
+    assert cache.get("q") is None
+    assert cache.get("q")[0] == "kept"
+
+
+def test_invalidate_answers(tmp_path):
+    path = tmp_path / "answers.sqlite3"
+    assert invalidate_answers(path) == 0
+    assert not path.exists()
+
+    cache = SemanticAnswerCache(MODEL, path)
+    cache.put("q", "answer")
+    assert invalidate_answers(path) == 1
+    assert cache.get("q") is None
+
+    cache.put("q", "new")
+    assert cache.get("q")[0] == "new"
@@ -0,0 +1,46 @@
+import json
+
+from crag.batch import completed_ids, read_questions
+
+
+def test_read_questions_skips_malformed_rows(tmp_path):
+    path = tmp_path / "questions.jsonl"
+    path.write_text(
+        "\n".join(
+            [
+                json.dumps({"id": "q1", "question": "What is CRAG?"}),
+                json.dumps("bare question"),
+                "[1, 2]",
+                "42",
+                "not json",
+                json.dumps({"id": "q6"}),
+                json.dumps({"question": "  no id  "}),
+            ]
+        ),
+        encoding="utf-8",
+    )
+
+    assert list(read_questions(path)) == [
+        ("q1", "What is CRAG?"),
+        ("2", "bare question"),
+        ("7", "no id"),
+    ]
+
+
+def test_completed_ids_skips_failed_and_malformed_rows(tmp_path):
+    path = tmp_path / "answers.jsonl"
+    path.write_text(
+        "\n".join(
+            [
+                json.dumps({"id": "a", "generation": "ok"}),
+                json.dumps({"id": "b", "error": "timeout"}),
+                json.dumps({"generation": "no id"}),
+                "[]",
+                '{"id": "c", "gener',
+            ]
+        ),
+        encoding="utf-8",
+    )
+
+    assert completed_ids(path) == {"a"}
+    assert completed_ids(tmp_path / "missing.jsonl") == set()
@@ -0,0 +1,30 @@
+import numpy as np
+
+from crag.bench import percentile, retrieval_agreement
+
+
+def _normalized(rows: list[list[float]]) -> np.ndarray:
+    vectors = np.array(rows, dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_retrieval_agreement_identical_backends():
+    docs = _normalized([[1, 0], [0, 1], [1, 1]])
+    queries = _normalized([[1, 0.1], [0.1, 1]])
+    result = retrieval_agreement((docs, queries), (docs, queries), k=2)
+
+    assert result == {"cosine": 1.0, "overlap": 1.0, "k": 2}
+
+
+def test_retrieval_agreement_clamps_k_to_corpus_size():
+    docs = _normalized([[1, 0], [0, 1]])
+    queries = _normalized([[1, 0]])
+    result = retrieval_agreement((docs, queries), (docs, queries), k=4)
+
+    assert result["k"] == 2
+    assert result["overlap"] == 1.0
+
+
+def test_percentile():
+    assert percentile([], 50) == 0.0
+    assert percentile([3.0, 1.0, 2.0], 50) == 2.0
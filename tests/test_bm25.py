@@ -0,0 +1,53 @@
+import pytest
+
+from crag.vectorstore.bm25 import BM25Index, reciprocal_rank_fusion, tokenize
+
+
+@pytest.fixture
+def index(tmp_path) -> BM25Index:
+    index = BM25Index(tmp_path / "bm25.sqlite3")
+    index.add(
+        ["a", "b", "c"],
+        [
+            "Set OLLAMA_HOST before starting the server.",
+            "The server listens on port 8000.",
+            "Error E1101 means the module has no member.",
+        ],
+        ["doc1", "doc1", "doc2"],
+    )
+    return index
+
+
+def test_tokenize_keeps_identifiers_and_their_parts():
+    tokens = tokenize("Set OLLAMA_HOST to v1.2.3")
+    assert "ollama_host" in tokens
+    assert {"ollama", "host"} <= set(tokens)
+    assert "v1.2.3" in tokens
+
+
+def test_search_ranks_exact_identifier_first(index):
+    assert index.search("what is E1101?", 3)[0][0] == "c"
+    assert index.search("OLLAMA_HOST", 3)[0][0] == "a"
+    assert {doc for doc, _ in index.search("server", 3)} == {"a", "b"}
+    assert index.search("???", 3) == []
+
+
+def test_add_replaces_and_deletes(index):
+    index.add(["a"], ["completely different text"], ["doc1"])
+    assert "a" not in {doc for doc, _ in index.search("OLLAMA_HOST", 3)}
+
+    index.delete_sources(["doc1"])
+    assert index.ids() == {"c"}
+    index.delete_ids(["c"])
+    assert index.count() == 0
+    assert index.search("E1101", 3) == []
+
+
+def test_reciprocal_rank_fusion():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "a"]], [1.0, 1.0], k=60)
+    assert [doc for doc, _ in fused] == ["a", "c", "b"]
+    assert fused[0][1] == pytest.approx(1 / 61 + 1 / 62)
+
+    # 가중치가 0이면 그 목록은 순위에 영향을 주지 않는다
+    dense_only = reciprocal_rank_fusion([["a", "b"], ["b"]], [1.0, 0.0])
+    assert [doc for doc, _ in dense_only] == ["a", "b"]
@@ -0,0 +1,98 @@
+from langchain_core.documents import Document
+
+from crag.vectorstore.chunker import Chunker, merge_adjacent_chunks, split_sentences
+
+
+def _words(n: int) -> str:
+    return " ".join(f"w{i}" for i in range(n))
+
+
+def test_token_chunks_respect_size_and_overlap():
+    # 단어 하나가 근사 토큰 1개가 되도록 센다
+    chunker = Chunker(mode="tokens", chunk_size=10, chunk_overlap=3, count_tokens=lambda t: 1)
+    text = _words(25)
+    spans = chunker.split_text(text)
+    chunks = [text[start:end].split() for start, end in spans]
+
+    assert all(len(chunk) <= 10 for chunk in chunks)
+    assert chunks[0][0] == "w0"
+    assert chunks[-1][-1] == "w24"
+    for previous, current in zip(chunks, chunks[1:]):
+        assert previous[-3:] == current[:3]
+
+
+def test_sentence_chunks_cut_on_sentence_boundaries():
+    chunker = Chunker(mode="sentences", chunk_size=8, chunk_overlap=0)
+    text = "One two three. Four five six. Seven eight nine. Ten eleven twelve."
+    chunks = [text[start:end].strip() for start, end in chunker.split_text(text)]
+
+    assert len(chunks) > 1
+    assert all(chunk.endswith(".") for chunk in chunks)
+    assert " ".join(chunks) == text
+
+
+def test_long_sentence_falls_back_to_words():
+    chunker = Chunker(
+        mode="sentences", chunk_size=5, chunk_overlap=0, count_tokens=lambda t: len(t.split())
+    )
+    text = _words(12) + "."
+    chunks = [text[start:end] for start, end in chunker.split_text(text)]
+
+    assert len(chunks) == 3
+    assert all(len(chunk.split()) <= 5 for chunk in chunks)
+
+
+def test_mode_none_and_empty_text_keep_one_chunk():
+    assert Chunker(mode="none").split_text("abc") == [(0, 3)]
+    assert Chunker(mode="tokens").split_text("   ") == [(0, 3)]
+
+
+def test_split_documents_ids_and_metadata():
+    chunker = Chunker(mode="tokens", chunk_size=4, chunk_overlap=1, count_tokens=lambda t: 1)
+    doc = Document(page_content=_words(10), metadata={"source": "a.txt"})
+    chunks = chunker.split_documents([doc])
+
+    assert [c.metadata["chunk_index"] for c in chunks] == list(range(len(chunks)))
+    assert {c.metadata["chunk_count"] for c in chunks} == {len(chunks)}
+    assert len({c.metadata["parent_id"] for c in chunks}) == 1
+    assert all(c.metadata["source"] == "a.txt" for c in chunks)
+
+    # 같은 내용이라도 source가 다르면 다른 부모
+    other = chunker.split_documents([Document(page_content=_words(10), metadata={"source": "b"})])
+    assert other[0].metadata["parent_id"] != chunks[0].metadata["parent_id"]
+
+
+def test_merge_adjacent_chunks_joins_runs_without_overlap():
+    chunker = Chunker(mode="tokens", chunk_size=4, chunk_overlap=1, count_tokens=lambda t: 1)
+    text = _words(20)
+    chunks = chunker.split_documents([Document(page_content=text, metadata={"source": "a"})])
+    assert len(chunks) > 4
+    for i, chunk in enumerate(chunks):
+        chunk.metadata["score"] = i / 10
+
+    # 검색 순서: 2, 0, 1 (연속) + 떨어진 마지막 chunk. 합친 문서는 2의 자리에 온다
+    retrieved = [chunks[2], chunks[0], chunks[1], chunks[-1]]
+    merged = merge_adjacent_chunks(retrieved)
+
+    assert len(merged) == 2
+    first = merged[0]
+    assert first.metadata["merged_chunks"] == 3
+    assert first.metadata["score"] == 0.2
+    assert first.page_content.split() == text.split()[: len(first.page_content.split())]
+    assert merged[1] is chunks[-1]
+
+
+def test_merge_adjacent_chunks_keeps_other_parents_apart():
+    a = Document(page_content="a", metadata={"parent_id": "p", "chunk_index": 0})
+    b = Document(page_content="b", metadata={"parent_id": "q", "chunk_index": 1})
+    plain = Document(page_content="web page", metadata={})
+
+    assert merge_adjacent_chunks([a, b, plain]) == [a, b, plain]
+
+
+def test_split_sentences():
+    assert split_sentences("첫 문장입니다. 두 번째!\n\n세 번째?") == [
+        "첫 문장입니다.",
+        "두 번째!",
+        "세 번째?",
+    ]
@@ -0,0 +1,133 @@
+import numpy as np
+from langchain_core.documents import Document
+
+from crag.graph.context import (
+    compress_documents,
+    estimate_tokens,
+    pack_context,
+    remove_near_duplicates,
+    split_strips,
+    truncate_to_tokens,
+)
+
+
+def _doc(text: str, score: float, **metadata) -> Document:
+    return Document(page_content=text, metadata={"score": score, **metadata})
+
+
+def _embed_by_first_word(texts: list[str]) -> np.ndarray:
+    """첫 단어가 같으면 같은 방향의 벡터."""
+    axes = {}
+    vectors = np.zeros((len(texts), 8), dtype=np.float32)
+    for i, text in enumerate(texts):
+        axis = axes.setdefault(text.split()[0], len(axes))
+        vectors[i, axis] = 1.0
+    return vectors
+
+
+def test_estimate_and_truncate_tokens():
+    assert estimate_tokens("abcd" * 10) == 10
+    assert estimate_tokens("가나다") == 2
+
+    text = "First sentence here. Second sentence here. Third sentence here."
+    cut = truncate_to_tokens(text, 8)
+    assert estimate_tokens(cut) <= 8
+    assert cut.endswith(".")
+    assert truncate_to_tokens(text, 100) == text
+
+
+def test_exact_duplicates_removed_without_embeddings():
+    docs = [_doc("Same  text", 0.9), _doc("same text", 0.8), _doc("other", 0.7)]
+    kept, dropped = remove_near_duplicates(docs)
+
+    assert [d.metadata["score"] for d in kept] == [0.9, 0.7]
+    assert dropped == [docs[1]]
+
+
+def test_near_duplicates_use_embeddings():
+    docs = [_doc("alpha one", 0.9), _doc("alpha two", 0.8), _doc("beta", 0.7)]
+    kept, dropped = remove_near_duplicates(docs, _embed_by_first_word, threshold=0.95)
+
+    assert [d.page_content for d in kept] == ["alpha one", "beta"]
+    assert [d.page_content for d in dropped] == ["alpha two"]
+
+
+def test_embedding_failure_falls_back_to_exact_dedup():
+    def broken(texts):
+        raise RuntimeError("model not loaded")
+
+    docs = [_doc("alpha one", 0.9), _doc("alpha two", 0.8)]
+    kept, dropped = remove_near_duplicates(docs, broken)
+    assert len(kept) == 2 and not dropped
+
+
+def test_pack_context_orders_by_score_and_respects_budget():
+    docs = [
+        _doc("low " * 40, 0.1),
+        _doc("high " * 40, 0.9),
+        _doc("mid " * 40, 0.5, rerank_score=0.95),
+    ]
+    # "mid" 40 + "high" 50 토큰, 남은 20 토큰에 "low"를 잘라 넣는다
+    packed = pack_context(docs, budget=110, min_tokens=20)
+
+    # 재정렬 점수가 있으면 그것이 우선
+    assert [d.page_content.split()[0] for d in packed.documents] == ["mid", "high", "low"]
+    assert packed.tokens <= 110
+    assert packed.truncated == 1
+    assert not packed.over_budget
+
+    packed = pack_context(docs, budget=100, min_tokens=20)
+    assert [d.page_content.split()[0] for d in packed.documents] == ["mid", "high"]
+    assert packed.over_budget == [docs[0]]
+
+
+def test_pack_context_drops_duplicates_first():
+    docs = [_doc("alpha one", 0.9), _doc("alpha two", 0.8), _doc("beta", 0.7)]
+    packed = pack_context(docs, budget=1000, embed=_embed_by_first_word)
+
+    assert [d.page_content for d in packed.documents] == ["alpha one", "beta"]
+    assert [d.page_content for d in packed.duplicates] == ["alpha two"]
+
+
+def _embed_by_keyword(texts: list[str]) -> np.ndarray:
+    """"cat"/"dog"/"fish" 포함 여부로 만든 벡터. 첫 텍스트가 질문."""
+    keywords = ["cat", "dog", "fish"]
+    return np.array(
+        [[1.0 if k in text.lower() else 0.0 for k in keywords] + [0.1] for text in texts],
+        dtype=np.float32,
+    )
+
+
+def test_split_strips():
+    assert split_strips("A. B. C.", 2) == ["A. B.", "C."]
+
+
+def test_compress_keeps_most_similar_strips_in_order():
+    docs = [
+        Document(
+            page_content="Cats purr. Dogs bark. Cats sleep a lot. Fish swim.",
+            metadata={"source": "a"},
+        ),
+        Document(page_content="Dogs fetch. Fish bubble.", metadata={"source": "b"}),
+    ]
+    compressed = compress_documents(
+        "Why do cats purr?", docs, _embed_by_keyword, max_strips=2, sentences_per_strip=1
+    )
+
+    assert len(compressed) == 1
+    assert compressed[0].page_content == "Cats purr.\nCats sleep a lot."
+    assert compressed[0].metadata["source"] == "a"
+    assert compressed[0].metadata["original_chars"] == len(docs[0].page_content)
+
+
+def test_compress_returns_documents_unchanged_when_small():
+    docs = [Document(page_content="One. Two.", metadata={})]
+    assert compress_documents("q", docs, _embed_by_keyword, max_strips=5) is docs
+
+
+def test_compress_min_similarity_drops_everything_below():
+    docs = [Document(page_content="Dogs bark. Fish swim. Dogs run.", metadata={})]
+    compressed = compress_documents(
+        "cats", docs, _embed_by_keyword, max_strips=1, sentences_per_strip=1, min_similarity=0.5
+    )
+    assert compressed == []
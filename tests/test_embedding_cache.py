@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+
+from crag.cache.embedding_cache import EmbeddingCache
+
+DIM = 4
+
+
+class FakeModel:
+    """텍스트마다 정해진 벡터를 내고, 받은 텍스트를 기록한다."""
+
+    def __init__(self, dim: int = DIM) -> None:
+        self.dim = dim
+        self.calls: list[list[str]] = []
+
+    def encode(self, texts: list[str], batch_size: int | None = None) -> np.ndarray:
+        self.calls.append(list(texts))
+        return np.array([self.vector(text) for text in texts], dtype=np.float32)
+
+    def vector(self, text: str) -> np.ndarray:
+        seed = sum(text.encode())
+        return np.arange(seed, seed + self.dim, dtype=np.float32) / 1000
+
+
+@pytest.fixture
+def model() -> FakeModel:
+    return FakeModel()
+
+
+def _cache(tmp_path, dtype: str = "float32") -> EmbeddingCache:
+    return EmbeddingCache("fake-model", path=tmp_path, dtype=dtype)
+
+
+def test_only_misses_are_encoded(tmp_path, model):
+    cache = _cache(tmp_path)
+    cache.encode(model, ["a", "b"])
+    vectors = cache.encode(model, ["b", "c", "a"])
+
+    assert model.calls == [["a", "b"], ["c"]]
+    np.testing.assert_allclose(vectors, [model.vector(t) for t in ["b", "c", "a"]])
+    assert (cache.hits, cache.misses) == (2, 3)
+    assert cache.entry_count() == 3
+
+
+def test_duplicate_texts_in_one_batch(tmp_path, model):
+    cache = _cache(tmp_path)
+    vectors = cache.encode(model, ["a", "a", "b", "a"])
+
+    assert model.calls == [["a", "b"]]
+    assert vectors.shape == (4, DIM)
+    np.testing.assert_allclose(vectors[0], vectors[1])
+    np.testing.assert_allclose(vectors[3], model.vector("a"))
+    assert cache.entry_count() == 2
+
+
+def test_vectors_persist_across_instances(tmp_path, model):
+    _cache(tmp_path).encode(model, ["a", "b"])
+    reopened = _cache(tmp_path)
+    vectors = reopened.encode(model, ["b", "a"])
+
+    assert model.calls == [["a", "b"]]
+    np.testing.assert_allclose(vectors, [model.vector("b"), model.vector("a")])
+
+
+def test_partial_write_is_truncated_on_open(tmp_path, model):
+    cache = _cache(tmp_path)
+    cache.encode(model, ["a", "b"])
+    expected_size = cache.size_bytes()
+    assert expected_size == 2 * DIM * 4
+
+    # 벡터는 파일에 썼지만 색인을 기록하기 전에 중단된 경우
+    with cache._data_path.open("ab") as f:
+        f.write(np.ones(DIM + 1, dtype=np.float32).tobytes())
+
+    reopened = _cache(tmp_path)
+    assert reopened.size_bytes() == expected_size
+    vectors = reopened.encode(model, ["c", "a"])
+    np.testing.assert_allclose(vectors, [model.vector("c"), model.vector("a")])
+    assert reopened.size_bytes() == 3 * DIM * 4
+
+
+def test_clear_then_reopen(tmp_path, model):
+    cache = _cache(tmp_path)
+    cache.encode(model, ["a", "b"])
+    cache.encode_query(model, "q")
+    cache.clear()
+
+    assert cache.entry_count() == 0
+    assert cache.size_bytes() == 0
+
+    # 비운 뒤에는 차원이 다른 벡터도 받는다
+    wide = FakeModel(dim=DIM * 2)
+    reopened = _cache(tmp_path)
+    assert reopened.entry_count() == 0
+    vectors = reopened.encode(wide, ["a", "q"])
+    assert wide.calls == [["a", "q"]]
+    np.testing.assert_allclose(vectors, [wide.vector("a"), wide.vector("q")])
+
+
+def test_query_lru_skips_the_index(tmp_path, model):
+    cache = _cache(tmp_path)
+    first = cache.encode_query(model, "q")
+    second = cache.encode_query(model, "q")
+
+    assert model.calls == [["q"]]
+    np.testing.assert_allclose(first, second)
+
+
+def test_dtypes_use_separate_directories(tmp_path, model):
+    _cache(tmp_path, "float32").encode(model, ["a"])
+    half = _cache(tmp_path, "float16")
+    vectors = half.encode(model, ["a"])
+
+    assert model.calls == [["a"], ["a"]]
+    np.testing.assert_allclose(vectors[0], model.vector("a"), rtol=1e-3)
@@ -0,0 +1,55 @@
+from langchain_core.documents import Document
+
+from crag.config.settings import settings
+from crag.graph.nodes.grader import _split_by_score, fit_score_thresholds
+
+
+def test_fit_separable_scores():
+    samples = [(0.9 - i * 0.01, True) for i in range(10)]
+    samples += [(0.3 + i * 0.01, False) for i in range(10)]
+    high, low = fit_score_thresholds(samples, precision=0.95, min_support=5)
+
+    assert high == 0.81
+    assert low == 0.39
+
+
+def test_fit_requires_min_support():
+    samples = [(0.9, True), (0.8, True), (0.2, False)]
+    assert fit_score_thresholds(samples, min_support=5) == (None, None)
+
+
+def test_fit_tolerates_noise_up_to_precision():
+    samples = [(1.0 - i * 0.01, True) for i in range(20)] + [(0.955, False)]
+    samples += [(0.1 + i * 0.01, False) for i in range(10)]
+
+    # 관련 구간의 무관 샘플 하나(20/21 ≈ 0.952)는 정밀도 0.95 안에 들어간다
+    assert fit_score_thresholds(samples, precision=0.95) == (0.81, 0.19)
+
+
+def test_fit_overlapping_scores_have_no_safe_band():
+    samples = [(0.5, i % 2 == 0) for i in range(20)]
+    assert fit_score_thresholds(samples, precision=0.95) == (None, None)
+
+
+def test_split_by_score(monkeypatch):
+    monkeypatch.setattr(settings, "grader_relevant_threshold", 0.8)
+    monkeypatch.setattr(settings, "grader_irrelevant_threshold", 0.4)
+    docs = [
+        Document(page_content="high", metadata={"score": 0.85}),
+        Document(page_content="low", metadata={"score": 0.4}),
+        Document(page_content="mid", metadata={"score": 0.6}),
+        Document(page_content="web", metadata={}),
+    ]
+    relevant, irrelevant, ambiguous = _split_by_score(docs)
+
+    assert [d.page_content for d in relevant] == ["high"]
+    assert [d.page_content for d in irrelevant] == ["low"]
+    assert [d.page_content for d in ambiguous] == ["mid", "web"]
+
+
+def test_split_by_score_without_thresholds_grades_everything(monkeypatch):
+    monkeypatch.setattr(settings, "grader_relevant_threshold", None)
+    monkeypatch.setattr(settings, "grader_irrelevant_threshold", None)
+    docs = [Document(page_content="x", metadata={"score": 0.99})]
+
+    assert _split_by_score(docs) == ([], [], docs)
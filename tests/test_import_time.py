@@ -0,0 +1,48 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# 첫 사용 시점까지 import를 미뤄야 하는 무거운 모듈
+HEAVY_MODULES = ("chromadb", "sentence_transformers", "transformers", "torch")
+
+# 느린 CI에서도 넘지 않을 상한. 무거운 모듈이 섞이면 수 초가 걸린다
+IMPORT_SECONDS_LIMIT = 3.0
+
+ROOT = Path(__file__).resolve().parent.parent
+
+_CODE = """
+import json, sys, time
+t = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t
+print(json.dumps({{"seconds": elapsed, "modules": sorted(sys.modules)}}))
+"""
+
+
+def _import_in_fresh_interpreter(module: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", _CODE.format(module=module)],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=ROOT,
+    )
+    return json.loads(output.stdout.splitlines()[-1])
+
+
+@pytest.mark.parametrize("module", ["crag.cli", "crag.graph.builder"])
+def test_import_skips_heavy_modules(module: str) -> None:
+    result = _import_in_fresh_interpreter(module)
+    loaded = [name for name in HEAVY_MODULES if name in result["modules"]]
+    assert not loaded, f"{module} imports {loaded} at import time"
+
+
+@pytest.mark.parametrize("module", ["crag.cli", "crag.graph.builder"])
+def test_import_time(module: str) -> None:
+    # 첫 실행은 .pyc 컴파일 비용이 섞이므로 두 번째 측정을 쓴다
+    _import_in_fresh_interpreter(module)
+    seconds = _import_in_fresh_interpreter(module)["seconds"]
+    assert seconds < IMPORT_SECONDS_LIMIT, f"import {module} took {seconds:.2f}s"
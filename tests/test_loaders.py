@@ -0,0 +1,54 @@
+from pathlib import Path
+
+from crag.vectorstore.chunker import Chunker
+from crag.vectorstore.loaders import get_loader, iter_files, load_jsonl
+
+
+def _chunk_ids(documents) -> list[str]:
+    chunks = Chunker(mode="none").split_documents(documents)
+    return [f"{c.metadata['parent_id']}_{c.metadata['chunk_index']}" for c in chunks]
+
+
+def test_jsonl_repeated_rows_get_distinct_ids():
+    path = Path("docs/faq.jsonl")
+    text = '{"text": "same answer"}\n{"text": "same answer"}\n\n{"text": "other"}\n'
+    documents = load_jsonl(path, text)
+
+    assert [doc.metadata["record"] for doc in documents] == [1, 2, 4]
+    ids = _chunk_ids(documents)
+    assert len(set(ids)) == 3
+
+
+def test_jsonl_ids_are_stable_across_loads():
+    path = Path("docs/faq.jsonl")
+    text = '{"text": "a"}\n{"text": "b"}\n'
+    assert _chunk_ids(load_jsonl(path, text)) == _chunk_ids(load_jsonl(path, text))
+
+
+def test_jsonl_skips_invalid_rows_and_keeps_record_source():
+    path = Path("docs/faq.jsonl")
+    text = (
+        'not json\n[1, 2]\n'
+        '{"content": "body", "source": "https://x", "lang": "ko", "tags": [1]}\n'
+    )
+    documents = load_jsonl(path, text)
+
+    assert len(documents) == 1
+    metadata = documents[0].metadata
+    assert metadata["source"] == str(path)
+    assert metadata["record_source"] == "https://x"
+    assert metadata["lang"] == "ko"
+    assert "tags" not in metadata
+
+
+def test_iter_files_skips_hidden_and_unknown(tmp_path):
+    (tmp_path / "a.md").write_text("a")
+    (tmp_path / "b.bin").write_text("b")
+    (tmp_path / ".hidden").mkdir()
+    (tmp_path / ".hidden" / "c.txt").write_text("c")
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "d.jsonl").write_text("{}")
+
+    files = [path.relative_to(tmp_path).as_posix() for path in iter_files(tmp_path)]
+    assert files == ["a.md", "sub/d.jsonl"]
+    assert get_loader(Path("x.HTML")) is not None
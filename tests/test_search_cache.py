@@ -0,0 +1,99 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from crag.cache import search_cache
+from crag.cache.search_cache import CachedSearchStrategy, normalize_query
+from crag.web.search import LocalSearchStrategy, SearchResult, WebSearchStrategy
+
+
+class FakeStrategy(WebSearchStrategy):
+    def __init__(self, results: list[SearchResult] | Exception) -> None:
+        self.results = results
+        self.calls = 0
+
+    def search(self, query: str, max_results: int = 5) -> list[SearchResult]:
+        self.calls += 1
+        if isinstance(self.results, Exception):
+            raise self.results
+        return list(self.results)
+
+
+RESULT = SearchResult(title="t", href="https://example.com", body="b")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(search_cache, "time", SimpleNamespace(time=lambda: now.value))
+    return now
+
+
+def _cached(strategy, tmp_path, **kwargs) -> CachedSearchStrategy:
+    return CachedSearchStrategy(strategy, path=tmp_path / "search.sqlite3", **kwargs)
+
+
+def test_normalize_query():
+    assert normalize_query('  What  IS crag?" ') == "what is crag"
+
+
+def test_hit_within_ttl_and_miss_after(tmp_path, clock):
+    strategy = FakeStrategy([RESULT])
+    cache = _cached(strategy, tmp_path, ttl=60, negative_ttl=5)
+
+    assert cache.search("CRAG") == [RESULT]
+    assert cache.search("crag ") == [RESULT]
+    assert strategy.calls == 1
+
+    clock.value += 61
+    cache.search("crag")
+    assert strategy.calls == 2
+
+
+def test_empty_and_failed_results_use_negative_ttl(tmp_path, clock):
+    empty = FakeStrategy([])
+    cache = _cached(empty, tmp_path, ttl=60, negative_ttl=5)
+    cache.search("q")
+    cache.search("q")
+    assert empty.calls == 1
+    clock.value += 6
+    cache.search("q")
+    assert empty.calls == 2
+
+    failing = FakeStrategy(RuntimeError("down"))
+    cache = _cached(failing, tmp_path / "other", ttl=60, negative_ttl=5)
+    assert cache.search("q") == []
+    assert cache.search("q") == []
+    assert failing.calls == 1
+
+
+def test_results_persist_across_instances(tmp_path, clock):
+    _cached(FakeStrategy([RESULT]), tmp_path, ttl=60).search("q")
+    strategy = FakeStrategy([])
+    reopened = _cached(strategy, tmp_path, ttl=60)
+
+    assert reopened.search("q") == [RESULT]
+    assert strategy.calls == 0
+    assert reopened.entry_count() == 1
+
+
+def test_key_includes_max_results_and_backend(tmp_path, clock):
+    strategy = FakeStrategy([RESULT])
+    cache = _cached(strategy, tmp_path, ttl=60)
+    cache.search("q", max_results=3)
+    cache.search("q", max_results=5)
+    assert strategy.calls == 2
+
+    a = _cached(LocalSearchStrategy("http://a"), tmp_path)
+    b = _cached(LocalSearchStrategy("http://b/"), tmp_path)
+    assert a._key("q", 5) != b._key("q", 5)
+
+
+def test_asearch_shares_entries(tmp_path, clock):
+    strategy = FakeStrategy([RESULT])
+    cache = _cached(strategy, tmp_path, ttl=60)
+    cache.search("q")
+
+    assert asyncio.run(cache.asearch("q")) == [RESULT]
+    assert strategy.calls == 1
@@ -0,0 +1,128 @@
+import os
+
+import pytest
+
+from crag.config.settings import settings
+from crag.vectorstore.sync import sync_documents
+
+
+class FakeStore:
+    """source별 문서만 기록하는 벡터스토어 대역."""
+
+    def __init__(self) -> None:
+        self.documents: dict[str, list[str]] = {}
+        self.added = 0
+        self.clears = 0
+
+    def add_documents(self, documents) -> None:
+        for doc in documents:
+            self.documents.setdefault(doc.metadata["source"], []).append(doc.page_content)
+        self.added += len(documents)
+
+    def delete_by_source(self, sources) -> None:
+        for source in sources:
+            self.documents.pop(source, None)
+
+    def clear(self) -> None:
+        self.documents.clear()
+        self.clears += 1
+
+    def count(self) -> int:
+        return sum(len(docs) for docs in self.documents.values())
+
+
+@pytest.fixture
+def docs_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "chroma_persist_dir", tmp_path / "db")
+    directory = tmp_path / "docs"
+    directory.mkdir()
+    (directory / "a.txt").write_text("alpha", encoding="utf-8")
+    (directory / "b.md").write_text("beta", encoding="utf-8")
+    return directory
+
+
+def _sync(store, docs_dir, **kwargs):
+    return sync_documents(store, docs_dir, workers=1, **kwargs)
+
+
+def test_first_sync_adds_everything(docs_dir):
+    store = FakeStore()
+    result = _sync(store, docs_dir)
+
+    assert sorted(result.added) == sorted(str(p) for p in docs_dir.iterdir())
+    assert store.documents == {
+        str(docs_dir / "a.txt"): ["alpha"],
+        str(docs_dir / "b.md"): ["beta"],
+    }
+
+
+def test_unchanged_files_are_skipped(docs_dir):
+    store = FakeStore()
+    _sync(store, docs_dir)
+    store.added = 0
+
+    result = _sync(store, docs_dir)
+    assert result.unchanged == 2
+    assert not (result.added or result.updated or result.removed)
+    assert store.added == 0
+
+
+def test_same_content_with_new_mtime_is_not_reembedded(docs_dir):
+    store = FakeStore()
+    _sync(store, docs_dir)
+    store.added = 0
+    path = docs_dir / "a.txt"
+    path.write_text("alpha", encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+
+    result = _sync(store, docs_dir)
+    assert result.unchanged == 2
+    assert store.added == 0
+
+
+def test_changed_file_replaces_stale_chunks(docs_dir):
+    store = FakeStore()
+    _sync(store, docs_dir)
+    (docs_dir / "a.txt").write_text("alpha v2 with more text", encoding="utf-8")
+
+    result = _sync(store, docs_dir)
+    assert result.updated == [str(docs_dir / "a.txt")]
+    assert store.documents[str(docs_dir / "a.txt")] == ["alpha v2 with more text"]
+
+
+def test_removed_file_is_deleted(docs_dir):
+    store = FakeStore()
+    _sync(store, docs_dir)
+    (docs_dir / "b.md").unlink()
+
+    result = _sync(store, docs_dir)
+    assert result.removed == [str(docs_dir / "b.md")]
+    assert str(docs_dir / "b.md") not in store.documents
+
+
+def test_other_directories_are_left_alone(docs_dir, tmp_path):
+    store = FakeStore()
+    _sync(store, docs_dir)
+    other = tmp_path / "other"
+    other.mkdir()
+    (other / "c.txt").write_text("gamma", encoding="utf-8")
+
+    result = _sync(store, other)
+    assert result.removed == []
+    assert str(docs_dir / "a.txt") in store.documents
+
+
+def test_full_and_config_change_rebuild(docs_dir, monkeypatch):
+    store = FakeStore()
+    _sync(store, docs_dir)  # manifest가 없으므로 처음에도 비운다
+    store.clears = 0
+
+    result = _sync(store, docs_dir, full=True)
+    assert store.clears == 1
+    assert len(result.added) == 2
+
+    monkeypatch.setattr(settings, "chunk_size", settings.chunk_size + 1)
+    result = _sync(store, docs_dir)
+    assert store.clears == 2
+    assert len(result.added) == 2